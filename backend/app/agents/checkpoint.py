@@ -0,0 +1,160 @@
+"""
+Durable SQLite checkpoints for the analysis graph.
+"""
+
+import json
+import logging
+import pickle
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+from langchain_core.pydantic_v1 import PrivateAttr
+from langchain_core.runnables import RunnableConfig
+from langchain_core.runnables.utils import ConfigurableFieldSpec
+from langgraph.checkpoint.base import BaseCheckpointSaver, Checkpoint, CheckpointAt
+
+from app.config import settings
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+@dataclass(slots=True)
+class InterruptedRun:
+    """An analysis that was started but never finished."""
+    thread_id: str
+    text: str
+    page_starts: List[int]
+    metadata: dict = field(default_factory=dict)
+    checkpoint: Optional[Checkpoint] = None  # None if it stopped before the first node finished
+
+
+class SQLiteCheckpointSaver(BaseCheckpointSaver):
+    """
+    Persist graph state to SQLite after every step.
+
+    Alongside the LangGraph checkpoint of each thread (one thread per
+    analysis), the saver keeps the run's input: the contract text lives in
+    the in-memory document store while the graph runs, so it has to be
+    stored here too for the analysis to be resumed in a new process.
+    Checkpoints are pickled; the file is local state, not an exchange format.
+    """
+
+    path: str
+    at: CheckpointAt = CheckpointAt.END_OF_STEP
+
+    _db: Optional[sqlite3.Connection] = PrivateAttr(default=None)
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    @classmethod
+    def from_settings(cls) -> "SQLiteCheckpointSaver":
+        """Create the saver persisted under DATA_DIR."""
+        return cls(path=str(Path(settings.data_dir) / "checkpoints.db"))
+
+    @property
+    def config_specs(self) -> list[ConfigurableFieldSpec]:
+        return [
+            ConfigurableFieldSpec(
+                id="thread_id",
+                annotation=str,
+                name="Thread ID",
+                description=None,
+                default="",
+                is_shared=True,
+            ),
+        ]
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._db is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(self.path, check_same_thread=False)
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS runs (thread_id TEXT PRIMARY KEY, text BLOB NOT NULL, "
+                "page_starts TEXT NOT NULL, metadata TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS checkpoints (thread_id TEXT PRIMARY KEY, "
+                "checkpoint BLOB NOT NULL, updated_at REAL NOT NULL)"
+            )
+            db.commit()
+            self._db = db
+        return self._db
+
+    def get(self, config: RunnableConfig) -> Optional[Checkpoint]:
+        thread_id = config["configurable"]["thread_id"]
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT checkpoint FROM checkpoints WHERE thread_id = ?", (thread_id,)
+            ).fetchone()
+        return pickle.loads(row[0]) if row else None
+
+    def put(self, config: RunnableConfig, checkpoint: Checkpoint) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        blob = pickle.dumps(checkpoint, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            db = self._connection()
+            db.execute("INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?)", (thread_id, blob, time.time()))
+            db.commit()
+
+    def register(self, thread_id: str, text: str, page_starts: Sequence[int], metadata: dict) -> None:
+        """
+        Record the input of a run before it starts.
+
+        Args:
+            thread_id: Graph thread (analysis ID)
+            text: Contract text
+            page_starts: Page start offsets within the text
+            metadata: JSON-serializable details needed to resume (filename, tenant, ...)
+        """
+        with self._lock:
+            db = self._connection()
+            db.execute(
+                "INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?, ?)",
+                (thread_id, zlib.compress(text.encode("utf-8")), json.dumps(list(page_starts)),
+                 json.dumps(metadata), time.time())
+            )
+            db.execute("DELETE FROM checkpoints WHERE thread_id = ?", (thread_id,))
+            db.commit()
+
+    def update_values(self, thread_id: str, **values) -> None:
+        """Overwrite state values in a thread's checkpoint without triggering any node."""
+        config = {"configurable": {"thread_id": thread_id}}
+        checkpoint = self.get(config)
+        if checkpoint is None:
+            return
+        checkpoint["channel_values"].update(values)
+        self.put(config, checkpoint)
+
+    def finish(self, thread_id: str) -> None:
+        """Forget a run that completed (or failed for good)."""
+        with self._lock:
+            db = self._connection()
+            db.execute("DELETE FROM checkpoints WHERE thread_id = ?", (thread_id,))
+            db.execute("DELETE FROM runs WHERE thread_id = ?", (thread_id,))
+            db.commit()
+
+    def interrupted(self) -> List[InterruptedRun]:
+        """Runs that were registered but never finished, oldest first."""
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT r.thread_id, r.text, r.page_starts, r.metadata, c.checkpoint "
+                "FROM runs r LEFT JOIN checkpoints c ON c.thread_id = r.thread_id ORDER BY r.created_at"
+            ).fetchall()
+        return [
+            InterruptedRun(
+                thread_id=thread_id,
+                text=zlib.decompress(text).decode("utf-8"),
+                page_starts=json.loads(page_starts),
+                metadata=json.loads(metadata),
+                checkpoint=pickle.loads(checkpoint) if checkpoint else None
+            )
+            for thread_id, text, page_starts, metadata, checkpoint in rows
+        ]
+
+
+CHECKPOINTS = SQLiteCheckpointSaver.from_settings()
@@ -0,0 +1,121 @@
+"""
+Deadline and load-aware degradation policy for the analysis graph.
+"""
+
+import logging
+import time
+from typing import Optional
+
+from app.config import settings
+from app.utils.logger import setup_logger
+from app.agents.llm.cascade import node_model
+from app.agents.llm.limiter import LLM_LIMITER
+
+logger = setup_logger(__name__)
+
+
+# Degradations recorded in state["degradations"]
+SMALL_MODEL = "small_model"                  # Extraction/detection ran on the small model only
+TRUNCATED_CLAUSES = "truncated_clauses"      # Extraction stopped before the model finished
+RULE_BASED_ONLY = "rule_based_only"          # LLM risk detection skipped; pre-screen results only
+SKIPPED_REMEDIATION = "skipped_remediation"  # Remediation suggestions not generated
+
+
+class DegradationPolicy:
+    """
+    Decide how deep each stage may go given the analysis deadline and system load.
+
+    Each stage needs a share of the analysis budget (ANALYSIS_TIMEOUT_SECONDS)
+    to run at full depth. When less than that remains, or the LLM limiter is
+    queueing at least SATURATION_RATIO calls per permit, the stage degrades:
+
+    - extraction and detection use the small model once below SMALL_MODEL_SHARE
+      (or under load), and extraction keeps at most DEGRADED_MAX_CLAUSES clauses
+      under load
+    - extraction stops streaming, keeping the clauses it has, once
+      EXTRACTION_CUTOFF_SHARE is reached
+    - LLM detection is skipped below DETECTION_SHARE, or abandoned if it is
+      still running at DETECTION_CUTOFF_SHARE
+    - remediation is skipped below REMEDIATION_SHARE
+    """
+
+    SMALL_MODEL_SHARE = 0.6
+    EXTRACTION_CUTOFF_SHARE = 0.35
+    DETECTION_SHARE = 0.25
+    DETECTION_CUTOFF_SHARE = 0.1
+    REMEDIATION_SHARE = 0.05
+    SATURATION_RATIO = 1.0
+
+    def __init__(self, enabled: bool, timeout_seconds: float, max_clauses: int):
+        """
+        Initialize the policy.
+
+        Args:
+            enabled: Whether any degradation is applied
+            timeout_seconds: Full analysis budget
+            max_clauses: Clause cap for extraction under load
+        """
+        self.enabled = enabled
+        self.timeout_seconds = float(timeout_seconds)
+        self.max_clauses = max_clauses
+
+    @classmethod
+    def from_settings(cls) -> "DegradationPolicy":
+        """Create the policy from the analysis settings."""
+        return cls(
+            enabled=settings.degradation_enabled,
+            timeout_seconds=settings.analysis_timeout_seconds,
+            max_clauses=settings.degraded_max_clauses
+        )
+
+    def new_deadline(self) -> float:
+        """Wall-clock deadline for an analysis starting now."""
+        return time.time() + self.timeout_seconds
+
+    def remaining(self, state: dict) -> float:
+        """Seconds left before the analysis deadline."""
+        deadline = state.get("deadline")
+        return deadline - time.time() if deadline else self.timeout_seconds
+
+    def saturated(self) -> bool:
+        """True when LLM calls are queueing behind the concurrency limit."""
+        return LLM_LIMITER.queued >= self.SATURATION_RATIO * max(1.0, LLM_LIMITER.limit)
+
+    def _short(self, state: dict, share: float) -> bool:
+        return self.remaining(state) < share * self.timeout_seconds
+
+    def small_model(self, node: str, state: dict) -> Optional[str]:
+        """Small model a node should switch to, or None to run normally."""
+        if not self.enabled or settings.cascade_small_model == node_model(node):
+            return None
+        if self._short(state, self.SMALL_MODEL_SHARE) or self.saturated():
+            return settings.cascade_small_model
+        return None
+
+    def clause_limit(self, state: dict) -> Optional[int]:
+        """Maximum clauses to extract, or None for no limit."""
+        if self.enabled and self.saturated():
+            return self.max_clauses
+        return None
+
+    def skip_detection(self, state: dict) -> bool:
+        """Whether LLM risk detection should be skipped altogether."""
+        return self.enabled and self._short(state, self.DETECTION_SHARE)
+
+    def skip_remediation(self, state: dict) -> bool:
+        return self.enabled and self._short(state, self.REMEDIATION_SHARE)
+
+    def cutoff(self, state: dict, share: float) -> Optional[float]:
+        """
+        Seconds a stage may keep running before it must stop.
+
+        Returns:
+            Seconds until only `share` of the budget is left (at least 0),
+            or None when degradation is disabled
+        """
+        if not self.enabled:
+            return None
+        return max(0.0, self.remaining(state) - share * self.timeout_seconds)
+
+
+DEGRADATION = DegradationPolicy.from_settings()
@@ -0,0 +1,311 @@
+"""
+Persisted raw risk detections, for re-scoring and exporting analyses without the LLM.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+from dataclasses import asdict, dataclass
+from datetime import date
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
+from app.config import settings
+from app.utils.logger import setup_logger
+from app.agents.state import Risk
+from app.agents.nodes.scoring import ScoringTable
+
+logger = setup_logger(__name__)
+
+_CODE = np.dtype("<u2")  # Code of a financial impact or likelihood value
+
+# Risk fields filled in after detection, left out of the stored detection
+_SCORING_FIELDS = (
+    "risk_id", "severity_score", "severity_level",
+    "remediation_suggestion", "remediation_priority", "remediation_effort"
+)
+
+
+@dataclass(slots=True)
+class Rescoring:
+    """New scores of re-scored analyses; risks are concatenated in analysis order."""
+    version: str
+    analysis_ids: List[str]
+    counts: np.ndarray  # Risks per analysis
+    scores: np.ndarray  # Severity score per risk
+    overall: np.ndarray  # Overall risk score per analysis
+    levels: List[str]  # Severity level of each score 0-100
+
+
+@dataclass(slots=True)
+class StoredAnalysis:
+    """A stored analysis, as read back for export."""
+    analysis_id: str
+    tenant: str
+    filename: str
+    analyzed_on: str  # YYYY-MM-DD, empty if stored before dates were kept
+    overall_risk_score: int
+    summary: str
+    risks: List[dict]  # Detections in result order, with their "recommendation"
+
+
+class DetectionStore:
+    """
+    Raw risk detections of every completed analysis, in SQLite.
+
+    Each analysis keeps its detected risks as JSON, in the order of its
+    result's risks, and the scoring table version its scores come from.
+    Alongside, a narrow row per analysis holds the financial impact and
+    likelihood of its risks as arrays of codes into a shared vocabulary, so
+    re-scoring the whole archive reads one small row per analysis and scores
+    every risk with a single lookup into a grid of the table's scores. The
+    file name, date, summary and remediation suggestions the export needs
+    are kept in a separate table, out of the re-scoring scan.
+    """
+
+    def __init__(self, path: Optional[str]):
+        """
+        Open the store.
+
+        Args:
+            path: SQLite file to persist to, or None to keep the store in memory
+        """
+        if path:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(path or ":memory:", check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS analyses (id INTEGER PRIMARY KEY, analysis_id TEXT UNIQUE NOT NULL, "
+            "tenant TEXT NOT NULL, scoring_version TEXT NOT NULL, overall_risk_score INTEGER NOT NULL, "
+            "impacts BLOB NOT NULL, likelihoods BLOB NOT NULL)"
+        )
+        self._db.execute("CREATE TABLE IF NOT EXISTS detections (analysis INTEGER PRIMARY KEY, risks TEXT NOT NULL)")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS reports (analysis INTEGER PRIMARY KEY, filename TEXT NOT NULL, "
+            "analyzed_on TEXT NOT NULL, summary TEXT NOT NULL, recommendations TEXT NOT NULL)"
+        )
+        self._db.execute("CREATE TABLE IF NOT EXISTS factor_values (code INTEGER PRIMARY KEY, value TEXT UNIQUE NOT NULL)")
+        self._db.commit()
+        self._lock = threading.Lock()
+        self._values: List[str] = [
+            value for _, value in self._db.execute("SELECT code, value FROM factor_values ORDER BY code")
+        ]
+        self._codes: Dict[str, int] = {value: code for code, value in enumerate(self._values)}
+
+    @classmethod
+    def from_settings(cls) -> "DetectionStore":
+        """Create the store persisted under DATA_DIR."""
+        return cls(str(Path(settings.data_dir) / "detections.db"))
+
+    def _encode(self, values: List[str]) -> bytes:
+        """Codes of factor values, adding new values to the vocabulary."""
+        codes = []
+        for value in values:
+            code = self._codes.get(value)
+            if code is None:
+                code = self._codes[value] = len(self._values)
+                self._values.append(value)
+                self._db.execute("INSERT INTO factor_values VALUES (?, ?)", (code, value))
+            codes.append(code)
+        return np.array(codes, dtype=_CODE).tobytes()
+
+    def add(
+        self,
+        analysis_id: str,
+        tenant: str,
+        risks: List[Risk],
+        scoring_version: str,
+        overall_risk_score: int,
+        filename: str = "",
+        analyzed_on: str = "",
+        summary: str = ""
+    ) -> None:
+        """
+        Store the detections of a completed analysis, replacing any stored before under its ID.
+
+        Args:
+            analysis_id: Analysis ID
+            tenant: Tenant the analysis belongs to
+            risks: Final risks of the analysis, in result order
+            scoring_version: Scoring table their scores come from
+            overall_risk_score: Overall risk score of the analysis
+            filename: Original file name
+            analyzed_on: Date of the analysis (YYYY-MM-DD)
+            summary: Executive summary of the result
+        """
+        detections = []
+        for risk in risks:
+            detection = asdict(risk)
+            for name in _SCORING_FIELDS:
+                detection.pop(name)
+            detections.append(detection)
+
+        with self._lock:
+            db = self._db
+            try:
+                row = db.execute("SELECT id FROM analyses WHERE analysis_id = ?", (analysis_id,)).fetchone()
+                if row:
+                    db.execute("DELETE FROM analyses WHERE id = ?", row)
+                    db.execute("DELETE FROM detections WHERE analysis = ?", row)
+                    db.execute("DELETE FROM reports WHERE analysis = ?", row)
+                key = db.execute(
+                    "INSERT INTO analyses (analysis_id, tenant, scoring_version, overall_risk_score, impacts, likelihoods) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        analysis_id, tenant, scoring_version, overall_risk_score,
+                        self._encode([str(risk.financial_impact) for risk in risks]),
+                        self._encode([str(risk.likelihood) for risk in risks])
+                    )
+                ).lastrowid
+                db.execute("INSERT INTO detections VALUES (?, ?)", (key, json.dumps(detections, default=str)))
+                db.execute(
+                    "INSERT INTO reports VALUES (?, ?, ?, ?, ?)",
+                    (key, filename, analyzed_on, summary,
+                     json.dumps([risk.remediation_suggestion or "" for risk in risks]))
+                )
+                db.commit()
+            except Exception:
+                db.rollback()
+                self._reload_values()
+                raise
+
+    def _reload_values(self) -> None:
+        """Forget vocabulary entries of a rolled back transaction."""
+        self._values = [value for _, value in self._db.execute("SELECT code, value FROM factor_values ORDER BY code")]
+        self._codes = {value: code for code, value in enumerate(self._values)}
+
+    def detected_risks(self, analysis_id: str) -> Optional[List[dict]]:
+        """Stored detections of an analysis, or None if it is not stored."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT d.risks FROM analyses a JOIN detections d ON d.analysis = a.id WHERE a.analysis_id = ?",
+                (analysis_id,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def export(
+        self,
+        tenant: Optional[str] = None,
+        since: Optional[date] = None,
+        until: Optional[date] = None,
+        chunk_size: int = 1000
+    ) -> Iterator[List[StoredAnalysis]]:
+        """
+        Stored analyses in the order they were stored, a chunk at a time.
+
+        Each chunk is read in its own short query, so storing goes on while
+        an export streams; analyses stored after the export started are not
+        included.
+
+        Args:
+            tenant: Only analyses of this tenant
+            since: Only analyses on or after this date
+            until: Only analyses on or before this date
+            chunk_size: Analyses per chunk
+
+        Yields:
+            Lists of stored analyses
+        """
+        conditions = ["a.id > ?", "a.id <= ?"]
+        parameters: list = []
+        if tenant is not None:
+            conditions.append("a.tenant = ?")
+            parameters.append(tenant)
+        if since is not None:
+            conditions.append("r.analyzed_on >= ?")
+            parameters.append(since.isoformat())
+        if until is not None:
+            conditions.append("r.analyzed_on <= ?")
+            parameters.append(until.isoformat())
+        sql = (
+            "SELECT a.id, a.analysis_id, a.tenant, r.filename, r.analyzed_on, a.overall_risk_score, r.summary, "
+            "d.risks, r.recommendations FROM analyses a JOIN detections d ON d.analysis = a.id "
+            f"LEFT JOIN reports r ON r.analysis = a.id WHERE {' AND '.join(conditions)} ORDER BY a.id LIMIT ?"
+        )
+
+        with self._lock:
+            last = self._db.execute("SELECT max(id) FROM analyses").fetchone()[0] or 0
+        after = 0
+        while True:
+            with self._lock:
+                rows = self._db.execute(sql, (after, last, *parameters, chunk_size)).fetchall()
+            if not rows:
+                return
+            chunk = []
+            for _, analysis_id, tenant_, filename, analyzed_on, overall, summary, risks, recommendations in rows:
+                risks = json.loads(risks)
+                for risk, recommendation in zip(risks, json.loads(recommendations or "[]")):
+                    risk["recommendation"] = recommendation
+                chunk.append(StoredAnalysis(
+                    analysis_id, tenant_, filename or "", analyzed_on or "", overall, summary or "", risks
+                ))
+            yield chunk
+            after = rows[-1][0]
+
+    def versions(self) -> dict:
+        """Number of stored analyses per scoring version."""
+        with self._lock:
+            return dict(self._db.execute(
+                "SELECT scoring_version, count(*) FROM analyses GROUP BY scoring_version"
+            ).fetchall())
+
+    def rescore(self, table: ScoringTable, everything: bool = False) -> Rescoring:
+        """
+        Re-score stored analyses with a scoring table and record the new version.
+
+        Args:
+            table: Scoring table to apply
+            everything: Also re-score analyses already scored with this version
+
+        Returns:
+            The new scores, for updating the places results are kept
+        """
+        stale = "" if everything else "WHERE scoring_version != ?"
+        parameters = () if everything else (table.version,)
+
+        with self._lock:
+            db = self._db
+            rows = db.execute(
+                f"SELECT id, analysis_id, impacts, likelihoods FROM analyses {stale} ORDER BY id", parameters
+            ).fetchall()
+            keys, analysis_ids, impacts, likelihoods = zip(*rows) if rows else ((), (), (), ())
+
+            counts = np.fromiter((len(codes) // _CODE.itemsize for codes in impacts), dtype=np.int64, count=len(rows))
+            grid = table.score_grid(self._values, self._values)
+            scores = grid[
+                np.frombuffer(b"".join(impacts), dtype=_CODE),
+                np.frombuffer(b"".join(likelihoods), dtype=_CODE)
+            ] if self._values else np.zeros(0, dtype=np.int16)
+
+            # Mean score truncated, as in the scoring node; 0 without risks
+            analyses = np.repeat(np.arange(len(rows)), counts)
+            totals = np.bincount(analyses, scores, minlength=len(rows)).astype(np.int64)
+            overall = np.clip(np.where(counts > 0, totals // np.maximum(counts, 1), 0), 0, 100)
+
+            try:
+                db.executemany(
+                    "UPDATE analyses SET scoring_version = ?, overall_risk_score = ? WHERE id = ?",
+                    zip([table.version] * len(rows), overall.tolist(), keys)
+                )
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+
+        return Rescoring(
+            version=table.version,
+            analysis_ids=list(analysis_ids),
+            counts=counts,
+            scores=scores,
+            overall=overall,
+            levels=table.levels()
+        )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT count(*) FROM analyses").fetchone()[0]
+
+
+DETECTIONS = DetectionStore.from_settings()
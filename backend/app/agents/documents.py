@@ -0,0 +1,99 @@
+"""
+Process-wide document store for contract texts under analysis.
+"""
+
+import threading
+import uuid
+from typing import Dict, Optional
+
+from app.core.page_index import PageIndex, TextLocator
+from app.core.text_index import SectionIndex
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class DocumentStore:
+    """
+    Hold each contract text exactly once for the lifetime of its analysis.
+
+    Graph state only carries the document handle; nodes resolve it here
+    (or slice it by offsets) instead of copying the text between steps.
+    """
+
+    def __init__(self):
+        """Initialize an empty store."""
+        self._documents: Dict[str, str] = {}
+        self._page_indexes: Dict[str, PageIndex] = {}
+        self._indexes: Dict[str, SectionIndex] = {}
+        self._locators: Dict[str, TextLocator] = {}
+        self._lock = threading.Lock()
+
+    def put(self, text: str, page_index: Optional[PageIndex] = None, document_id: Optional[str] = None) -> str:
+        """
+        Register a document and return its handle.
+
+        Args:
+            text: Full contract text
+            page_index: Page start offsets (form-feed breaks if omitted)
+            document_id: Handle to reuse (when restoring a checkpointed analysis)
+
+        Returns:
+            Document handle to place in graph state
+        """
+        document_id = document_id or uuid.uuid4().hex
+        with self._lock:
+            self._documents[document_id] = text
+            self._page_indexes[document_id] = page_index or PageIndex.from_text(text)
+        logger.debug(f"Stored document {document_id} ({len(text)} characters)")
+        return document_id
+
+    def get(self, document_id: str) -> str:
+        """Get the full text for a handle ("" if unknown)."""
+        return self._documents.get(document_id, "")
+
+    def slice(self, document_id: str, start: int, end: int) -> str:
+        """Get the text between two character offsets of a document."""
+        return self._documents.get(document_id, "")[start:end]
+
+    def page_index(self, document_id: str) -> PageIndex:
+        """Get the page offset index for a document."""
+        return self._page_indexes.get(document_id) or PageIndex()
+
+    def section_index(self, document_id: str) -> SectionIndex:
+        """Get the keyword index for a document, building it on first use."""
+        index = self._indexes.get(document_id)
+        if index is None:
+            index = SectionIndex(self.get(document_id), self.page_index(document_id).starts)
+            self._remember(self._indexes, document_id, index)
+        return index
+
+    def locator(self, document_id: str) -> TextLocator:
+        """Get the quote locator for a document, building it on first use."""
+        locator = self._locators.get(document_id)
+        if locator is None:
+            locator = TextLocator(self.get(document_id), self.page_index(document_id))
+            self._remember(self._locators, document_id, locator)
+        return locator
+
+    def _remember(self, cache: dict, document_id: str, value) -> None:
+        with self._lock:
+            if document_id in self._documents:
+                cache[document_id] = value
+
+    def release(self, document_id: str) -> None:
+        """Drop a document once its analysis no longer needs it."""
+        with self._lock:
+            self._documents.pop(document_id, None)
+            self._page_indexes.pop(document_id, None)
+            self._indexes.pop(document_id, None)
+            self._locators.pop(document_id, None)
+
+    def __contains__(self, document_id: str) -> bool:
+        return document_id in self._documents
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+
+DOCUMENT_STORE = DocumentStore()
@@ -2,12 +2,26 @@
 LangGraph state machine for contract risk analysis agent.
 """
 
+import asyncio
+import functools
 import logging
 import uuid
 from datetime import datetime
+from typing import Annotated, Callable, List, Optional, get_origin, get_type_hints
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.graph import StateGraph, END
+from app.config import settings
 from app.utils.logger import setup_logger
+from app.utils.metrics import METRICS
 from app.agents.state import ContractAnalysisState
+from app.agents.documents import DOCUMENT_STORE
+from app.agents.progress import PROGRESS
+from app.agents.deadline import DEGRADATION
+from app.agents.checkpoint import CHECKPOINTS, InterruptedRun, SQLiteCheckpointSaver
+from app.core.page_index import PageIndex
+from app.api.schemas.risk import RiskCategory
+from app.agents.nodes.prescreen import prescreen_node
+from app.agents.nodes.reuse import reuse_prior_node, remember_analysis, compare_risks
 from app.agents.nodes.extraction import extract_clauses_node
 from app.agents.nodes.risk_detection import detect_risks_node
 from app.agents.nodes.scoring import score_risks_node
@@ -16,29 +30,136 @@ from app.agents.nodes.remediation import generate_remediation_node
 logger = setup_logger(__name__)
 
 
-def create_analysis_graph():
-    """Create the contract analysis workflow graph."""
+# Times a failing LLM node is run again before its failure stands
+NODE_RETRIES = 1
+
+
+def create_analysis_graph(checkpointer: Optional[BaseCheckpointSaver] = None):
+    """
+    Create the contract analysis workflow graph.
+
+    The cheap pure-Python steps run fused into single graph nodes
+    ("prepare" before extraction, "finalize" after detection), and routing
+    skips work that cannot produce anything: a failed parse ends the run,
+    detection is skipped without clauses or pending categories, and a
+    failing LLM node is retried on its own before the run moves on.
+
+    Args:
+        checkpointer: Saves state after each node, if given
+    """
 
     # Initialize graph
     workflow = StateGraph(ContractAnalysisState)
 
     # Add nodes
-    workflow.add_node("parse", parse_node)
-    workflow.add_node("extract", extract_clauses_node)
-    workflow.add_node("detect_risks", detect_risks_node)
-    workflow.add_node("score_risks", score_risks_node)
-    workflow.add_node("remediation", generate_remediation_node)
+    workflow.add_node("prepare", _fused(
+        _reporting(parse_node), _reporting(prescreen_node), _reporting(reuse_prior_node)
+    ))
+    workflow.add_node("extract", _reporting(_retrying("extract", extract_clauses_node)))
+    workflow.add_node("detect_risks", _reporting(_retrying("detect_risks", detect_risks_node)))
+    workflow.add_node("finalize", _fused(_reporting(score_risks_node), _reporting(generate_remediation_node)))
 
     # Add edges
-    workflow.set_entry_point("parse")
-    workflow.add_edge("parse", "extract")
-    workflow.add_edge("extract", "detect_risks")
-    workflow.add_edge("detect_risks", "score_risks")
-    workflow.add_edge("score_risks", "remediation")
-    workflow.add_edge("remediation", END)
+    workflow.set_entry_point("prepare")
+    workflow.add_conditional_edges("prepare", _after_prepare, {"extract": "extract", "end": END})
+    workflow.add_conditional_edges(
+        "extract", _after_extract,
+        {"extract": "extract", "detect_risks": "detect_risks", "finalize": "finalize"}
+    )
+    workflow.add_conditional_edges(
+        "detect_risks", _after_detect, {"detect_risks": "detect_risks", "finalize": "finalize"}
+    )
+    workflow.add_edge("finalize", END)
 
     # Compile graph
-    return workflow.compile()
+    return workflow.compile(checkpointer=checkpointer)
+
+
+def _after_prepare(state: dict) -> str:
+    """End the run when the input could not be parsed."""
+    return "end" if state.get("current_step") == "parse_failed" else "extract"
+
+
+def _after_extract(state: dict) -> str:
+    """Retry extraction, or skip detection when it has nothing to work on."""
+    step = state.get("current_step")
+    if step == "extract_retrying":
+        return "extract"
+    if step == "extraction_failed" or not state.get("extracted_clauses"):
+        return "finalize"
+    # Pipelined detection (or the pre-screen) may already have covered every category
+    return "detect_risks" if state.get("pending_categories") else "finalize"
+
+
+def _after_detect(state: dict) -> str:
+    """Retry detection once, then finish with whatever was found."""
+    return "detect_risks" if state.get("current_step") == "detect_risks_retrying" else "finalize"
+
+
+# State keys whose updates are appended rather than replaced
+_APPENDED_KEYS = {
+    key for key, hint in get_type_hints(ContractAnalysisState, include_extras=True).items()
+    if get_origin(hint) is Annotated
+}
+
+
+def _fused(*nodes):
+    """
+    Run several nodes as one graph step.
+
+    Each node sees the updates of the ones before it; the combined update is
+    returned. The sequence stops early at a node reporting a *_failed step.
+    """
+    async def fused(state: dict) -> dict:
+        current = dict(state)
+        merged: dict = {}
+        for node in nodes:
+            updates = await node(current)
+            for key, value in updates.items():
+                if key in _APPENDED_KEYS:
+                    merged[key] = merged.get(key, []) + value
+                    current[key] = current.get(key, []) + value
+                else:
+                    merged[key] = current[key] = value
+            if str(updates.get("current_step", "")).endswith("_failed"):
+                break
+        return merged
+    return fused
+
+
+def _retrying(name: str, node):
+    """
+    Wrap an LLM node so a failed run is retried through a self-edge.
+
+    The first NODE_RETRIES failures are turned into a "<name>_retrying" step
+    (their errors are logged, not kept); after that the failure stands.
+    """
+    @functools.wraps(node)
+    async def wrapper(state: dict) -> dict:
+        updates = await node(state)
+        failed = str(updates.get("current_step", "")).endswith("_failed")
+        if failed and state.get("retries", []).count(name) < NODE_RETRIES:
+            logger.warning(f"{name} failed ({'; '.join(updates.get('errors', []))}), retrying")
+            return {"retries": [name], "current_step": f"{name}_retrying"}
+        return updates
+    return wrapper
+
+
+def _reporting(node):
+    """Wrap a node so the step it completes is published on the progress board."""
+    @functools.wraps(node)
+    async def wrapper(state: dict) -> dict:
+        updates = await node(state)
+        step = updates.get("current_step")
+        if step:
+            PROGRESS.report(
+                state.get("document_id", ""),
+                step,
+                clauses=len(updates.get("extracted_clauses", state.get("extracted_clauses", []))),
+                risks=len(updates.get("detected_risks", state.get("detected_risks", [])))
+            )
+        return updates
+    return wrapper
 
 
 async def parse_node(state: dict) -> dict:
@@ -47,67 +168,76 @@ async def parse_node(state: dict) -> dict:
 
     try:
         # Validate required fields
-        if not state.get("contract_text"):
-            state["errors"] = ["No contract text provided"]
-            state["current_step"] = "parse_failed"
-            return state
-
-        # Initialize fields if not present
-        if "analysis_id" not in state:
-            state["analysis_id"] = str(uuid.uuid4())
-
-        if "errors" not in state:
-            state["errors"] = []
-
-        if "extracted_clauses" not in state:
-            state["extracted_clauses"] = []
-
-        if "detected_risks" not in state:
-            state["detected_risks"] = []
-
-        if "scored_risks" not in state:
-            state["scored_risks"] = []
-
-        if "remediation_suggestions" not in state:
-            state["remediation_suggestions"] = []
-
-        if "overall_risk_score" not in state:
-            state["overall_risk_score"] = 0
-
-        if "summary" not in state:
-            state["summary"] = ""
+        if not DOCUMENT_STORE.get(state.get("document_id", "")):
+            return {
+                "errors": ["No contract text provided"],
+                "current_step": "parse_failed"
+            }
 
-        if "is_complete" not in state:
-            state["is_complete"] = False
+        updates = {"current_step": "parse_complete"}
 
-        if "current_step" not in state:
-            state["current_step"] = "parsing"
+        # Initialize fields if not present
+        if not state.get("analysis_id"):
+            updates["analysis_id"] = str(uuid.uuid4())
 
-        logger.info(f"Analysis {state['analysis_id']} initialized")
-        state["current_step"] = "parse_complete"
-        return state
+        logger.info(f"Analysis {updates.get('analysis_id', state.get('analysis_id'))} initialized")
+        return updates
 
     except Exception as e:
         logger.error(f"Parse node error: {str(e)}")
-        state["errors"].append(f"Parse error: {str(e)}")
-        state["current_step"] = "parse_failed"
-        return state
+        return {
+            "errors": [f"Parse error: {str(e)}"],
+            "current_step": "parse_failed"
+        }
 
 
 class AnalysisExecutor:
-    """Execute contract analysis using the compiled graph."""
+    """
+    Execute contract analysis using the compiled graph.
 
-    def __init__(self):
-        """Initialize the analysis executor."""
-        self.graph = create_analysis_graph()
+    With CHECKPOINT_ENABLED, every analysis runs as a graph thread keyed by
+    its analysis ID and its state is saved after each node, so analyses
+    interrupted by a restart can be resumed from the last completed node.
+    """
 
-    async def analyze(self, contract_text: str, filename: str = "contract.pdf") -> dict:
+    def __init__(self, checkpointer: Optional[SQLiteCheckpointSaver] = None):
+        """
+        Initialize the analysis executor.
+
+        Args:
+            checkpointer: Saver to checkpoint to instead of the service's
+                CHECKPOINTS (ignored without CHECKPOINT_ENABLED)
+        """
+        if settings.checkpoint_enabled:
+            self.checkpointer = checkpointer or CHECKPOINTS
+        else:
+            self.checkpointer = None
+        self.graph = create_analysis_graph(self.checkpointer)
+
+    async def analyze(
+        self,
+        contract_text: str,
+        filename: str = "contract.pdf",
+        page_index: Optional[PageIndex] = None,
+        on_progress: Optional[Callable[[dict], None]] = None,
+        analysis_id: Optional[str] = None,
+        revision_of: Optional[str] = None,
+        metadata: Optional[dict] = None
+    ) -> dict:
         """
         Execute analysis on contract text.
 
         Args:
             contract_text: The extracted contract text
             filename: Original filename
+            page_index: Page start offsets within contract_text (PDF only)
+            on_progress: Called with {"step", "progress", "clauses", "risks"}
+                as the analysis advances, including partial extraction results
+            analysis_id: ID to run (and index the result) under; random if omitted
+            revision_of: ID of an earlier analysis this text is a revision of;
+                only its changed clauses are extracted and re-detected
+            metadata: JSON-serializable details kept with the checkpoint for
+                whoever resumes the analysis (see interrupted())
 
         Returns:
             Analysis results dictionary
@@ -117,33 +247,117 @@ class AnalysisExecutor:
         # Count words
         word_count = len(contract_text.split())
 
+        # Store the text once; state only carries its handle
+        document_id = DOCUMENT_STORE.put(contract_text, page_index)
+        analysis_id = analysis_id or str(uuid.uuid4())
+
         # Initialize state
         initial_state: ContractAnalysisState = {
-            "contract_text": contract_text,
+            "document_id": document_id,
             "contract_filename": filename,
-            "page_count": 0,
+            "page_count": page_index.page_count if page_index else 0,
             "word_count": word_count,
+            "deadline": DEGRADATION.new_deadline(),
+            "revision_of": revision_of or "",
+            "reused_from": "",
+            "similarity": 0.0,
+            "reused_clauses": [],
+            "extraction_regions": [],
+            "parent_risks": [],
+            "pending_categories": [c.value for c in RiskCategory],
             "extracted_clauses": [],
             "detected_risks": [],
             "scored_risks": [],
-            "remediation_suggestions": [],
-            "analysis_id": str(uuid.uuid4()),
+            "analysis_id": analysis_id,
             "overall_risk_score": 0,
+            "scoring_version": "",
             "summary": "",
             "current_step": "initialized",
             "errors": [],
+            "degradations": [],
+            "retries": [],
             "is_complete": False
         }
 
+        if self.checkpointer:
+            await asyncio.to_thread(
+                self.checkpointer.register,
+                analysis_id,
+                contract_text,
+                DOCUMENT_STORE.page_index(document_id).starts,
+                {**(metadata or {}), "filename": filename, "revision_of": revision_of}
+            )
+
+        return await self._execute(initial_state, analysis_id, document_id, contract_text, filename, on_progress)
+
+    def interrupted(self) -> List[InterruptedRun]:
+        """Analyses a previous process started but did not finish (empty without checkpointing)."""
+        return self.checkpointer.interrupted() if self.checkpointer else []
+
+    async def resume(
+        self,
+        run: InterruptedRun,
+        on_progress: Optional[Callable[[dict], None]] = None
+    ) -> dict:
+        """
+        Continue an interrupted analysis from its last completed node.
+
+        The contract text is put back into the document store under its old
+        handle and the deadline restarts, since the time spent down does not
+        count against the analysis.
+
+        Args:
+            run: Run returned by interrupted()
+            on_progress: As for analyze()
+
+        Returns:
+            Analysis results dictionary
+        """
+        filename = run.metadata.get("filename", "contract.pdf")
+        page_index = PageIndex(run.page_starts)
+        if run.checkpoint is None:
+            logger.info(f"Restarting analysis {run.thread_id}, interrupted before its first step")
+            return await self.analyze(
+                run.text, filename, page_index, on_progress,
+                analysis_id=run.thread_id,
+                revision_of=run.metadata.get("revision_of"),
+                metadata=run.metadata
+            )
+
+        values = run.checkpoint["channel_values"]
+        logger.info(f"Resuming analysis {run.thread_id} after step {values.get('current_step', 'unknown')}")
+        document_id = DOCUMENT_STORE.put(run.text, page_index, document_id=values["document_id"])
+        await asyncio.to_thread(self.checkpointer.update_values, run.thread_id, deadline=DEGRADATION.new_deadline())
+        METRICS.increment("analyses_resumed")
+        return await self._execute(None, run.thread_id, document_id, run.text, filename, on_progress)
+
+    async def _execute(
+        self,
+        graph_input: Optional[dict],
+        analysis_id: str,
+        document_id: str,
+        contract_text: str,
+        filename: str,
+        on_progress: Optional[Callable[[dict], None]]
+    ) -> dict:
+        """Run (or continue, with no input) the graph thread for an analysis and finish its result."""
+        if on_progress:
+            PROGRESS.subscribe(document_id, on_progress)
+
         try:
             # Invoke graph
-            result = await self.graph.ainvoke(initial_state)
+            result = await self.graph.ainvoke(graph_input, {"configurable": {"thread_id": analysis_id}})
+
+            # Each shortcut is reported once, in the order it was first taken
+            result["degradations"] = list(dict.fromkeys(result.get("degradations", [])))
+            if result["degradations"]:
+                logger.warning(f"Analysis degraded: {', '.join(result['degradations'])}")
 
             # Generate summary
             if result.get("scored_risks"):
                 risk_count = len(result["scored_risks"])
-                critical = sum(1 for r in result["scored_risks"] if r.get("severity_level") == "CRITICAL")
-                high = sum(1 for r in result["scored_risks"] if r.get("severity_level") == "HIGH")
+                critical = sum(1 for r in result["scored_risks"] if r.severity_level == "CRITICAL")
+                high = sum(1 for r in result["scored_risks"] if r.severity_level == "HIGH")
 
                 summary = (
                     f"Analysis complete. Found {risk_count} risks: "
@@ -154,18 +368,41 @@ class AnalysisExecutor:
             else:
                 result["summary"] = "No significant risks detected in contract."
 
+            if result.get("revision_of"):
+                result["revision_changes"] = compare_risks(result.get("parent_risks", []), result.get("scored_risks", []))
+
+            try:
+                await asyncio.to_thread(remember_analysis, result["analysis_id"], contract_text, result)
+            except Exception as e:
+                logger.warning(f"Failed to index analysis for reuse: {str(e)}")
+
+            await self._finish(analysis_id)
             logger.info(f"Analysis {result['analysis_id']} completed")
             return result
 
         except Exception as e:
             logger.error(f"Analysis execution error: {str(e)}", exc_info=True)
+            await self._finish(analysis_id)
             return {
-                "analysis_id": initial_state["analysis_id"],
+                "analysis_id": analysis_id,
                 "contract_filename": filename,
                 "current_step": "execution_failed",
                 "errors": [str(e)],
+                "degradations": [],
                 "is_complete": False,
                 "scored_risks": [],
                 "overall_risk_score": 0,
                 "summary": f"Analysis failed: {str(e)}"
             }
+
+        finally:
+            # A cancelled run (e.g. on shutdown) keeps its checkpoint so it can be resumed
+            PROGRESS.release(document_id)
+            DOCUMENT_STORE.release(document_id)
+
+    async def _finish(self, analysis_id: str) -> None:
+        if self.checkpointer:
+            try:
+                await asyncio.to_thread(self.checkpointer.finish, analysis_id)
+            except Exception as e:
+                logger.warning(f"Failed to clear checkpoint of {analysis_id}: {str(e)}")
@@ -0,0 +1,131 @@
+"""
+Per-node model selection and small-to-large model cascade.
+"""
+
+import logging
+from typing import Awaitable, Callable, Optional, TypeVar
+
+from app.config import settings
+from app.utils.exceptions import LLMError
+from app.utils.logger import setup_logger
+from app.utils.metrics import METRICS
+
+logger = setup_logger(__name__)
+
+R = TypeVar("R")
+
+EXTRACTION = "extraction"
+DETECTION = "detection"
+
+
+def node_model(node: str) -> str:
+    """Configured model for a graph node (OPENAI_MODEL unless overridden)."""
+    overrides = {
+        EXTRACTION: settings.extraction_model,
+        DETECTION: settings.detection_model,
+    }
+    return overrides.get(node) or settings.openai_model
+
+
+class ModelCascade:
+    """
+    Try a small, fast model first and escalate to the node's model when needed.
+
+    A call goes straight to the node's model when the contract is larger than
+    max_chars or the pre-screen already flagged risk_threshold risks. Otherwise
+    the small model runs first, and its output is escalated when it is
+    malformed (unparseable, truncated, repaired) or judged low-confidence by
+    the caller. Calls and escalations, by reason, are counted per node.
+    """
+
+    def __init__(self, enabled: bool, small_model: str, max_chars: int, risk_threshold: int):
+        """
+        Initialize the cascade.
+
+        Args:
+            enabled: Whether the small model is tried at all
+            small_model: Model tried first
+            max_chars: Contracts longer than this skip the small model
+            risk_threshold: Pre-screened risk count at which the small model is skipped
+        """
+        self.enabled = enabled
+        self.small_model = small_model
+        self.max_chars = max_chars
+        self.risk_threshold = risk_threshold
+        self._calls = {}
+        self._escalations = {}
+
+    @classmethod
+    def from_settings(cls) -> "ModelCascade":
+        """Create the cascade configured by the CASCADE_* settings."""
+        return cls(
+            enabled=settings.cascade_enabled,
+            small_model=settings.cascade_small_model,
+            max_chars=settings.cascade_max_chars,
+            risk_threshold=settings.cascade_risk_threshold
+        )
+
+    def _upfront_reason(self, text_length: int, prescreened: int) -> Optional[str]:
+        if text_length > self.max_chars:
+            return "large_contract"
+        if self.risk_threshold and prescreened >= self.risk_threshold:
+            return "high_risk"
+        return None
+
+    def _record(self, node: str, reason: Optional[str]) -> None:
+        self._calls[node] = self._calls.get(node, 0) + 1
+        METRICS.increment(f"cascade_{node}_calls")
+        if reason:
+            self._escalations[node] = self._escalations.get(node, 0) + 1
+            METRICS.increment(f"cascade_{node}_escalations")
+            METRICS.increment(f"cascade_{node}_escalations_{reason}")
+        METRICS.set_gauge(
+            f"cascade_{node}_escalation_rate",
+            round(self._escalations.get(node, 0) / self._calls[node], 4)
+        )
+
+    async def run(
+        self,
+        node: str,
+        attempt: Callable[[str], Awaitable[R]],
+        check: Callable[[R], Optional[str]],
+        text_length: int = 0,
+        prescreened: int = 0
+    ) -> R:
+        """
+        Run a node's LLM work through the cascade.
+
+        Args:
+            node: EXTRACTION or DETECTION
+            attempt: Runs the work with the given model name
+            check: Returns an escalation reason for a small-model result, or None to accept it
+            text_length: Contract length in characters
+            prescreened: Risks already flagged by the pre-screen
+
+        Returns:
+            Result of the accepted attempt
+        """
+        target = node_model(node)
+        if not self.enabled or self.small_model == target:
+            return await attempt(target)
+
+        reason = self._upfront_reason(text_length, prescreened)
+        if reason is None:
+            try:
+                result = await attempt(self.small_model)
+                reason = check(result)
+            except LLMError as e:
+                logger.info(f"Small model output for {node} unusable: {str(e)}")
+                reason = "malformed"
+
+            if reason is None:
+                self._record(node, None)
+                return result
+
+            logger.info(f"Escalating {node} from {self.small_model} to {target}: {reason}")
+
+        self._record(node, reason)
+        return await attempt(target)
+
+
+MODEL_CASCADE = ModelCascade.from_settings()
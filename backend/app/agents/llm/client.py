@@ -0,0 +1,27 @@
+"""
+Chat model construction for the graph nodes.
+"""
+
+from langchain_openai import ChatOpenAI
+from app.config import settings
+
+
+def create_chat_model(**overrides) -> ChatOpenAI:
+    """
+    Create a chat model from settings.
+
+    Client-side retries are disabled: every call goes through the shared
+    adaptive limiter, which needs to see throttling to back off and retries
+    on its own schedule.
+
+    Args:
+        **overrides: ChatOpenAI fields to override (model, temperature, ...)
+    """
+    options = {
+        "api_key": settings.openai_api_key,
+        "model": settings.openai_model,
+        "temperature": settings.openai_temperature,
+        "max_retries": 0,
+    }
+    options.update(overrides)
+    return ChatOpenAI(**options)
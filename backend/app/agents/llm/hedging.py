@@ -0,0 +1,182 @@
+"""
+Hedged LLM requests for tail-latency control.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+from app.config import settings
+from app.utils.logger import setup_logger
+from app.utils.metrics import METRICS
+from app.agents.llm.limiter import LLM_LIMITER
+
+logger = setup_logger(__name__)
+
+T = TypeVar("T")
+
+
+class LatencyTracker:
+    """Sliding window of recent call latencies for one kind of call."""
+
+    def __init__(self, window: int = 200):
+        """Initialize an empty window."""
+        self._samples: Deque[float] = deque(maxlen=window)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def record(self, latency: float) -> None:
+        self._samples.append(latency)
+
+    def percentile(self, p: float) -> float:
+        """Latency at percentile p (0-100) of the window."""
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(len(ordered) * p / 100))
+        return ordered[index]
+
+
+class Hedger:
+    """
+    Fire a duplicate of a slow LLM call and keep whichever answers first.
+
+    Latency is tracked per call kind (e.g. per node output). Once a call has
+    run longer than the configured percentile of recent latencies for its
+    kind, a second identical call is started; the first successful response
+    wins and the other is cancelled. Every call earns a fraction of a hedge
+    from the budget and every hedge spends a whole one, so hedges stay under
+    that fraction of traffic. No hedge is sent while the shared limiter is
+    queueing calls, since the provider is already saturated then.
+    """
+
+    BUDGET_CAP = 5.0  # Hedges that may be saved up for a burst of slow calls
+
+    def __init__(
+        self,
+        enabled: bool,
+        percentile: float = 95.0,
+        budget_percent: float = 5.0,
+        min_samples: int = 20,
+        name: str = "llm"
+    ):
+        """
+        Initialize the hedger.
+
+        Args:
+            enabled: Whether hedges are sent at all
+            percentile: Latency percentile after which a call is hedged
+            budget_percent: Hedges allowed per 100 calls
+            min_samples: Calls of a kind to observe before hedging it
+            name: Metric name prefix
+        """
+        self.enabled = enabled
+        self.percentile = percentile
+        self.budget_ratio = budget_percent / 100
+        self.min_samples = min_samples
+        self.name = name
+        self._trackers: Dict[str, LatencyTracker] = {}
+        self._budget = 0.0
+
+    @classmethod
+    def from_settings(cls) -> "Hedger":
+        """Create the hedger configured by the HEDGE_* settings."""
+        return cls(
+            enabled=settings.hedge_enabled,
+            percentile=settings.hedge_percentile,
+            budget_percent=settings.hedge_budget_percent,
+            min_samples=settings.hedge_min_samples
+        )
+
+    def _delay(self, tracker: LatencyTracker) -> Optional[float]:
+        if not self.enabled or len(tracker) < self.min_samples:
+            return None
+        return tracker.percentile(self.percentile)
+
+    async def call(self, kind: str, operation: Callable[[], Awaitable[T]], tokens: int = 0) -> T:
+        """
+        Run an LLM call through the shared limiter, hedging it if it runs long.
+
+        Args:
+            kind: Latency bucket for this call (e.g. the node's output name)
+            operation: Zero-argument callable returning a fresh awaitable per attempt
+            tokens: Estimated prompt tokens, reported as extra tokens when hedged
+
+        Returns:
+            Result of the first call to succeed
+        """
+        return await self.race(kind, lambda: LLM_LIMITER.call(operation), tokens)
+
+    async def race(
+        self,
+        kind: str,
+        launch: Callable[[], Awaitable[T]],
+        tokens: int = 0,
+        discard: Optional[Callable[[T], None]] = None
+    ) -> T:
+        """
+        Hedge an operation that takes its own limiter slot.
+
+        Used directly for streamed replies, where launch() resolves once the
+        first item has arrived, so the stream is hedged on time to first item
+        and the winning stream is read to the end unhedged. A losing attempt
+        is cancelled, or handed to discard() if it succeeded at the same time.
+
+        Args:
+            kind: Latency bucket for this operation
+            launch: Zero-argument callable returning a fresh awaitable per attempt
+            tokens: Estimated prompt tokens, reported as extra tokens when hedged
+            discard: Releases the result of an attempt that finished but lost
+
+        Returns:
+            Result of the first attempt to succeed
+        """
+        tracker = self._trackers.setdefault(kind, LatencyTracker())
+        self._budget = min(self.BUDGET_CAP, self._budget + self.budget_ratio)
+        delay = self._delay(tracker)
+        started = time.monotonic()
+
+        primary = asyncio.ensure_future(launch())
+        hedge = winner = None
+        try:
+            if delay is not None:
+                await asyncio.wait({primary}, timeout=delay)
+
+            if primary.done() or delay is None or self._budget < 1 or LLM_LIMITER.queued:
+                winner = primary
+                result = await primary
+                tracker.record(time.monotonic() - started)
+                return result
+
+            self._budget -= 1
+            METRICS.increment(f"{self.name}_hedged_calls")
+            METRICS.increment(f"{self.name}_hedge_extra_tokens", tokens)
+            logger.info(f"Hedging {kind} call after {delay:.1f}s")
+            hedge = asyncio.ensure_future(launch())
+
+            pending = {primary, hedge}
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            METRICS.increment(f"{self.name}_hedge_wins")
+                        tracker.record(time.monotonic() - started)
+                        winner = task
+                        return task.result()
+                    error = task.exception()
+            raise error
+
+        finally:
+            for task in (primary, hedge):
+                if task is None or task is winner:
+                    continue
+                if not task.done():
+                    task.cancel()
+                elif discard is not None and not task.cancelled() and task.exception() is None:
+                    discard(task.result())
+
+
+LLM_HEDGER = Hedger.from_settings()
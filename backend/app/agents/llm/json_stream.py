@@ -0,0 +1,151 @@
+"""
+Incremental JSON array parser for LLM responses.
+"""
+
+import json
+import logging
+import re
+from typing import Any, List
+
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class JSONArrayStream:
+    """
+    Parse the first JSON array in a (possibly streamed) response.
+
+    Text can be fed in arbitrary chunks; every array element is decoded as
+    soon as its closing bracket arrives. The scanner jumps between structural
+    characters with compiled regexes instead of walking the text one
+    character at a time, and only keeps the unconsumed tail in memory.
+
+    Surrounding text (markdown fences, prose, a wrapping object such as
+    {"clauses": [...]}) is skipped. Elements are objects, arrays or strings,
+    so a bracket only opens the array when one of those or the closing
+    bracket follows it; prose such as "[see below]" or "[1]" ahead of the
+    real array is skipped too. If the response is cut off, the elements
+    completed so far are the repaired array.
+    """
+
+    _STRUCTURAL = re.compile(r'[\[\]{}"]')
+    _STRING_END = re.compile(r'["\\]')
+    _ARRAY_START = re.compile(r'\[\s*(\S?)')
+
+    def __init__(self):
+        """Initialize an empty parser."""
+        self._buffer = ""
+        self._pos = 0
+        self._started = False    # Inside the top-level array
+        self._depth = 0          # Nesting depth within the current element
+        self._in_string = False
+        self._item_start = -1
+        self.complete = False    # Closing bracket of the array was seen
+        self.invalid_items = 0   # Elements that were not valid JSON
+        self.items: List[Any] = []
+
+    def feed(self, chunk: str) -> List[Any]:
+        """
+        Consume a chunk of text.
+
+        Returns:
+            Elements completed by this chunk
+        """
+        if self.complete or not chunk:
+            return []
+
+        self._buffer += chunk
+        completed: List[Any] = []
+        buffer = self._buffer
+        pos = self._pos
+
+        while not self._started:
+            start = buffer.find("[", pos)
+            if start == -1:
+                self._buffer = ""
+                self._pos = 0
+                return completed
+            follower = self._ARRAY_START.match(buffer, start).group(1)
+            if not follower:
+                # Only whitespace after the bracket so far; decide on the next chunk
+                self._buffer = buffer[start:]
+                self._pos = 0
+                return completed
+            self._started = follower in '[]{"'
+            pos = start + 1
+
+        while True:
+            if self._in_string:
+                match = self._STRING_END.search(buffer, pos)
+                if match is None:
+                    pos = len(buffer)
+                    break
+                if match.group() == "\\":
+                    if match.end() >= len(buffer):
+                        # Escape split across chunks; resume at the backslash
+                        pos = match.start()
+                        break
+                    pos = match.end() + 1
+                    continue
+                self._in_string = False
+                pos = match.end()
+                if self._depth == 0:
+                    self._emit(buffer, pos, completed)
+                continue
+
+            match = self._STRUCTURAL.search(buffer, pos)
+            if match is None:
+                pos = len(buffer)
+                break
+
+            char = match.group()
+            pos = match.end()
+            if char == '"':
+                if self._depth == 0:
+                    self._item_start = match.start()
+                self._in_string = True
+            elif char in "[{":
+                if self._depth == 0:
+                    self._item_start = match.start()
+                self._depth += 1
+            elif self._depth == 0:
+                if char == "]":
+                    self.complete = True
+                    break
+            else:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._emit(buffer, pos, completed)
+
+        # Keep only what an unfinished element still needs
+        keep_from = self._item_start if self._item_start != -1 else pos
+        self._buffer = buffer[keep_from:]
+        self._pos = pos - keep_from
+        if self._item_start != -1:
+            self._item_start = 0
+        return completed
+
+    def _emit(self, buffer: str, end: int, completed: List[Any]) -> None:
+        raw = buffer[self._item_start:end]
+        self._item_start = -1
+        try:
+            item = json.loads(raw)
+        except json.JSONDecodeError as e:
+            self.invalid_items += 1
+            logger.debug(f"Skipping invalid array element: {e}")
+            return
+        self.items.append(item)
+        completed.append(item)
+
+    @property
+    def truncated(self) -> bool:
+        """True if the array was opened but never closed."""
+        return self._started and not self.complete
+
+    @classmethod
+    def parse(cls, text: str) -> "JSONArrayStream":
+        """Parse a complete response in one go."""
+        stream = cls()
+        stream.feed(text)
+        return stream
@@ -0,0 +1,247 @@
+"""
+Adaptive concurrency limiter for outbound LLM calls.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, Deque, Optional, TypeVar
+
+import openai
+
+from app.config import settings
+from app.utils.logger import setup_logger
+from app.utils.metrics import METRICS
+
+logger = setup_logger(__name__)
+
+T = TypeVar("T")
+
+# Statuses that mean the provider is shedding load
+OVERLOAD_STATUSES = {429, 503, 529}
+
+
+def is_overload(error: BaseException) -> bool:
+    """True for errors that signal throttling or an overloaded provider."""
+    if isinstance(error, (openai.RateLimitError, openai.APITimeoutError, asyncio.TimeoutError)):
+        return True
+    return isinstance(error, openai.APIStatusError) and error.status_code in OVERLOAD_STATUSES
+
+
+def is_retryable(error: BaseException) -> bool:
+    """True for transient errors worth retrying."""
+    return is_overload(error) or isinstance(error, (openai.APIConnectionError, openai.InternalServerError))
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """Seconds the provider asked us to wait, from the Retry-After headers if present."""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+
+    headers = response.headers
+    try:
+        if "retry-after-ms" in headers:
+            return float(headers["retry-after-ms"]) / 1000
+        if "retry-after" in headers:
+            return float(headers["retry-after"])
+    except ValueError:
+        # HTTP-date form; fall back to our own backoff
+        return None
+    return None
+
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limit shared by all LLM calls.
+
+    Each call holds a permit for its duration. While responses come back with
+    latency close to the best seen recently, the limit grows by roughly one
+    permit per limit's worth of successful calls (additive increase). A 429,
+    overload status or timeout cuts it by BACKOFF (multiplicative decrease),
+    at most once per recent latency so a burst of throttled in-flight calls
+    counts as one congestion signal. Throttled calls are retried with
+    jittered exponential backoff, waiting at least as long as Retry-After.
+    """
+
+    BACKOFF = 0.5
+    LATENCY_TOLERANCE = 2.0  # Grow only while latency <= tolerance * baseline
+    RETRY_BASE_SECONDS = 1.0
+    RETRY_CAP_SECONDS = 60.0
+
+    def __init__(self, initial: int, minimum: int = 1, maximum: int = 32, max_retries: int = 4, name: str = "llm"):
+        """
+        Initialize the limiter.
+
+        Args:
+            initial: Starting concurrency limit
+            minimum: Lowest limit backoff can reach
+            maximum: Highest limit growth can reach
+            max_retries: Retries per call for transient errors
+            name: Metric name prefix
+        """
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = float(min(self.maximum, max(self.minimum, initial)))
+        self.max_retries = max_retries
+        self.name = name
+
+        self._in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._baseline: Optional[float] = None  # Smoothed minimum latency
+        self._last_decrease = 0.0
+        self._publish()
+
+    @classmethod
+    def from_settings(cls) -> "AdaptiveLimiter":
+        """Create the limiter configured by the LLM_* concurrency settings."""
+        return cls(
+            initial=settings.llm_initial_concurrency,
+            minimum=settings.llm_min_concurrency,
+            maximum=settings.llm_max_concurrency,
+            max_retries=settings.llm_max_retries
+        )
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def _capacity(self) -> int:
+        return int(self.limit)
+
+    def _publish(self) -> None:
+        METRICS.set_gauge(f"{self.name}_concurrency_limit", round(self.limit, 2))
+        METRICS.set_gauge(f"{self.name}_in_flight", self._in_flight)
+        METRICS.set_gauge(f"{self.name}_queued", len(self._waiters))
+
+    async def acquire(self) -> None:
+        """Wait for a permit."""
+        if self._in_flight < self._capacity() and not self._waiters:
+            self._in_flight += 1
+            self._publish()
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._publish()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Permit was handed over just as we were cancelled
+                self.release()
+            else:
+                self._waiters.remove(waiter)
+                self._publish()
+            raise
+
+    def release(self) -> None:
+        """Return a permit and wake queued callers that now fit under the limit."""
+        self._in_flight -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        while self._waiters and self._in_flight < self._capacity():
+            waiter = self._waiters.popleft()
+            if waiter.done():
+                continue
+            self._in_flight += 1
+            waiter.set_result(None)
+        self._publish()
+
+    def on_success(self, latency: float) -> None:
+        """Record a successful call; grow the limit while latency is stable."""
+        if self._baseline is None or latency < self._baseline:
+            self._baseline = latency
+        else:
+            # Let the baseline drift up slowly so it follows real changes in call size
+            self._baseline = 0.95 * self._baseline + 0.05 * latency
+
+        if latency <= self._baseline * self.LATENCY_TOLERANCE and self.limit < self.maximum:
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self._wake()
+
+    def on_overload(self) -> None:
+        """Record a throttled or timed-out call; back off multiplicatively."""
+        METRICS.increment(f"{self.name}_throttled")
+        now = time.monotonic()
+        if now - self._last_decrease < (self._baseline or 1.0):
+            return
+
+        self._last_decrease = now
+        previous = self.limit
+        self.limit = max(self.minimum, self.limit * self.BACKOFF)
+        self._publish()
+        logger.warning(f"LLM provider overloaded, concurrency limit {previous:.1f} -> {self.limit:.1f}")
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold a permit for one call and feed its outcome back into the limit."""
+        await self.acquire()
+        METRICS.increment(f"{self.name}_requests")
+        started = time.monotonic()
+        try:
+            yield
+        except Exception as e:
+            if is_overload(e):
+                self.on_overload()
+            raise
+        else:
+            self.on_success(time.monotonic() - started)
+        finally:
+            self.release()
+
+    def retry_delay(self, error: BaseException, attempt: int) -> Optional[float]:
+        """
+        Delay before retrying a failed call.
+
+        Args:
+            error: The failure
+            attempt: Number of retries already made
+
+        Returns:
+            Seconds to wait, or None if the call should not be retried
+        """
+        if attempt >= self.max_retries or not is_retryable(error):
+            return None
+
+        backoff = min(self.RETRY_CAP_SECONDS, self.RETRY_BASE_SECONDS * 2 ** attempt)
+        delay = random.uniform(backoff / 2, backoff)
+        requested = retry_after(error)
+        if requested is not None:
+            delay = max(delay, requested + random.uniform(0, 0.1 * requested + 0.1))
+        return min(delay, self.RETRY_CAP_SECONDS)
+
+    async def call(self, operation: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run an LLM call under the limiter, retrying transient failures.
+
+        Args:
+            operation: Zero-argument callable returning a fresh awaitable per attempt
+
+        Returns:
+            Result of the first successful attempt
+        """
+        attempt = 0
+        while True:
+            try:
+                async with self.slot():
+                    return await operation()
+            except Exception as e:
+                delay = self.retry_delay(e, attempt)
+                if delay is None:
+                    raise
+                attempt += 1
+                METRICS.increment(f"{self.name}_retries")
+                logger.warning(f"LLM call failed ({type(e).__name__}), retry {attempt} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+
+LLM_LIMITER = AdaptiveLimiter.from_settings()
@@ -0,0 +1,146 @@
+"""
+Output schemas for structured LLM responses.
+"""
+
+from typing import List, Literal, Optional, Sequence, Type
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+
+
+Level = Literal["LOW", "MEDIUM", "HIGH"]
+
+
+class ClauseOutput(BaseModel):
+    """A clause as returned by the extraction model."""
+    model_config = ConfigDict(extra="ignore")
+
+    section: str = Field(..., description="Category name")
+    title: str = Field(..., description="Specific topic")
+    text: str = Field(..., description="Exact quote from contract or description if missing")
+    status: Literal["present", "missing"] = Field(default="present")
+
+    @field_validator("status", mode="before")
+    @classmethod
+    def _lower_status(cls, value):
+        return str(value or "present").strip().lower()
+
+
+class RiskOutput(BaseModel):
+    """A risk as returned by the detection model."""
+    model_config = ConfigDict(extra="ignore")
+
+    category: str = Field(..., description="Risk category")
+    title: str = Field(..., description="Short risk title")
+    description: str = Field(default="", description="Detailed description")
+    affected_clause: str = Field(default="", description="Which clause")
+    explanation: str = Field(default="", description="Why it's risky")
+    evidence: List[str] = Field(default_factory=list, description="Relevant quotes")
+    financial_impact: Level = Field(default="MEDIUM")
+    likelihood: Level = Field(default="MEDIUM")
+    confidence: float = Field(default=1.0, description="How certain the model is, 0.0 to 1.0")
+
+    @field_validator("category", mode="before")
+    @classmethod
+    def _normalize_category(cls, value):
+        return str(value or "").strip().lower().replace(" ", "_")
+
+    @field_validator("financial_impact", "likelihood", mode="before")
+    @classmethod
+    def _upper_level(cls, value):
+        return str(value or "MEDIUM").strip().upper()
+
+    @field_validator("confidence", mode="before")
+    @classmethod
+    def _clamp_confidence(cls, value):
+        try:
+            return min(1.0, max(0.0, float(value)))
+        except (TypeError, ValueError):
+            return 1.0
+
+    @field_validator("evidence", mode="before")
+    @classmethod
+    def _evidence_list(cls, value):
+        if isinstance(value, str):
+            return [value]
+        return value or []
+
+
+class OutputSpec:
+    """
+    Describe a structured response: a JSON object holding one array of items.
+
+    Provides the strict JSON schema sent to the model and validates the items
+    parsed from its reply.
+    """
+
+    def __init__(self, name: str, model: Type[BaseModel], enums: Optional[dict] = None):
+        """
+        Initialize the spec.
+
+        Args:
+            name: Key of the array in the response object (e.g. "clauses")
+            model: Pydantic model for one item
+            enums: Optional {field: allowed values} restrictions
+        """
+        self.name = name
+        self.model = model
+        self.enums = enums or {}
+
+    def json_schema(self) -> dict:
+        """Strict JSON schema for the response object."""
+        item = _strict(self.model.model_json_schema())
+        for field_name, values in self.enums.items():
+            item["properties"][field_name] = {"type": "string", "enum": list(values)}
+
+        return {
+            "type": "object",
+            "properties": {self.name: {"type": "array", "items": item}},
+            "required": [self.name],
+            "additionalProperties": False
+        }
+
+    def response_format(self) -> dict:
+        """OpenAI response_format parameter for schema-constrained output."""
+        return {
+            "type": "json_schema",
+            "json_schema": {"name": self.name, "strict": True, "schema": self.json_schema()}
+        }
+
+    def validate(self, item) -> Optional[BaseModel]:
+        """Validate one parsed item (None if it does not match the schema)."""
+        if not isinstance(item, dict):
+            return None
+        try:
+            parsed = self.model.model_validate(item)
+        except ValueError:
+            return None
+
+        for field_name, values in self.enums.items():
+            if getattr(parsed, field_name) not in values:
+                return None
+        return parsed
+
+
+def _strict(schema: dict) -> dict:
+    """Make a pydantic JSON schema acceptable for strict structured outputs."""
+    strict = {}
+    for key, value in schema.items():
+        if key in ("title", "default", "description"):
+            continue
+        if key == "properties":
+            value = {name: _strict(prop) for name, prop in value.items()}
+        elif isinstance(value, dict):
+            value = _strict(value)
+        strict[key] = value
+
+    if strict.get("type") == "object" and "properties" in strict:
+        strict["required"] = list(strict["properties"])
+        strict["additionalProperties"] = False
+    return strict
+
+
+CLAUSES_OUTPUT = OutputSpec("clauses", ClauseOutput)
+
+
+def risks_output(categories: Sequence[str]) -> OutputSpec:
+    """Risk output spec restricted to the given categories."""
+    return OutputSpec("risks", RiskOutput, enums={"category": list(categories)})
@@ -0,0 +1,263 @@
+"""
+Structured-output calls shared by the graph nodes.
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, List, Optional
+
+from app.config import settings
+from app.utils.logger import setup_logger
+from app.utils.exceptions import LLMError
+from app.agents.llm.json_stream import JSONArrayStream
+from app.agents.llm.hedging import LLM_HEDGER
+from app.agents.llm.limiter import LLM_LIMITER
+from app.agents.llm.schemas import OutputSpec
+
+logger = setup_logger(__name__)
+
+
+RETRY_INSTRUCTION = (
+    "\n\nYour previous reply could not be parsed. Respond with ONLY a JSON object "
+    'of the form {{"{name}": [...]}} and nothing else.'
+)
+
+
+@dataclass
+class StructuredResult:
+    """Validated items parsed from a structured LLM response."""
+    items: List[Any] = field(default_factory=list)  # Validated pydantic models
+    complete: bool = False   # Response array was closed
+    repaired: bool = False   # Truncated or partially invalid output was salvaged
+    retried: bool = False    # A second call was needed
+    dropped: int = 0         # Items that failed JSON decoding or validation
+    raw_text: str = ""
+
+
+def _usable(items: int, complete: bool, dropped: int) -> bool:
+    """Whether a parsed response can be used: some valid items, or an array that was closed empty."""
+    return items > 0 or (complete and dropped == 0)
+
+
+def bind_output(llm, spec: OutputSpec):
+    """Ask the model for schema-constrained output, per STRUCTURED_OUTPUT_MODE."""
+    mode = settings.structured_output_mode
+    if mode == "json_schema":
+        return llm.bind(response_format=spec.response_format())
+    if mode == "json_object":
+        return llm.bind(response_format={"type": "json_object"})
+    return llm
+
+
+def parse_structured(text: str, spec: OutputSpec) -> StructuredResult:
+    """Parse and validate a complete response."""
+    stream = JSONArrayStream.parse(text)
+    return _collect(stream, stream.items, spec, text)
+
+
+def _collect(stream: JSONArrayStream, raw_items: list, spec: OutputSpec, text: str) -> StructuredResult:
+    items = [item for item in (spec.validate(raw) for raw in raw_items) if item is not None]
+    dropped = stream.invalid_items + len(raw_items) - len(items)
+    return StructuredResult(
+        items=items,
+        complete=stream.complete,
+        repaired=bool(items) and (stream.truncated or dropped > 0),
+        dropped=dropped,
+        raw_text=text
+    )
+
+
+async def invoke_structured(llm, prompt: str, spec: OutputSpec) -> StructuredResult:
+    """
+    Call the model and return validated items.
+
+    The response is requested as schema-constrained JSON and parsed with the
+    incremental array parser, so a reply cut off mid-array still yields every
+    completed item. Only when nothing usable can be recovered (no valid item,
+    and no cleanly closed empty array) is the call retried once, with an
+    explicit format reminder.
+
+    Raises:
+        LLMError: If neither attempt produced a usable response
+    """
+    bound = bind_output(llm, spec)
+    tokens = len(prompt) // 4
+
+    response = await LLM_HEDGER.call(spec.name, lambda: bound.ainvoke(prompt), tokens)
+    result = parse_structured(response.content, spec)
+    if _usable(len(result.items), result.complete, result.dropped):
+        if result.repaired:
+            logger.warning(
+                f"Repaired {spec.name} output: kept {len(result.items)} items, "
+                f"dropped {result.dropped}, truncated={not result.complete}"
+            )
+        return result
+
+    logger.warning(f"Could not parse {spec.name} output, retrying once. First 200 chars: {response.content[:200]}")
+    retry_prompt = prompt + RETRY_INSTRUCTION.format(name=spec.name)
+    response = await LLM_HEDGER.call(spec.name, lambda: bound.ainvoke(retry_prompt), tokens)
+    result = parse_structured(response.content, spec)
+    result.retried = True
+    if _usable(len(result.items), result.complete, result.dropped):
+        return result
+
+    raise LLMError(f"Could not parse {spec.name} from LLM response")
+
+
+class _Stream:
+    """
+    One streamed reply, read in a background task under its own limiter slot.
+
+    Parsed items are queued for the consumer, so the slot (and the latency
+    the limiter learns from) covers the provider's stream only, never the
+    time the consumer spends on each item.
+    """
+
+    _END = object()
+
+    def __init__(self, bound, prompt: str):
+        self.parser = JSONArrayStream()
+        self.items: asyncio.Queue = asyncio.Queue()
+        self.head = ""
+        self.received = 0
+        self.error: Optional[Exception] = None
+        self._first = asyncio.get_running_loop().create_future()
+        self._task = asyncio.create_task(self._read(bound, prompt))
+
+    async def _read(self, bound, prompt: str) -> None:
+        try:
+            async with LLM_LIMITER.slot():
+                async for chunk in bound.astream(prompt):
+                    text = chunk.content
+                    if len(self.head) < 200:
+                        self.head += text
+                    for raw in self.parser.feed(text):
+                        self.received += 1
+                        self.items.put_nowait(raw)
+                        if not self._first.done():
+                            self._first.set_result(None)
+        except Exception as e:
+            self.error = e
+        finally:
+            self.items.put_nowait(self._END)
+            if not self._first.done():
+                self._first.set_result(None)
+
+    async def __aiter__(self) -> AsyncIterator[Any]:
+        while True:
+            raw = await self.items.get()
+            if raw is self._END:
+                return
+            yield raw
+
+    def close(self) -> None:
+        """Stop reading the provider's stream."""
+        self._task.cancel()
+
+    @classmethod
+    async def open(cls, bound, prompt: str) -> "_Stream":
+        """
+        Start a stream and wait for its first item (or its end).
+
+        Raises:
+            Exception: The provider error, if the stream failed before any item
+        """
+        stream = cls(bound, prompt)
+        try:
+            await asyncio.shield(stream._first)
+        except BaseException:
+            stream.close()
+            raise
+        if stream.error is not None and not stream.received:
+            raise stream.error
+        return stream
+
+
+async def stream_structured(
+    llm,
+    prompt: str,
+    spec: OutputSpec,
+    stats: Optional[StructuredResult] = None
+) -> AsyncIterator[Any]:
+    """
+    Stream the model's reply and yield each validated item as soon as it completes.
+
+    Callers can start working on early items while the rest of the array is
+    still being generated. The stream is hedged on time to first item (a
+    slow start is raced against a second stream) and retried while it fails
+    before producing anything. If the reply yields nothing usable, the call
+    is retried once without streaming, like invoke_structured.
+
+    Args:
+        llm: Chat model
+        prompt: Prompt text
+        spec: Expected output
+        stats: Optional result whose complete/repaired/retried/dropped flags
+            are filled in once the stream is exhausted (items are not kept)
+
+    Raises:
+        LLMError: If neither attempt produced a usable response
+    """
+    bound = bind_output(llm, spec)
+    tokens = len(prompt) // 4
+    yielded = 0
+    dropped = 0
+
+    attempt = 0
+    while True:
+        try:
+            stream = await LLM_HEDGER.race(
+                f"{spec.name}_first_item", lambda: _Stream.open(bound, prompt), tokens, discard=_Stream.close
+            )
+            break
+        except Exception as e:
+            delay = LLM_LIMITER.retry_delay(e, attempt)
+            if delay is None:
+                raise
+            attempt += 1
+            logger.warning(f"Streaming {spec.name} failed ({type(e).__name__}), retry {attempt} in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+    try:
+        async for raw in stream:
+            item = spec.validate(raw)
+            if item is None:
+                dropped += 1
+                continue
+            yielded += 1
+            yield item
+    finally:
+        stream.close()
+    if stream.error is not None:
+        # Items already handed out cannot be taken back, so a stream failing midway is not retried
+        raise stream.error
+
+    dropped += stream.parser.invalid_items
+    if _usable(yielded, stream.parser.complete, dropped):
+        repaired = bool(yielded) and (stream.parser.truncated or dropped > 0)
+        if repaired:
+            logger.warning(
+                f"Repaired {spec.name} output: kept {yielded} items, "
+                f"dropped {dropped}, truncated={stream.parser.truncated}"
+            )
+        if stats is not None:
+            stats.complete = stream.parser.complete
+            stats.repaired = repaired
+            stats.dropped = dropped
+        return
+
+    logger.warning(f"Could not parse streamed {spec.name} output, retrying once. First 200 chars: {stream.head[:200]}")
+    retry_prompt = prompt + RETRY_INSTRUCTION.format(name=spec.name)
+    response = await LLM_HEDGER.call(spec.name, lambda: bound.ainvoke(retry_prompt), tokens)
+    result = parse_structured(response.content, spec)
+    if not _usable(len(result.items), result.complete, result.dropped):
+        raise LLMError(f"Could not parse {spec.name} from LLM response")
+
+    if stats is not None:
+        stats.complete = result.complete
+        stats.repaired = result.repaired
+        stats.dropped = result.dropped
+        stats.retried = True
+    for item in result.items:
+        yield item
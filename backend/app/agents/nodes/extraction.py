@@ -2,111 +2,219 @@
 Clause extraction node for the analysis graph.
 """
 
-import json
+import asyncio
 import logging
-from typing import Any
-from langchain_openai import ChatOpenAI
+from contextlib import aclosing
+from typing import List, Optional, Tuple
 from app.config import settings
 from app.utils.logger import setup_logger
-from app.agents.prompts.extraction_prompts import EXTRACT_CLAUSES_PROMPT
+from app.agents.state import Clause, Risk
+from app.agents.documents import DOCUMENT_STORE
+from app.agents.progress import PROGRESS
+from app.agents.deadline import DEGRADATION, SMALL_MODEL, TRUNCATED_CLAUSES
+from app.agents.llm.cascade import EXTRACTION, MODEL_CASCADE
+from app.agents.llm.client import create_chat_model
+from app.agents.llm.schemas import CLAUSES_OUTPUT
+from app.agents.llm.structured import StructuredResult, stream_structured
+from app.agents.nodes.risk_detection import detect_risks_within_deadline, merge_risks
+from app.agents.prompts.extraction_prompts import EXTRACT_CLAUSES_PROMPT, EXTRACT_CHANGED_REGIONS_PROMPT
 
 logger = setup_logger(__name__)
 
 
 async def extract_clauses_node(state: dict) -> dict:
-    """Extract key clauses from contract using LLM."""
+    """
+    Extract key clauses from contract using LLM.
+
+    The reply is streamed and clauses are parsed as soon as each one
+    completes. With DETECTION_BATCH_SIZE > 0, risk detection is started on
+    every full batch of clauses while extraction is still generating, so the
+    two LLM stages overlap; the detect node then has nothing left to do.
+
+    Close to the analysis deadline or under load, extraction runs on the
+    small model and stops early with the clauses it has.
+
+    When the reuse node matched a near-duplicate prior analysis, only the
+    changed regions of the text are sent to the model and the carried-over
+    clauses are merged in.
+    """
     logger.info("Starting clause extraction...")
 
     try:
-        contract_text = state.get("contract_text", "")
+        contract_text = DOCUMENT_STORE.get(state.get("document_id", ""))
         if not contract_text:
-            state["errors"].append("No contract text available for extraction")
-            return state
-
-        # Initialize LLM
-        llm = ChatOpenAI(
-            api_key=settings.openai_api_key,
-            model=settings.openai_model,
-            temperature=settings.openai_temperature
-        )
+            return {"errors": ["No contract text available for extraction"]}
 
         # Format prompt
-        prompt = EXTRACT_CLAUSES_PROMPT.format(contract_text=contract_text)
-
-        # Call LLM
-        response = await llm.ainvoke(prompt)
-        response_text = response.content
-
-        # Parse JSON response with robust extraction
-        try:
-            clauses = _parse_json_response(response_text, logger)
-
-            if clauses is None:
-                logger.warning("Could not parse clauses from LLM response, using fallback")
-                state["extracted_clauses"] = [{"text": response_text, "section": "full_text"}]
-            else:
-                state["extracted_clauses"] = clauses
-                state["current_step"] = "extraction_complete"
-                logger.info(f"Successfully extracted {len(clauses)} clauses")
-
-        except Exception as json_err:
-            logger.warning(f"JSON parsing error in extraction: {str(json_err)}")
-            state["extracted_clauses"] = [{"text": response_text, "section": "full_text"}]
-
-        return state
+        regions = state.get("extraction_regions") or []
+        if state.get("reused_from"):
+            if not regions:
+                logger.info(f"Contract unchanged since {state['reused_from']}, reusing all clauses")
+                return {
+                    "extracted_clauses": list(state.get("reused_clauses") or []),
+                    "current_step": "extraction_complete"
+                }
+            excerpts = "\n---\n".join(contract_text[start:end].strip() for start, end in regions)
+            prompt = EXTRACT_CHANGED_REGIONS_PROMPT.format(excerpts=excerpts)
+            text_length = len(excerpts)
+        else:
+            prompt = EXTRACT_CLAUSES_PROMPT.format(contract_text=contract_text)
+            text_length = len(contract_text)
+
+        small_model = DEGRADATION.small_model(EXTRACTION, state)
+        if small_model:
+            updates, _ = await _extract(small_model, prompt, state)
+            updates["degradations"].append(SMALL_MODEL)
+        else:
+            updates, _ = await MODEL_CASCADE.run(
+                EXTRACTION,
+                lambda model: _extract(model, prompt, state),
+                _extraction_issue,
+                text_length=text_length
+            )
+        return updates
 
     except Exception as e:
         logger.error(f"Clause extraction error: {str(e)}", exc_info=True)
-        state["errors"].append(f"Extraction error: {str(e)}")
-        state["current_step"] = "extraction_failed"
-        return state
+        return {
+            "errors": [f"Extraction error: {str(e)}"],
+            "current_step": "extraction_failed"
+        }
 
 
-def _parse_json_response(response_text: str, logger) -> list | None:
+async def _extract(model: str, prompt: str, state: dict) -> Tuple[dict, StructuredResult]:
     """
-    Robustly extract JSON array from LLM response.
+    Stream clauses from one model, running pipelined detection alongside.
 
-    Handles responses with markdown, extra text, etc.
-    """
-    import re
+    Clauses reused from a prior analysis are seeded into the result before
+    streaming starts, and into the detection batches unless their risks were
+    carried over from a parent revision (risks on missing clauses never are).
 
-    # Strategy 1: Look for ```json...``` code block
-    json_block = re.search(r'```(?:json)?\s*\n([\s\S]*?)\n```', response_text)
-    if json_block:
-        try:
-            return json.loads(json_block.group(1))
-        except json.JSONDecodeError as e:
-            logger.debug(f"Failed to parse JSON from code block: {e}")
+    Returns:
+        Tuple of (state updates, stream statistics)
+    """
+    document_id = state["document_id"]
+    llm = create_chat_model(model=model)
+    stats = StructuredResult()
+    tasks: List[asyncio.Task] = []
+
+    prescreened = list(state.get("detected_risks", []))
+    categories = list(state.get("pending_categories") or [])
+    batch_size = settings.detection_batch_size if categories else 0
+    locator = DOCUMENT_STORE.locator(document_id)
+
+    records: List[Clause] = list(state.get("reused_clauses") or [])
+    batch: List[Clause] = []
+    found: List[List[Risk]] = []
+    degradations: List[str] = []
+    hint = 0
+    clause_limit = DEGRADATION.clause_limit(state)
+    truncated = False
+
+    def report() -> None:
+        risks = len(prescreened) + len(merge_risks(found))
+        PROGRESS.report(document_id, "extracting", clauses=len(records), risks=risks)
+
+    async def detect_batch(clauses: List[Clause]) -> List[Risk]:
+        risks = await detect_risks_within_deadline(clauses, categories, state, degradations)
+        found.append(risks)
+        report()
+        return risks
+
+    def add_to_batch(clause: Clause) -> None:
+        nonlocal batch
+        batch.append(clause)
+        if len(batch) >= batch_size:
+            tasks.append(asyncio.create_task(detect_batch(batch)))
+            batch = []
 
-    # Strategy 2: Look for [...] pattern (more conservative)
-    # This uses a different approach - find first [ and match brackets
-    try:
-        start_idx = response_text.find('[')
-        if start_idx != -1:
-            # Try to find matching closing bracket
-            bracket_count = 0
-            end_idx = -1
-            for i in range(start_idx, len(response_text)):
-                if response_text[i] == '[':
-                    bracket_count += 1
-                elif response_text[i] == ']':
-                    bracket_count -= 1
-                    if bracket_count == 0:
-                        end_idx = i + 1
-                        break
-
-            if end_idx != -1:
-                json_str = response_text[start_idx:end_idx]
-                return json.loads(json_str)
-    except json.JSONDecodeError as e:
-        logger.debug(f"Failed to parse bracketed JSON: {e}")
-
-    # Strategy 3: Try direct JSON parsing (last resort)
     try:
-        return json.loads(response_text)
-    except json.JSONDecodeError as e:
-        logger.debug(f"Failed direct JSON parse: {e}")
+        if batch_size:
+            for clause in records:
+                # Risks of a revision's unchanged clauses were carried over, except on missing clauses
+                if not state.get("revision_of") or clause.status == "missing":
+                    add_to_batch(clause)
 
-    # All strategies failed
-    logger.error(f"Could not extract JSON from response. First 200 chars: {response_text[:200]}")
+        # Consume clauses as the JSON array streams in, until done or out of time
+        try:
+            async with asyncio.timeout(DEGRADATION.cutoff(state, DEGRADATION.EXTRACTION_CUTOFF_SHARE)):
+                async with aclosing(stream_structured(llm, prompt, CLAUSES_OUTPUT, stats)) as items:
+                    async for item in items:
+                        clause = Clause.from_dict(item.model_dump())
+                        hint = _locate_clause(clause, locator, hint)
+                        records.append(clause)
+                        report()
+
+                        if batch_size:
+                            add_to_batch(clause)
+
+                        if clause_limit and len(records) >= clause_limit:
+                            truncated = True
+                            break
+        except TimeoutError:
+            truncated = True
+
+        if truncated:
+            logger.warning(f"Clause extraction cut short at {len(records)} clauses (deadline or load)")
+            degradations.append(TRUNCATED_CLAUSES)
+
+        stats.items = records
+        logger.info(f"Successfully extracted {len(records)} clauses with {model}")
+        updates = {
+            "extracted_clauses": records,
+            "degradations": degradations,
+            "current_step": "extraction_complete"
+        }
+        if not batch_size or not records:
+            return updates, stats
+
+        if batch:
+            tasks.append(asyncio.create_task(detect_batch(batch)))
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        failures = [r for r in results if isinstance(r, BaseException)]
+        if failures:
+            # Leave the categories pending so the detect node reruns on all clauses
+            logger.warning(f"Pipelined risk detection failed ({str(failures[0])}), deferring to detect node")
+            return updates, stats
+
+        risks = merge_risks(results)
+        logger.info(f"Detected {len(risks)} risks in {len(results)} batches during extraction")
+        updates.update({
+            # Drop repeats of pre-screened or carried-over risks detected again
+            "detected_risks": merge_risks([prescreened, risks]),
+            "pending_categories": []
+        })
+        return updates, stats
+
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+
+def _extraction_issue(result: Tuple[dict, StructuredResult]) -> Optional[str]:
+    """Reason to escalate a small-model extraction, if any."""
+    updates, stats = result
+    if TRUNCATED_CLAUSES in updates["degradations"]:
+        return None  # Cut short on purpose; there is no time to escalate
+    if not stats.items or not stats.complete or stats.repaired:
+        return "malformed"
     return None
+
+
+def _locate_clause(clause: Clause, locator, hint: int) -> int:
+    """
+    Fill in offsets and page reference for a clause quoted from the contract.
+
+    Returns:
+        Search hint for the next clause (clauses usually arrive in document order)
+    """
+    if clause.status == "missing":
+        return hint
+    location = locator.locate(clause.text, hint)
+    if location is None:
+        return hint
+    clause.start = location.start
+    clause.end = location.end
+    clause.page_reference = location.page
+    return location.end
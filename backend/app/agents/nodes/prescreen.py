@@ -0,0 +1,88 @@
+"""
+Rule-based pre-screen node for the analysis graph.
+"""
+
+import logging
+from app.config import settings
+from app.utils.logger import setup_logger
+from app.agents.state import Risk
+from app.agents.documents import DOCUMENT_STORE
+from app.api.schemas.risk import RiskCategory
+
+logger = setup_logger(__name__)
+
+
+# Risk categories that are decided by the absence of a section, mapped to the
+# SectionIndex section whose keywords count as supporting text.
+ABSENCE_RULES = {
+    RiskCategory.MISSING_INSURANCE.value: {
+        "section": "insurance",
+        "title": "Missing Insurance Requirements",
+        "description": "The contract does not contain any insurance provisions.",
+        "explanation": (
+            "Without insurance requirements the company carries the full cost of "
+            "accidents, negligence and professional errors by the other party."
+        ),
+        "financial_impact": "HIGH",
+        "likelihood": "MEDIUM"
+    },
+    RiskCategory.MISSING_TERMINATION.value: {
+        "section": "termination",
+        "title": "Missing Termination Clause",
+        "description": "The contract does not define how or when it can be terminated.",
+        "explanation": (
+            "With no exit mechanism or notice period the parties may be locked into "
+            "the agreement or exposed to disputes when ending it."
+        ),
+        "financial_impact": "MEDIUM",
+        "likelihood": "HIGH"
+    }
+}
+
+
+async def prescreen_node(state: dict) -> dict:
+    """Resolve structurally obvious risks without the LLM."""
+    logger.info("Starting rule-based pre-screen...")
+
+    if not settings.prescreen_enabled:
+        return {}
+
+    try:
+        document_id = state.get("document_id", "")
+        if not DOCUMENT_STORE.get(document_id):
+            return {}
+
+        index = DOCUMENT_STORE.section_index(document_id)
+
+        pending = list(state.get("pending_categories") or [c.value for c in RiskCategory])
+        detected = list(state.get("detected_risks", []))
+
+        for category, rule in ABSENCE_RULES.items():
+            if category not in pending or index.count(rule["section"]):
+                continue
+
+            detected.append(Risk(
+                category=category,
+                title=rule["title"],
+                description=rule["description"],
+                affected_clause=f"None ({rule['section']} provisions not found)",
+                explanation=rule["explanation"],
+                evidence=[f"No {rule['section']} provisions found in contract text"],
+                financial_impact=rule["financial_impact"],
+                likelihood=rule["likelihood"]
+            ))
+            pending.remove(category)
+
+        logger.info(
+            f"Pre-screen resolved {len(detected) - len(state.get('detected_risks', []))} "
+            f"categories; {len(pending)} left for LLM detection"
+        )
+        return {
+            "detected_risks": detected,
+            "pending_categories": pending,
+            "current_step": "prescreen_complete"
+        }
+
+    except Exception as e:
+        logger.error(f"Pre-screen error: {str(e)}")
+        return {"errors": [f"Pre-screen error: {str(e)}"]}
@@ -4,9 +4,11 @@ Remediation suggestion node for the analysis graph.
 
 import json
 import logging
+from dataclasses import replace
 from langchain_openai import ChatOpenAI
 from app.config import settings
 from app.utils.logger import setup_logger
+from app.agents.deadline import DEGRADATION, SKIPPED_REMEDIATION
 
 logger = setup_logger(__name__)
 
@@ -18,41 +20,49 @@ async def generate_remediation_node(state: dict) -> dict:
     try:
         risks = state.get("scored_risks", [])
         if not risks:
-            state["remediation_suggestions"] = []
-            return state
+            return {}
 
-        remediation_suggestions = []
+        if DEGRADATION.skip_remediation(state):
+            logger.warning("Analysis deadline close, skipping remediation")
+            return {
+                "degradations": [SKIPPED_REMEDIATION],
+                "current_step": "remediation_skipped",
+                "is_complete": True
+            }
+
+        remediated_risks = []
 
         for risk in risks:
             try:
                 # Default remediation
-                suggestion = f"Review and negotiate the {risk.get('title', 'risk')} with legal counsel."
+                suggestion = f"Review and negotiate the {risk.title or 'risk'} with legal counsel."
 
-                risk["remediation"] = {
-                    "suggestion": suggestion,
-                    "priority": risk.get("severity_level", "MEDIUM"),
-                    "effort": "MEDIUM"
-                }
-                remediation_suggestions.append(risk["remediation"])
+                remediated_risks.append(replace(
+                    risk,
+                    remediation_suggestion=suggestion,
+                    remediation_priority=risk.severity_level or "MEDIUM",
+                    remediation_effort="MEDIUM"
+                ))
 
             except Exception as e:
                 logger.warning(f"Error generating remediation: {str(e)}")
-                risk["remediation"] = {
-                    "suggestion": "Review and negotiate this clause",
-                    "priority": risk.get("severity_level", "MEDIUM"),
-                    "effort": "MEDIUM"
-                }
-                remediation_suggestions.append(risk["remediation"])
-
-        state["remediation_suggestions"] = remediation_suggestions
-        state["current_step"] = "remediation_complete"
-        state["is_complete"] = True
+                remediated_risks.append(replace(
+                    risk,
+                    remediation_suggestion="Review and negotiate this clause",
+                    remediation_priority=risk.severity_level or "MEDIUM",
+                    remediation_effort="MEDIUM"
+                ))
 
         logger.info("Remediation generation complete")
-        return state
+        return {
+            "scored_risks": remediated_risks,
+            "current_step": "remediation_complete",
+            "is_complete": True
+        }
 
     except Exception as e:
         logger.error(f"Remediation generation error: {str(e)}")
-        state["errors"].append(f"Remediation error: {str(e)}")
-        state["current_step"] = "remediation_failed"
-        return state
+        return {
+            "errors": [f"Remediation error: {str(e)}"],
+            "current_step": "remediation_failed"
+        }
@@ -0,0 +1,320 @@
+"""
+Reuse of prior analyses (near-duplicates and revisions) for the analysis graph.
+"""
+
+import asyncio
+import logging
+from dataclasses import asdict, replace
+from typing import List, Optional, Tuple
+from app.config import settings
+from app.utils.logger import setup_logger
+from app.utils.metrics import METRICS
+from app.agents.state import Clause, Risk
+from app.agents.documents import DOCUMENT_STORE
+from app.agents.nodes.risk_detection import merge_risks
+from app.core.page_index import TextLocation
+from app.core.similarity import SIMILARITY_INDEX
+from app.core.text_diff import TextDiff, merge_spans
+from app.core.text_index import SectionIndex
+
+logger = setup_logger(__name__)
+
+# Changed regions closer than this are extracted as one excerpt
+REGION_GAP_CHARS = 200
+
+
+async def reuse_prior_node(state: dict) -> dict:
+    """
+    Reuse the clause extraction of a prior analysis of (nearly) the same text.
+
+    With revision_of set, the prior analysis is the named parent. Otherwise,
+    with SIMILARITY_ENABLED, it is the most similar indexed analysis under
+    the same settings, if at least SIMILARITY_THRESHOLD similar. Its clauses
+    lying in unchanged text are carried over (with offsets moved to the new
+    text) and only the changed regions are left for the extraction node.
+
+    For a revision, risks whose evidence lies in unchanged text are carried
+    over as well, so detection only runs on changed and added clauses.
+    """
+    revision_of = state.get("revision_of")
+    if not revision_of and not settings.similarity_enabled:
+        return {}
+
+    try:
+        document_id = state.get("document_id", "")
+        contract_text = DOCUMENT_STORE.get(document_id)
+        if not contract_text:
+            return {}
+
+        if revision_of:
+            match = await asyncio.to_thread(_load_parent, revision_of, contract_text)
+            if match is None:
+                logger.warning(f"Parent analysis {revision_of} not in the index, running a full analysis")
+                return {"revision_of": ""}
+        else:
+            match = await asyncio.to_thread(_find_prior, contract_text)
+            if match is None:
+                METRICS.increment("reuse_misses")
+                return {}
+
+        prior, similarity = match
+        # Diffing and re-anchoring are CPU-bound (seconds on multi-megabyte texts)
+        diff = await asyncio.to_thread(TextDiff, prior.text, contract_text)
+        locator = DOCUMENT_STORE.locator(document_id)
+        parent_clauses = [Clause(**data) for data in prior.payload.get("clauses", [])]
+        index = DOCUMENT_STORE.section_index(document_id)
+        clauses, regions = await asyncio.to_thread(
+            plan_reuse, [replace(clause) for clause in parent_clauses], diff, locator, index
+        )
+
+        METRICS.increment("reuse_hits")
+        logger.info(
+            f"Reusing {len(clauses)} clauses from {prior.key} (similarity {similarity:.2f}); "
+            f"{len(regions)} changed regions, {sum(e - s for s, e in regions)} characters left to extract"
+        )
+        updates = {
+            "reused_from": prior.key,
+            "similarity": round(similarity, 4),
+            "reused_clauses": clauses,
+            "extraction_regions": regions
+        }
+        if revision_of:
+            parent_risks = [_risk_from_payload(data) for data in prior.payload.get("risks", [])]
+            carried = await asyncio.to_thread(carry_risks, parent_risks, parent_clauses, clauses, diff, locator)
+            logger.info(f"Carried over {len(carried)} of {len(parent_risks)} risks from {prior.key}")
+            updates.update({
+                "parent_risks": parent_risks,
+                "detected_risks": merge_risks([state.get("detected_risks", []), carried]),
+                "pending_categories": _pending_categories(state, parent_risks, parent_clauses)
+            })
+        return updates
+
+    except Exception as e:
+        # Reuse is an optimization; fall back to a full extraction
+        logger.warning(f"Prior analysis lookup failed: {str(e)}")
+        return {}
+
+
+def _find_prior(contract_text: str):
+    """Nearest indexed analysis above the threshold, as (document, similarity)."""
+    signature = SIMILARITY_INDEX.signature(contract_text)
+    nearest = SIMILARITY_INDEX.nearest(signature, settings.analysis_fingerprint())
+    if nearest is None or nearest[1] < settings.similarity_threshold:
+        return None
+    prior = SIMILARITY_INDEX.get(nearest[0])
+    return (prior, nearest[1]) if prior else None
+
+
+def _load_parent(analysis_id: str, contract_text: str):
+    """A named parent analysis, as (document, similarity)."""
+    parent = SIMILARITY_INDEX.get(analysis_id)
+    if parent is None:
+        return None
+    return parent, SIMILARITY_INDEX.similarity(analysis_id, SIMILARITY_INDEX.signature(contract_text))
+
+
+def _risk_from_payload(data: dict) -> Risk:
+    """Rebuild a risk record stored by remember_analysis()."""
+    locations = [TextLocation(**loc) if loc else None for loc in data.get("evidence_locations", [])]
+    return Risk(**{**data, "evidence_locations": locations})
+
+
+def plan_reuse(
+    clauses: List[Clause],
+    diff: TextDiff,
+    locator,
+    index: SectionIndex
+) -> Tuple[List[Clause], List[Tuple[int, int]]]:
+    """
+    Split prior clauses into reusable ones and text to extract again.
+
+    Present clauses quoted entirely from unchanged text are moved to their new
+    offsets. Those touching a change are dropped, and whatever is left of
+    their text is added to the changed regions so it is extracted again.
+    Missing-clause findings are kept unless the changed text now has keyword
+    hits for the section they are about (see missing_sections), in which case
+    the clause is expected to come back from extracting the changed regions.
+
+    Args:
+        clauses: Clauses of the prior analysis, with prior offsets
+        diff: Diff from the prior text to the new one
+        locator: Quote locator over the new text
+        index: Keyword index over the new text
+
+    Returns:
+        Tuple of (reused clauses, changed regions of the new text to extract)
+    """
+    reused: List[Clause] = []
+    changed = diff.changed_regions()
+    regions = list(changed)
+
+    for clause in clauses:
+        if clause.status == "missing":
+            sections = missing_sections(clause)
+            if not any(index.count_between(section, s, e) for section in sections for s, e in changed):
+                reused.append(clause)
+            continue
+
+        if clause.start is None or clause.end is None:
+            # Never located in the prior text; keep it if its quote is intact and unchanged
+            location = locator.locate(clause.text)
+            if location and not any(s < location.end and location.start < e for s, e in changed):
+                clause.start, clause.end, clause.page_reference = location.start, location.end, location.page
+                reused.append(clause)
+            continue
+
+        start = diff.map_span(clause.start, clause.end)
+        if start is None:
+            survived = diff.project(clause.start, clause.end)
+            if survived:
+                regions.append(survived)
+            continue
+
+        clause.end = start + (clause.end - clause.start)
+        clause.start = start
+        clause.page_reference = locator.page_index.page_of(start)
+        reused.append(clause)
+
+    return reused, merge_spans(regions, REGION_GAP_CHARS)
+
+
+def carry_risks(
+    risks: List[Risk],
+    parent_clauses: List[Clause],
+    reused_clauses: List[Clause],
+    diff: TextDiff,
+    locator
+) -> List[Risk]:
+    """
+    Parent risks that still hold in the revised text.
+
+    A risk is carried over when every located evidence quote lies in
+    unchanged text (its locations are moved to the new offsets), or, without
+    located evidence, when its affected clause was reused. Risks on a clause
+    that changed, or on a missing clause (which an edit anywhere may have
+    supplied), are left for detection to find again.
+
+    Args:
+        risks: Final risks of the parent analysis
+        parent_clauses: Clauses of the parent analysis
+        reused_clauses: Parent clauses carried into the revision
+        diff: Diff from the parent text to the revision
+        locator: Quote locator over the revision
+
+    Returns:
+        Carried-over risks
+    """
+    reused = {clause.title.lower() for clause in reused_clauses}
+    changed = {clause.title.lower() for clause in parent_clauses} - reused
+    missing = {clause.title.lower() for clause in parent_clauses if clause.status == "missing"}
+    carried: List[Risk] = []
+
+    for risk in risks:
+        affected = risk.affected_clause.lower()
+        if affected in changed or affected in missing:
+            continue
+
+        if not any(risk.evidence_locations):
+            if affected in reused:
+                carried.append(replace(risk))
+            continue
+
+        moved: List[Optional[TextLocation]] = []
+        for location in risk.evidence_locations:
+            if location is None:
+                moved.append(None)
+                continue
+            start = diff.map_span(location.start, location.end)
+            if start is None:
+                break
+            end = start + (location.end - location.start)
+            moved.append(TextLocation(locator.page_index.page_of(start), start, end))
+        else:
+            carried.append(replace(risk, evidence_locations=moved))
+
+    return carried
+
+
+def missing_sections(clause: Clause) -> List[str]:
+    """
+    SectionIndex sections a missing-clause finding is about.
+
+    Keywords in the title ("Missing Insurance Requirement") decide; the
+    description is only consulted when the title has none, since it often
+    names neighbouring topics ("no insurance or liability cap").
+    """
+    for text in (clause.title, clause.text):
+        sections = [section for section, hits in SectionIndex(text).counts().items() if hits]
+        if sections:
+            return sections
+    return []
+
+
+def _pending_categories(state: dict, parent_risks: List[Risk], parent_clauses: List[Clause]) -> List[str]:
+    """
+    Categories left for detection, with those of parent risks on missing clauses added back.
+
+    Those risks are never carried over, so their categories are checked
+    again unless the pre-screen already settled them on the new text.
+    """
+    pending = list(state.get("pending_categories") or [])
+    settled = {risk.category for risk in state.get("detected_risks", [])}
+    missing = {clause.title.lower() for clause in parent_clauses if clause.status == "missing"}
+    for risk in parent_risks:
+        if risk.affected_clause.lower() in missing and risk.category not in pending and risk.category not in settled:
+            pending.append(risk.category)
+    return pending
+
+
+def compare_risks(previous: List[Risk], current: List[Risk]) -> dict:
+    """
+    Risk changes between a parent analysis and its revision.
+
+    Risks are matched by category and title.
+
+    Returns:
+        Dictionary with "appeared", "disappeared" and "changed" (severity) lists
+    """
+    def key(risk: Risk) -> Tuple[str, str]:
+        return risk.category, risk.title.strip().lower()
+
+    def describe(risk: Risk) -> dict:
+        return {"category": risk.category, "title": risk.title, "severity_level": risk.severity_level}
+
+    before = {key(risk): risk for risk in previous}
+    after = {key(risk): risk for risk in current}
+    return {
+        "appeared": [describe(risk) for k, risk in after.items() if k not in before],
+        "disappeared": [describe(risk) for k, risk in before.items() if k not in after],
+        "changed": [
+            {**describe(risk), "previous_severity_level": before[k].severity_level}
+            for k, risk in after.items()
+            if k in before and before[k].severity_level != risk.severity_level
+        ]
+    }
+
+
+def remember_analysis(analysis_id: str, contract_text: str, result: dict) -> None:
+    """
+    Index a finished analysis so near-duplicates and revisions can reuse it.
+
+    Analyses with any error or degradation (extraction cut short, the small
+    model under pressure, rule-based detection only, skipped remediation) are
+    not indexed, so reuse never spreads a degraded result.
+    """
+    clauses = result.get("extracted_clauses") or []
+    if not clauses or result.get("errors") or result.get("degradations"):
+        return
+
+    SIMILARITY_INDEX.add(
+        analysis_id,
+        contract_text,
+        SIMILARITY_INDEX.signature(contract_text),
+        {
+            "filename": result.get("contract_filename", ""),
+            "clauses": [asdict(clause) for clause in clauses],
+            "risks": [asdict(risk) for risk in result.get("scored_risks", [])]
+        },
+        tag=settings.analysis_fingerprint()
+    )
+    logger.info(f"Indexed analysis {analysis_id} for reuse ({len(SIMILARITY_INDEX)} indexed)")
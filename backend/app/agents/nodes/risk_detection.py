@@ -2,12 +2,21 @@
 Risk detection node for the analysis graph.
 """
 
-import json
+import asyncio
+import hashlib
 import logging
-import re
-from langchain_openai import ChatOpenAI
+from typing import Iterable, List, Optional, Tuple
 from app.config import settings
 from app.utils.logger import setup_logger
+from app.utils.metrics import METRICS
+from app.core.clause_memo import CLAUSE_MEMO, clause_fingerprint
+from app.agents.state import Clause, Risk
+from app.agents.documents import DOCUMENT_STORE
+from app.agents.deadline import DEGRADATION, RULE_BASED_ONLY, SMALL_MODEL
+from app.agents.llm.cascade import DETECTION, MODEL_CASCADE, node_model
+from app.agents.llm.client import create_chat_model
+from app.agents.llm.schemas import risks_output
+from app.agents.llm.structured import StructuredResult, invoke_structured
 
 logger = setup_logger(__name__)
 
@@ -17,31 +26,87 @@ async def detect_risks_node(state: dict) -> dict:
     logger.info("Starting risk detection...")
 
     try:
+        # Risks already resolved by the pre-screen (or by detection pipelined with extraction)
+        prescreened = list(state.get("detected_risks", []))
+        categories = state.get("pending_categories") or []
+        if not categories:
+            logger.info("No risk categories pending, skipping LLM detection")
+            return {"current_step": "risk_detection_complete"}
+
         clauses = state.get("extracted_clauses", [])
+        if state.get("revision_of"):
+            # Risks of clauses unchanged since the parent analysis were carried over (except missing ones)
+            reused = {(c.title, c.start) for c in state.get("reused_clauses", []) if c.status != "missing"}
+            clauses = [c for c in clauses if (c.title, c.start) not in reused]
+            if not clauses:
+                logger.info("No changed clauses in revision, skipping LLM detection")
+                return {"pending_categories": [], "current_step": "risk_detection_complete"}
+
         if not clauses:
             logger.warning("No clauses available for risk detection")
-            state["detected_risks"] = []
-            return state
-
-        # Simple clause formatting
-        clauses_text = "\n".join([
-            f"- {c.get('title', 'Unknown')}: {c.get('text', '')}"
-            for c in clauses
-        ])
-
-        llm = ChatOpenAI(
-            api_key=settings.openai_api_key,
-            model=settings.openai_model,
-            temperature=settings.openai_temperature
-        )
+            return {}
+
+        degradations = []
+        records = await detect_risks_within_deadline(clauses, categories, state, degradations)
+        logger.info(f"Detected {len(records)} risks")
+        return {
+            "detected_risks": merge_risks([prescreened, records]),
+            "degradations": degradations,
+            "current_step": "risk_detection_complete"
+        }
+
+    except Exception as e:
+        logger.error(f"Risk detection error: {str(e)}")
+        return {
+            "errors": [f"Risk detection error: {str(e)}"],
+            "current_step": "risk_detection_failed"
+        }
 
-        # Simple prompt
-        prompt = f"""Analyze these contract clauses and identify risks:
+
+async def detect_risks_within_deadline(
+    clauses: List[Clause],
+    categories: List[str],
+    state: dict,
+    degradations: List[str]
+) -> List[Risk]:
+    """
+    Run risk detection, degrading it when the analysis is short on time or the system is saturated.
+
+    Args:
+        clauses: Clauses to analyze
+        categories: Risk categories the model may report
+        state: Graph state (document handle, deadline, pre-screened risks)
+        degradations: Receives the degradations applied
+
+    Returns:
+        Detected risks (empty when detection was skipped or cut off)
+    """
+    if DEGRADATION.skip_detection(state):
+        logger.warning("Analysis deadline close, skipping LLM risk detection")
+        degradations.append(RULE_BASED_ONLY)
+        return []
+
+    model = DEGRADATION.small_model(DETECTION, state)
+    if model:
+        degradations.append(SMALL_MODEL)
+
+    try:
+        async with asyncio.timeout(DEGRADATION.cutoff(state, DEGRADATION.DETECTION_CUTOFF_SHARE)):
+            return await detect_risks(
+                clauses, categories, state["document_id"], len(state.get("detected_risks", [])), model
+            )
+    except TimeoutError:
+        logger.warning("Analysis deadline reached during risk detection, keeping rule-based results")
+        degradations.append(RULE_BASED_ONLY)
+        return []
+
+
+DETECTION_PROMPT = """Analyze these contract clauses and identify risks:
 
 {clauses_text}
 
-Return a JSON array with detected risks. For each risk include:
-- category: one of 'missing_insurance', 'uncapped_liability', 'vague_payment_terms', 'broad_indemnification', 'missing_termination', 'ambiguous_scope'
+Return a JSON object of the form {{"risks": [...]}} with detected risks. For each risk include:
+- category: one of {category_list}
 - title: short risk title
 - description: detailed description
 - affected_clause: which clause
@@ -49,62 +114,200 @@ Return a JSON array with detected risks. For each risk include:
 - evidence: list of relevant quotes
 - financial_impact: LOW, MEDIUM, or HIGH
 - likelihood: LOW, MEDIUM, or HIGH
+- confidence: 0.0 to 1.0, how certain you are that this is a real risk
 
-Return ONLY the JSON array, no markdown or extra text."""
+Return ONLY the JSON object, no markdown or extra text."""
 
-        response = await llm.ainvoke(prompt)
-        response_text = response.content
+# Memoized assessments are only reused under the same prompt and detection model
+_PROMPT_DIGEST = hashlib.sha256(DETECTION_PROMPT.encode("utf-8")).hexdigest()[:12]
 
-        # Extract JSON
-        risks = _extract_json_array(response_text)
-        if risks:
-            # Normalize categories to lowercase
-            for risk in risks:
-                if "category" in risk:
-                    risk["category"] = str(risk["category"]).lower().replace(" ", "_")
 
-            state["detected_risks"] = risks
-            state["current_step"] = "risk_detection_complete"
-            logger.info(f"Detected {len(risks)} risks")
-        else:
-            logger.warning("Could not parse risks from response")
-            state["detected_risks"] = []
-            state["errors"].append("Failed to detect risks")
+def memo_version(model: Optional[str] = None) -> str:
+    """Version of clause-level detection results produced by a model (default: the detection model)."""
+    return f"{_PROMPT_DIGEST}:{model or node_model(DETECTION)}"
 
-        return state
 
-    except Exception as e:
-        logger.error(f"Risk detection error: {str(e)}")
-        state["errors"].append(f"Risk detection error: {str(e)}")
-        state["current_step"] = "risk_detection_failed"
-        state["detected_risks"] = []
-        return state
-
-
-def _extract_json_array(text: str) -> list | None:
-    """Extract JSON array from text."""
-    # Try code block first
-    match = re.search(r'```(?:json)?\s*\n([\s\S]*?)\n```', text)
-    if match:
-        try:
-            return json.loads(match.group(1))
-        except json.JSONDecodeError:
-            pass
-
-    # Try direct parse
-    try:
-        return json.loads(text)
-    except json.JSONDecodeError:
-        pass
+async def detect_risks(
+    clauses: List[Clause],
+    categories: List[str],
+    document_id: str,
+    prescreened: int = 0,
+    model: Optional[str] = None
+) -> List[Risk]:
+    """
+    Run LLM risk detection over a set of clauses.
 
-    # Try to find [ ] brackets
-    try:
-        start = text.find('[')
-        if start != -1:
-            end = text.rfind(']')
-            if end > start:
-                return json.loads(text[start:end+1])
-    except json.JSONDecodeError:
-        pass
+    With CLAUSE_MEMO_ENABLED, clauses whose wording was already judged
+    (in any contract) get their memoized risks back and only the rest are
+    sent to the model. Fresh results are memoized per clause when every risk
+    can be attributed to one of the clauses sent, under the version of the
+    model that actually answered, so answers of a small model (forced or
+    accepted by the cascade) are never served as the detection model's.
+
+    Args:
+        clauses: Clauses to analyze (all of them, or one streamed batch)
+        categories: Risk categories the model may report
+        document_id: Document handle, used to locate evidence quotes
+        prescreened: Risks already flagged by the pre-screen (cascade input)
+        model: Run on this model only, bypassing the cascade
+
+    Returns:
+        Detected risks with evidence locations filled in
+    """
+    locator = DOCUMENT_STORE.locator(document_id)
+    fingerprints = [clause_fingerprint(c.text) for c in clauses]
+    version = memo_version()
+
+    memoized = {}
+    if settings.clause_memo_enabled:
+        memoized = await asyncio.to_thread(CLAUSE_MEMO.lookup, fingerprints, version, categories)
+        METRICS.increment("clause_memo_hits", sum(fp in memoized for fp in fingerprints))
+        METRICS.increment("clause_memo_misses", sum(fp not in memoized for fp in fingerprints))
+
+    records = []
+    for clause, fingerprint in zip(clauses, fingerprints):
+        for data in memoized.get(fingerprint, ()):
+            risk = Risk.from_dict(data)
+            risk.affected_clause = clause.title
+            records.append(risk)
+    _locate_evidence(records, clauses, locator)
+
+    fresh = [clause for clause, fingerprint in zip(clauses, fingerprints) if fingerprint not in memoized]
+    if fresh:
+        detected, answered_by = await _detect_with_llm(fresh, categories, document_id, prescreened, model)
+        _locate_evidence(detected, fresh, locator)
+        records.extend(detected)
+
+        if settings.clause_memo_enabled:
+            entries = _attribute_risks(detected, fresh)
+            if entries is None:
+                logger.info("Some detected risks do not name a single clause, not memoizing this batch")
+            else:
+                await asyncio.to_thread(CLAUSE_MEMO.store, entries, memo_version(answered_by), categories)
+    elif clauses:
+        logger.info(f"All {len(clauses)} clauses memoized, skipping LLM detection")
 
+    return records
+
+
+async def _detect_with_llm(
+    clauses: List[Clause],
+    categories: List[str],
+    document_id: str,
+    prescreened: int,
+    model: Optional[str]
+) -> Tuple[List[Risk], str]:
+    """Ask the model for the risks in a set of clauses, returning them and the model that answered."""
+    # Simple clause formatting
+    clauses_text = "\n".join([
+        f"- {c.title or 'Unknown'}: {c.text}"
+        for c in clauses
+    ])
+
+    category_list = ", ".join(f"'{c}'" for c in categories)
+
+    # Simple prompt
+    prompt = DETECTION_PROMPT.format(clauses_text=clauses_text, category_list=category_list)
+
+    spec = risks_output(categories)
+    attempted = []
+
+    async def attempt(name: str) -> StructuredResult:
+        attempted.append(name)
+        return await invoke_structured(create_chat_model(model=name), prompt, spec)
+
+    if model:
+        result = await attempt(model)
+    else:
+        # The cascade returns the last attempt, so attempted[-1] answered
+        result = await MODEL_CASCADE.run(
+            DETECTION,
+            attempt,
+            _detection_issue,
+            text_length=len(DOCUMENT_STORE.get(document_id)),
+            prescreened=prescreened
+        )
+
+    # Build risk records (categories already normalized by validation)
+    return [Risk.from_dict(r.model_dump()) for r in result.items], attempted[-1]
+
+
+def _attribute_risks(risks: List[Risk], clauses: List[Clause]) -> Optional[List[Tuple[str, List[dict]]]]:
+    """
+    Assign each risk to the clause it was found in, for the clause memo.
+
+    A risk belongs to the clause named by its affected_clause, or else to the
+    clause containing its first located evidence quote.
+
+    Returns:
+        Pairs of (clause fingerprint, memo records of its risks) for every
+        clause, or None if some risk cannot be attributed
+    """
+    by_title = {c.title.strip().lower(): i for i, c in enumerate(clauses)}
+    assigned: List[List[dict]] = [[] for _ in clauses]
+
+    for risk in risks:
+        index = by_title.get(risk.affected_clause.strip().lower())
+        if index is None:
+            location = next((loc for loc in risk.evidence_locations if loc is not None), None)
+            index = next((
+                i for i, c in enumerate(clauses)
+                if location and c.start is not None and c.start <= location.start < c.end
+            ), None)
+        if index is None:
+            return None
+        assigned[index].append({
+            "category": risk.category,
+            "title": risk.title,
+            "description": risk.description,
+            "explanation": risk.explanation,
+            "evidence": risk.evidence,
+            "financial_impact": risk.financial_impact,
+            "likelihood": risk.likelihood
+        })
+
+    return [(clause_fingerprint(c.text), risks) for c, risks in zip(clauses, assigned)]
+
+
+def _detection_issue(result: StructuredResult) -> Optional[str]:
+    """Reason to escalate a small-model detection result, if any."""
+    if result.repaired or result.retried:
+        return "malformed"
+    if any(r.confidence < settings.cascade_min_confidence for r in result.items):
+        return "low_confidence"
     return None
+
+
+def merge_risks(batches: Iterable[List[Risk]]) -> List[Risk]:
+    """
+    Concatenate risks from separate sources, dropping repeats of a risk an earlier source already reported.
+
+    A repeat has the same category, title, affected clause and evidence
+    (located spans, or the quotes where they were not located). Risks
+    within one source are all kept, even when two clauses share a title.
+    """
+    merged = []
+    seen = set()
+    for batch in batches:
+        keys = [_risk_key(risk) for risk in batch]
+        merged.extend(risk for risk, key in zip(batch, keys) if key not in seen)
+        seen.update(keys)
+    return merged
+
+
+def _risk_key(risk: Risk) -> tuple:
+    """Identity of a risk across detection batches and carried-over results."""
+    locations = risk.evidence_locations or [None] * len(risk.evidence)
+    evidence = tuple(
+        (location.start, location.end) if location else quote.strip().lower()
+        for quote, location in zip(risk.evidence, locations)
+    )
+    return risk.category, risk.title.strip().lower(), risk.affected_clause.strip().lower(), evidence
+
+
+def _locate_evidence(risks: list, clauses: list, locator) -> None:
+    """Map each evidence quote to its page and span, searching from the affected clause first."""
+    clause_starts = {c.title.lower(): c.start for c in clauses if c.start is not None}
+    for risk in risks:
+        hint = clause_starts.get(risk.affected_clause.lower(), 0)
+        risk.evidence_locations = [locator.locate(quote, hint) for quote in risk.evidence]
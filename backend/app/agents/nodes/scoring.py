@@ -5,10 +5,14 @@ Risk severity scoring node for the analysis graph.
 import json
 import logging
 import uuid
-from typing import List, Dict, Any
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple
+import numpy as np
 from langchain_openai import ChatOpenAI
 from app.config import settings
 from app.utils.logger import setup_logger
+from app.agents.state import Risk
 
 logger = setup_logger(__name__)
 
@@ -20,13 +24,120 @@ SEVERITY_SCORE_RANGES = {
     "CRITICAL": (76, 100)
 }
 
+IMPACT_SCORES = {
+    "LOW": 35,
+    "MEDIUM": 60,
+    "HIGH": 80
+}
+
+LIKELIHOOD_MULTIPLIERS = {
+    "LOW": 0.7,
+    "MEDIUM": 1.0,
+    "HIGH": 1.3
+}
+
+BUILTIN_SCORING_VERSION = "v1"
+
+
+@dataclass(frozen=True)
+class ScoringTable:
+    """A version of the weights turning financial impact and likelihood into a severity score."""
+    version: str
+    impact_scores: Dict[str, int] = field(default_factory=lambda: dict(IMPACT_SCORES))
+    likelihood_multipliers: Dict[str, float] = field(default_factory=lambda: dict(LIKELIHOOD_MULTIPLIERS))
+    severity_ranges: Dict[str, Tuple[int, int]] = field(default_factory=lambda: dict(SEVERITY_SCORE_RANGES))
+    default_impact: int = 50
+    default_multiplier: float = 1.0
+
+    def score(self, financial_impact: str, likelihood: str) -> int:
+        """Severity score (0-100) of an impact and likelihood."""
+        base = self.impact_scores.get(financial_impact, self.default_impact)
+        mult = self.likelihood_multipliers.get(likelihood, self.default_multiplier)
+        return max(0, min(100, int(base * mult)))
+
+    def level(self, score: int) -> str:
+        """Severity level of a score."""
+        for level, (min_val, max_val) in self.severity_ranges.items():
+            if min_val <= score <= max_val:
+                return level
+        return "CRITICAL" if score > 100 else "LOW"
+
+    def score_grid(self, impacts: List[str], likelihoods: List[str]) -> np.ndarray:
+        """
+        Scores of every combination of impacts and likelihoods, for scoring many risks by lookup.
+
+        Args:
+            impacts: Financial impact values
+            likelihoods: Likelihood values
+
+        Returns:
+            int16 array where [i, j] is score(impacts[i], likelihoods[j])
+        """
+        grid = np.zeros((len(impacts), len(likelihoods)), dtype=np.int16)
+        for i, impact in enumerate(impacts):
+            for j, likelihood in enumerate(likelihoods):
+                grid[i, j] = self.score(impact, likelihood)
+        return grid
+
+    def levels(self) -> List[str]:
+        """Severity level of each score 0-100."""
+        return [self.level(score) for score in range(101)]
+
+    @classmethod
+    def from_dict(cls, version: str, data: dict) -> "ScoringTable":
+        """Build a table from its JSON form; missing weights are those of the built-in table."""
+        builtin = cls(BUILTIN_SCORING_VERSION)
+        unknown = set(data.get("severity_ranges", {})) - set(SEVERITY_SCORE_RANGES)
+        if unknown:
+            raise ValueError(f"Unknown severity levels in scoring table {version}: {', '.join(sorted(unknown))}")
+        return cls(
+            version=version,
+            impact_scores={**builtin.impact_scores, **data.get("impact_scores", {})},
+            likelihood_multipliers={**builtin.likelihood_multipliers, **data.get("likelihood_multipliers", {})},
+            severity_ranges={
+                level: tuple(bounds)
+                for level, bounds in data.get("severity_ranges", builtin.severity_ranges).items()
+            },
+            default_impact=data.get("default_impact", builtin.default_impact),
+            default_multiplier=data.get("default_multiplier", builtin.default_multiplier)
+        )
+
+
+def load_scoring_tables(path: Optional[str] = None) -> Dict[str, ScoringTable]:
+    """
+    Scoring tables by version: the built-in table plus those in a JSON file.
+
+    The file maps versions to tables, e.g.
+    {"v2": {"impact_scores": {"HIGH": 90}, "likelihood_multipliers": {"LOW": 0.5}}}.
+
+    Args:
+        path: JSON file of additional tables, or None/empty for the built-in table only
 
-def get_severity_level(score: int) -> str:
+    Returns:
+        Dictionary of version to table
+    """
+    tables = {BUILTIN_SCORING_VERSION: ScoringTable(BUILTIN_SCORING_VERSION)}
+    if path:
+        with open(Path(path), "r", encoding="utf-8") as f:
+            for version, data in json.load(f).items():
+                tables[version] = ScoringTable.from_dict(version, data)
+    return tables
+
+
+SCORING_TABLES = load_scoring_tables(settings.scoring_tables_file)
+
+
+def active_scoring_table() -> ScoringTable:
+    """The table new analyses are scored with (SCORING_VERSION)."""
+    try:
+        return SCORING_TABLES[settings.scoring_version]
+    except KeyError:
+        raise ValueError(f"Unknown scoring version: {settings.scoring_version}")
+
+
+def get_severity_level(score: int, table: Optional[ScoringTable] = None) -> str:
     """Get severity level from score."""
-    for level, (min_val, max_val) in SEVERITY_SCORE_RANGES.items():
-        if min_val <= score <= max_val:
-            return level
-    return "CRITICAL" if score > 100 else "LOW"
+    return (table or active_scoring_table()).level(score)
 
 
 async def score_risks_node(state: dict) -> dict:
@@ -36,10 +147,12 @@ async def score_risks_node(state: dict) -> dict:
     try:
         risks = state.get("detected_risks", [])
         if not risks:
-            state["scored_risks"] = []
-            state["overall_risk_score"] = 0
-            state["current_step"] = "scoring_complete"
-            return state
+            return {
+                "scored_risks": [],
+                "overall_risk_score": 0,
+                "scoring_version": active_scoring_table().version,
+                "current_step": "scoring_complete"
+            }
 
         llm = ChatOpenAI(
             api_key=settings.openai_api_key,
@@ -47,89 +160,57 @@ async def score_risks_node(state: dict) -> dict:
             temperature=settings.openai_temperature
         )
 
+        table = active_scoring_table()
         scored_risks = []
         total_score = 0
 
         for risk in risks:
             try:
                 # Simple scoring
-                score = _calculate_score(risk)
+                score = _calculate_score(risk, table)
 
                 # Build scored risk
-                scored_risk = {
-                    "risk_id": str(uuid.uuid4()),
-                    "category": risk.get("category", ""),
-                    "title": risk.get("title", ""),
-                    "description": risk.get("description", ""),
-                    "severity_score": score,
-                    "severity_level": get_severity_level(score),
-                    "affected_clause": risk.get("affected_clause", ""),
-                    "explanation": risk.get("explanation", ""),
-                    "evidence": risk.get("evidence", []),
-                    "remediation": {
-                        "suggestion": "",
-                        "priority": "MEDIUM",
-                        "effort": "MEDIUM"
-                    }
-                }
+                scored_risk = replace(
+                    risk,
+                    risk_id=str(uuid.uuid4()),
+                    severity_score=score,
+                    severity_level=get_severity_level(score, table)
+                )
 
                 scored_risks.append(scored_risk)
                 total_score += score
 
             except Exception as e:
                 logger.warning(f"Error scoring risk: {str(e)}")
-                scored_risks.append({
-                    "risk_id": str(uuid.uuid4()),
-                    "category": risk.get("category", ""),
-                    "title": risk.get("title", "Unknown Risk"),
-                    "description": risk.get("description", ""),
-                    "severity_score": 50,
-                    "severity_level": "MEDIUM",
-                    "affected_clause": risk.get("affected_clause", ""),
-                    "explanation": risk.get("explanation", ""),
-                    "evidence": risk.get("evidence", []),
-                    "remediation": {
-                        "suggestion": "",
-                        "priority": "MEDIUM",
-                        "effort": "MEDIUM"
-                    }
-                })
+                scored_risks.append(replace(
+                    risk,
+                    risk_id=str(uuid.uuid4()),
+                    title=risk.title or "Unknown Risk",
+                    severity_score=50,
+                    severity_level="MEDIUM"
+                ))
                 total_score += 50
 
         # Calculate overall risk score
         overall_risk_score = int(total_score / len(scored_risks)) if scored_risks else 0
         overall_risk_score = max(0, min(100, overall_risk_score))
 
-        state["scored_risks"] = scored_risks
-        state["overall_risk_score"] = overall_risk_score
-        state["current_step"] = "scoring_complete"
-
-        logger.info(f"Scored {len(scored_risks)} risks. Overall: {overall_risk_score}")
-        return state
+        logger.info(f"Scored {len(scored_risks)} risks with table {table.version}. Overall: {overall_risk_score}")
+        return {
+            "scored_risks": scored_risks,
+            "overall_risk_score": overall_risk_score,
+            "scoring_version": table.version,
+            "current_step": "scoring_complete"
+        }
 
     except Exception as e:
         logger.error(f"Scoring error: {str(e)}")
-        state["errors"].append(f"Scoring error: {str(e)}")
-        state["current_step"] = "scoring_failed"
-        return state
+        return {
+            "errors": [f"Scoring error: {str(e)}"],
+            "current_step": "scoring_failed"
+        }
 
 
-def _calculate_score(risk: dict) -> int:
+def _calculate_score(risk: Risk, table: Optional[ScoringTable] = None) -> int:
     """Calculate risk score from impact and likelihood."""
-    impact_scores = {
-        "LOW": 35,
-        "MEDIUM": 60,
-        "HIGH": 80
-    }
-
-    likelihood_multipliers = {
-        "LOW": 0.7,
-        "MEDIUM": 1.0,
-        "HIGH": 1.3
-    }
-
-    base = impact_scores.get(risk.get("financial_impact", "MEDIUM"), 50)
-    mult = likelihood_multipliers.get(risk.get("likelihood", "MEDIUM"), 1.0)
-
-    score = int(base * mult)
-    return max(0, min(100, score))
+    return (table or active_scoring_table()).score(risk.financial_impact, risk.likelihood)
@@ -0,0 +1,71 @@
+"""
+Live progress reporting for running analyses.
+"""
+
+import logging
+import threading
+from typing import Callable, Dict
+
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+# Rough share of the total work done once a step is reached
+STEP_PROGRESS = {
+    "parse_complete": 10,
+    "prescreen_complete": 15,
+    "extracting": 20,
+    "extraction_complete": 60,
+    "risk_detection_complete": 75,
+    "scoring_complete": 85,
+    "remediation_complete": 95,
+    "remediation_skipped": 95,
+}
+
+
+class ProgressBoard:
+    """
+    Route progress updates from graph nodes to whoever started the analysis.
+
+    Nodes only know the document handle from graph state, so listeners are
+    keyed by document id. Reports for documents without a listener are
+    dropped.
+    """
+
+    def __init__(self):
+        """Initialize an empty board."""
+        self._listeners: Dict[str, Callable[[dict], None]] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, document_id: str, listener: Callable[[dict], None]) -> None:
+        """Register the listener for a document's progress updates."""
+        with self._lock:
+            self._listeners[document_id] = listener
+
+    def release(self, document_id: str) -> None:
+        """Remove a document's listener."""
+        with self._lock:
+            self._listeners.pop(document_id, None)
+
+    def report(self, document_id: str, step: str, **counts: int) -> None:
+        """
+        Publish a progress update.
+
+        Args:
+            document_id: Document handle from graph state
+            step: Current step name (see STEP_PROGRESS)
+            **counts: Partial results so far, e.g. clauses=12, risks=3
+        """
+        listener = self._listeners.get(document_id)
+        if listener is None:
+            return
+
+        update = {"step": step, "progress": STEP_PROGRESS.get(step, 0), **counts}
+        try:
+            listener(update)
+        except Exception as e:
+            logger.warning(f"Progress listener failed: {str(e)}")
+
+
+PROGRESS = ProgressBoard()
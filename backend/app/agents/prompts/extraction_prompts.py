@@ -30,8 +30,34 @@ For each item, provide:
 - "title": specific topic (e.g., "Payment Schedule", "Insurance Requirement", "Missing Termination Clause")
 - "text": exact quote from contract OR description if missing
 - "status": "present" or "missing"
-- "severity": "critical" if missing and should be present, "present" if exists
 
-Return as JSON array. Be exhaustive - extract 15-25 items minimum.
+Return a JSON object of the form {{"clauses": [...]}}. Be exhaustive - extract 15-25 items minimum.
 Include negations like "No insurance required" or "No termination clause provided".
 """
+
+EXTRACT_CHANGED_REGIONS_PROMPT = """
+You are a legal contract extraction specialist. This contract is a revision of one that was already analyzed.
+Clauses from the unchanged parts have been carried over; extract the clauses found in the CHANGED EXCERPTS below.
+
+CHANGED EXCERPTS (separated by "---"):
+{excerpts}
+
+Use these sections:
+1. SCOPE OF WORK/SERVICES
+2. PAYMENT TERMS
+3. INSURANCE & LIABILITY REQUIREMENTS
+4. INDEMNIFICATION
+5. TERMINATION PROVISIONS
+6. INTELLECTUAL PROPERTY
+7. CONFIDENTIALITY & PROTECTIONS
+8. DISPUTE RESOLUTION
+
+For each item, provide:
+- "section": category name
+- "title": specific topic (e.g., "Payment Schedule", "Insurance Requirement")
+- "text": exact quote from the excerpts
+- "status": "present"
+
+Only extract what the excerpts contain; do not report missing clauses, since the rest of the contract is not shown.
+Return a JSON object of the form {{"clauses": [...]}}, with an empty list if the excerpts contain no clauses.
+"""
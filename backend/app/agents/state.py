@@ -2,56 +2,111 @@
 State definitions for the contract analysis agent.
 """
 
-from typing import TypedDict, List, Optional, Any
+import operator
+from typing import TypedDict, List, Optional, Any, Annotated, Tuple
 from dataclasses import dataclass, field
+from app.core.page_index import TextLocation
 
 
-@dataclass
+@dataclass(slots=True)
 class Clause:
     """Represents an extracted contract clause."""
     section: str
     title: str
     text: str
+    status: str = "present"
+    start: Optional[int] = None  # Character offsets into the source document
+    end: Optional[int] = None
     page_reference: Optional[int] = None
 
+    @classmethod
+    def from_dict(cls, data: dict) -> "Clause":
+        """Build a clause record from a raw LLM dictionary."""
+        return cls(
+            section=str(data.get("section", "") or ""),
+            title=str(data.get("title", "") or ""),
+            text=str(data.get("text", "") or ""),
+            status=str(data.get("status", "present") or "present")
+        )
 
-@dataclass
+
+@dataclass(slots=True)
 class Risk:
     """Represents an identified risk."""
-    risk_id: str
     category: str
     title: str
-    description: str
-    severity_score: int
-    severity_level: str
-    affected_clause: str
-    explanation: str
+    description: str = ""
+    affected_clause: str = ""
+    explanation: str = ""
     evidence: List[str] = field(default_factory=list)
+    evidence_locations: List[Optional[TextLocation]] = field(default_factory=list)  # Parallel to evidence
     financial_impact: str = "MEDIUM"
     likelihood: str = "MEDIUM"
+
+    # Filled in by scoring
+    risk_id: str = ""
+    severity_score: int = 0
+    severity_level: str = ""
+
+    # Filled in by remediation
     remediation_suggestion: Optional[str] = None
     remediation_priority: Optional[str] = None
     remediation_effort: Optional[str] = None
 
+    @classmethod
+    def from_dict(cls, data: dict) -> "Risk":
+        """Build a risk record from a raw LLM dictionary."""
+        evidence = data.get("evidence", [])
+        if isinstance(evidence, str):
+            evidence = [evidence]
+
+        return cls(
+            category=str(data.get("category", "")).lower().replace(" ", "_"),
+            title=str(data.get("title", "") or ""),
+            description=str(data.get("description", "") or ""),
+            affected_clause=str(data.get("affected_clause", "") or ""),
+            explanation=str(data.get("explanation", "") or ""),
+            evidence=[str(e) for e in evidence or []],
+            financial_impact=str(data.get("financial_impact", "MEDIUM") or "MEDIUM").upper(),
+            likelihood=str(data.get("likelihood", "MEDIUM") or "MEDIUM").upper()
+        )
+
 
 class ContractAnalysisState(TypedDict):
-    """State dictionary for the contract analysis graph."""
+    """
+    State dictionary for the contract analysis graph.
+
+    The contract text itself lives in the document store; state only carries
+    its handle. Nodes return partial updates containing the keys they change.
+    """
     # Input
-    contract_text: str
+    document_id: str  # Handle into app.agents.documents.DOCUMENT_STORE
     contract_filename: str
     page_count: int
     word_count: int
+    deadline: float  # Wall-clock time (epoch seconds) the analysis should finish by
+
+    # Reuse of a prior analysis (near-duplicate or parent revision)
+    revision_of: str                               # Parent analysis this text revises ("" if none)
+    reused_from: str                               # Analysis whose clauses were reused ("" if none)
+    similarity: float                              # Estimated similarity to that analysis
+    reused_clauses: List[Clause]                   # Its clauses still valid, at offsets in this text
+    extraction_regions: List[Tuple[int, int]]      # Changed spans left to extract
+    parent_risks: List[Risk]                       # Final risks of the parent revision
 
     # Processing stages
-    extracted_clauses: List[dict]  # List of extracted clauses
-    detected_risks: List[dict]     # Raw risks from LLM
-    scored_risks: List[dict]       # Scored and formatted risks
-    remediation_suggestions: List[dict]  # Remediation for each risk
+    pending_categories: List[str]    # Risk categories left for LLM detection
+    extracted_clauses: List[Clause]  # Extracted clause records
+    detected_risks: List[Risk]       # Raw risks from pre-screen and LLM
+    scored_risks: List[Risk]         # Scored risks with remediation
 
     # Metadata
     analysis_id: str
     overall_risk_score: int
+    scoring_version: str             # Scoring table the severity scores come from
     summary: str
     current_step: str
-    errors: List[str]
+    errors: Annotated[List[str], operator.add]  # Appended to by each node
+    degradations: Annotated[List[str], operator.add]  # Shortcuts taken under deadline or load pressure
+    retries: Annotated[List[str], operator.add]  # Name of each node run again after a failure
     is_complete: bool
@@ -0,0 +1,132 @@
+"""
+Portfolio risk analytics endpoints.
+"""
+
+import logging
+import time
+from datetime import date
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from app.utils.logger import setup_logger
+from app.utils.exceptions import ValidationError
+from app.core.analytics import RISK_ANALYTICS, RiskFilter
+from app.core.export import EXPORT_FORMATS, export_risks
+from app.agents.detections import DETECTIONS
+from app.agents.nodes.scoring import SCORING_TABLES, active_scoring_table
+from app.api.routes.contracts import rescore_stored_analyses
+from app.api.schemas.analytics import (
+    RiskCountResponse, RiskHistogramResponse, HistogramBucket, RankedRisk, TopRisksResponse,
+    ScoringStatusResponse, RescoreResponse
+)
+
+logger = setup_logger(__name__)
+
+router = APIRouter(prefix="/api/v1/analytics", tags=["analytics"])
+
+
+def risk_filter(
+    category: Optional[str] = Query(default=None, description="Risk category, e.g. uncapped_liability"),
+    tenant: Optional[str] = Query(default=None),
+    severity_level: Optional[str] = Query(
+        default=None, pattern="^(LOW|MEDIUM|HIGH|CRITICAL)$", description="This level or above"
+    ),
+    min_score: Optional[int] = Query(default=None, ge=0, le=100),
+    max_score: Optional[int] = Query(default=None, ge=0, le=100),
+    since: Optional[date] = Query(default=None, description="Analyzed on or after this date"),
+    until: Optional[date] = Query(default=None, description="Analyzed on or before this date")
+) -> RiskFilter:
+    """Filter query parameters shared by the analytics endpoints."""
+    return RiskFilter(category, tenant, severity_level, min_score, max_score, since, until)
+
+
+@router.get("/risks/count", response_model=RiskCountResponse)
+async def count_risks(conditions: RiskFilter = Depends(risk_filter)):
+    """
+    Count risks across all completed analyses.
+
+    For example, category=uncapped_liability&min_score=75 counts uncapped
+    liability risks scored above 75 and the contracts they appear in.
+    """
+    return RiskCountResponse(**RISK_ANALYTICS.count(conditions))
+
+
+@router.get("/risks/histogram", response_model=RiskHistogramResponse)
+async def risk_histogram(
+    field: str = Query(default="category", pattern="^(category|severity_level|severity_score|tenant|month)$"),
+    bins: int = Query(default=10, ge=1, le=100, description="Number of bins for severity_score"),
+    conditions: RiskFilter = Depends(risk_filter)
+):
+    """Count matching risks per category, severity level, score bin, tenant or month."""
+    buckets = RISK_ANALYTICS.histogram(conditions, field, bins)
+    return RiskHistogramResponse(
+        field=field,
+        buckets=[HistogramBucket(key=key, count=count) for key, count in buckets]
+    )
+
+
+@router.get("/risks/top", response_model=TopRisksResponse)
+async def top_risks(
+    limit: int = Query(default=10, ge=1, le=1000),
+    conditions: RiskFilter = Depends(risk_filter)
+):
+    """Highest-scored matching risks."""
+    return TopRisksResponse(risks=[RankedRisk(**risk) for risk in RISK_ANALYTICS.top(conditions, limit)])
+
+
+@router.get("/risks/export")
+async def export(
+    format: str = Query(default="ndjson", pattern="^(ndjson|csv|parquet)$"),
+    conditions: RiskFilter = Depends(risk_filter)
+):
+    """
+    Stream every matching analysis and risk as NDJSON, CSV or Parquet.
+
+    One row per risk with its analysis's file name, date, overall risk score
+    and summary, and the risk's category, title, description, severity,
+    evidence and recommendation, in the order analyses completed; analyses
+    without risks get one row of their own. The output is encoded while it
+    is sent, so a full dump takes one request and bounded memory. Parquet
+    needs pyarrow installed.
+    """
+    try:
+        body = export_risks(
+            RISK_ANALYTICS,
+            DETECTIONS.export(conditions.tenant, conditions.since, conditions.until),
+            conditions,
+            format
+        )
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="risks.{format}"'}
+    )
+
+
+@router.get("/scoring", response_model=ScoringStatusResponse)
+async def scoring_status():
+    """Available scoring tables, the active one, and how many stored analyses each version scored."""
+    return ScoringStatusResponse(
+        active_version=active_scoring_table().version,
+        versions=list(SCORING_TABLES),
+        stored_analyses=DETECTIONS.versions()
+    )
+
+
+@router.post("/rescore", response_model=RescoreResponse)
+async def rescore(
+    all: bool = Query(default=False, description="Also re-score analyses already on the active version")
+):
+    """
+    Re-score stored analyses with the active scoring table (SCORING_VERSION).
+
+    Severity scores, levels and overall risk scores are recomputed from the
+    stored detections in one vectorized pass, without calling the LLM, and
+    the analytics index and results are updated in place.
+    """
+    started = time.perf_counter()
+    outcome = await rescore_stored_analyses(everything=all)
+    return RescoreResponse(**outcome, duration_ms=round((time.perf_counter() - started) * 1000, 1))
@@ -0,0 +1,278 @@
+"""
+Batch contract analysis endpoints.
+"""
+
+import asyncio
+import json
+import logging
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import AsyncIterator, List, Optional, Tuple
+from fastapi import APIRouter, UploadFile, File, HTTPException, Header, Query
+from fastapi.responses import StreamingResponse
+from app.config import settings
+from app.utils.logger import setup_logger
+from app.utils.exceptions import ValidationError, FileProcessingError, ContractAnalysisError
+from app.core.file_handler import FileHandler
+from app.core.scheduler import BATCH
+from app.api.routes.contracts import ANALYSIS_STORAGE, queue_analysis
+from app.api.schemas.contract import BatchItemResponse, BatchUploadResponse, BatchStatusResponse
+
+logger = setup_logger(__name__)
+
+# In-memory storage for batches (for demo purposes); the analyses of their
+# files are regular entries of ANALYSIS_STORAGE
+BATCH_STORAGE = {}
+
+router = APIRouter(prefix="/api/v1", tags=["batches"])
+
+
+@router.post("/batches", response_model=BatchUploadResponse, status_code=202)
+async def upload_batch(
+    files: List[UploadFile] = File(...),
+    priority: str = Query(default=BATCH, pattern="^(interactive|batch)$"),
+    x_tenant_id: str = Header(default="default", pattern=r"^[A-Za-z0-9_.-]{1,64}$")
+):
+    """
+    Upload many contracts for analysis in one request.
+
+    Accepts any number of PDF or TXT files and ZIP archives of them (up to
+    MAX_BATCH_FILES contracts in total). Every contract gets its own analysis
+    ID, usable with the single-contract status and results endpoints; files
+    that cannot be analyzed are reported as rejected without failing the
+    batch.
+
+    All contracts are queued at once, in the batch lane unless
+    priority=interactive is given, largest first so the longest analyses
+    do not end up running alone at the tail of the batch.
+    """
+    batch_id = "batch_" + str(datetime.utcnow().timestamp()).replace(".", "")[:10] + "_" + uuid.uuid4().hex[:6]
+    saved: List[Tuple[str, Optional[str], Optional[str]]] = []
+
+    try:
+        await _save_files(files, batch_id, saved)
+        if not saved:
+            raise ValidationError("No contract files in the batch")
+
+    except ValidationError as e:
+        _cleanup(saved)
+        logger.warning(f"Batch validation failed: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except FileProcessingError as e:
+        _cleanup(saved)
+        logger.error(f"Batch processing error: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        _cleanup(saved)
+        logger.error(f"Batch upload error: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Internal server error during upload")
+
+    parsed = await asyncio.gather(*(_parse(*entry) for entry in saved))
+
+    created_at = datetime.utcnow().isoformat()
+    batch = {
+        "tenant": x_tenant_id,
+        "priority": priority,
+        "created_at": created_at,
+        "completed_at": None,
+        "items": [
+            {"filename": filename, "analysis_id": None, "error": error}
+            for (filename, _, _), (_, _, error) in zip(saved, parsed)
+        ],
+        "finished": [],  # Analysis IDs in completion order
+        "updated": asyncio.Event()
+    }
+    BATCH_STORAGE[batch_id] = batch
+
+    # Queue everything in one go, largest first
+    accepted = [index for index, (text, _, _) in enumerate(parsed) if text is not None]
+    accepted.sort(key=lambda index: len(parsed[index][0]), reverse=True)
+    for index in accepted:
+        contract_text, page_index, _ = parsed[index]
+        item = batch["items"][index]
+        analysis_id, task = queue_analysis(
+            contract_text, page_index, Path(item["filename"]).name, saved[index][1], x_tenant_id, priority
+        )
+        item["analysis_id"] = analysis_id
+        task.add_done_callback(lambda _, batch_id=batch_id, analysis_id=analysis_id: _item_finished(batch_id, analysis_id))
+    if not accepted:
+        batch["completed_at"] = created_at
+
+    logger.info(f"Batch {batch_id}: {len(accepted)} contracts queued, {len(saved) - len(accepted)} rejected")
+
+    return BatchUploadResponse(
+        batch_id=batch_id,
+        status="pending" if accepted else "completed",
+        created_at=created_at,
+        accepted=len(accepted),
+        rejected=len(saved) - len(accepted),
+        items=[_item_status(item) for item in batch["items"]]
+    )
+
+
+@router.get("/batches/{batch_id}/status", response_model=BatchStatusResponse)
+async def get_batch_status(batch_id: str):
+    """Get the aggregate progress of a batch and the status of each of its files."""
+    if batch_id not in BATCH_STORAGE:
+        raise HTTPException(status_code=404, detail="Batch not found")
+
+    batch = BATCH_STORAGE[batch_id]
+    items = [_item_status(item) for item in batch["items"]]
+    accepted = [item for item in items if item.analysis_id]
+
+    counts = {}
+    for item in items:
+        counts[item.status] = counts.get(item.status, 0) + 1
+
+    if len(batch["finished"]) == len(accepted):
+        status = "completed"
+    elif any(item.status != "pending" for item in accepted):
+        status = "processing"
+    else:
+        status = "pending"
+
+    return BatchStatusResponse(
+        batch_id=batch_id,
+        status=status,
+        progress_percentage=(
+            sum(item.progress_percentage for item in accepted) // len(accepted) if accepted else 100
+        ),
+        total=len(items),
+        counts=counts,
+        created_at=batch["created_at"],
+        completed_at=batch["completed_at"],
+        items=items
+    )
+
+
+@router.get("/batches/{batch_id}/results")
+async def stream_batch_results(batch_id: str):
+    """
+    Stream the results of a batch as newline-delimited JSON.
+
+    One line per file: rejected files first, then each analysis as soon as
+    it completes or fails. The response ends after the last analysis of the
+    batch; connecting after that replays every line.
+    """
+    if batch_id not in BATCH_STORAGE:
+        raise HTTPException(status_code=404, detail="Batch not found")
+
+    return StreamingResponse(_result_feed(BATCH_STORAGE[batch_id]), media_type="application/x-ndjson")
+
+
+async def _save_files(files: List[UploadFile], batch_id: str, saved: list) -> None:
+    """
+    Save the uploaded files, extracting archives.
+
+    Args:
+        files: Uploaded files
+        batch_id: Batch the files belong to
+        saved: List to append (file name, saved path, error) to, with a path
+            for each file to parse and an error for each rejected one
+
+    Raises:
+        ValidationError: As soon as the batch has more than MAX_BATCH_FILES files
+    """
+    for position, file in enumerate(files):
+        if len(saved) >= settings.max_batch_files:
+            raise ValidationError(f"Too many files. Maximum per batch: {settings.max_batch_files}")
+        prefix = f"{batch_id}_{position}_"
+        if FileHandler.is_archive(file.filename):
+            archive_path = await asyncio.to_thread(FileHandler.save_temp_archive, file, prefix)
+            try:
+                saved.extend(await asyncio.to_thread(
+                    FileHandler.extract_archive, archive_path, prefix, settings.max_batch_files - len(saved)
+                ))
+            finally:
+                FileHandler.cleanup_temp_file(archive_path)
+            continue
+
+        try:
+            saved.append((file.filename, await FileHandler.save_temp_file(file, prefix), None))
+        except ValidationError as e:
+            saved.append((file.filename, None, str(e)))
+
+
+async def _parse(filename: str, file_path: Optional[str], error: Optional[str]):
+    """
+    Extract the text of a saved file, as (text, page index, error).
+
+    Any failure rejects just this file; its saved copy is then removed
+    (a parsed file is removed once its analysis finishes).
+    """
+    if file_path is None:
+        return None, None, error
+    parsed = False
+    try:
+        contract_text, page_index = await asyncio.to_thread(FileHandler.extract_contract_text, file_path, filename)
+        parsed = True
+        return contract_text, page_index, None
+    except ContractAnalysisError as e:
+        return None, None, str(e)
+    except Exception as e:
+        logger.error(f"Unexpected error parsing {filename}: {str(e)}", exc_info=True)
+        return None, None, f"Could not read file: {str(e)}"
+    finally:
+        if not parsed:
+            FileHandler.cleanup_temp_file(file_path)
+
+
+def _cleanup(saved: List[Tuple[str, Optional[str], Optional[str]]]) -> None:
+    for _, path, _ in saved:
+        if path:
+            FileHandler.cleanup_temp_file(path)
+
+
+def _item_finished(batch_id: str, analysis_id: str) -> None:
+    """Record that an analysis of a batch finished and wake the result feeds."""
+    batch = BATCH_STORAGE.get(batch_id)
+    if batch is None:
+        return
+    batch["finished"].append(analysis_id)
+    if len(batch["finished"]) == sum(1 for item in batch["items"] if item["analysis_id"]):
+        batch["completed_at"] = datetime.utcnow().isoformat()
+    updated, batch["updated"] = batch["updated"], asyncio.Event()
+    updated.set()
+
+
+def _item_status(item: dict) -> BatchItemResponse:
+    if not item["analysis_id"]:
+        return BatchItemResponse(filename=item["filename"], status="rejected", error_message=item["error"])
+
+    analysis = ANALYSIS_STORAGE.get(item["analysis_id"], {})
+    return BatchItemResponse(
+        filename=item["filename"],
+        analysis_id=item["analysis_id"],
+        status=analysis.get("status", "pending"),
+        progress_percentage=analysis.get("progress", 0),
+        error_message=analysis.get("error")
+    )
+
+
+async def _result_feed(batch: dict) -> AsyncIterator[str]:
+    """Yield one JSON line per file of a batch as results become available."""
+    filenames = {item["analysis_id"]: item["filename"] for item in batch["items"] if item["analysis_id"]}
+
+    for item in batch["items"]:
+        if not item["analysis_id"]:
+            yield json.dumps({
+                "filename": item["filename"], "analysis_id": None, "status": "rejected", "error": item["error"]
+            }) + "\n"
+
+    sent = 0
+    while sent < len(filenames):
+        updated = batch["updated"]
+        while sent < len(batch["finished"]):
+            analysis_id = batch["finished"][sent]
+            analysis = ANALYSIS_STORAGE.get(analysis_id, {})
+            yield json.dumps({
+                "filename": filenames[analysis_id],
+                "analysis_id": analysis_id,
+                "status": analysis.get("status", "failed"),
+                "result": analysis.get("result"),
+                "error": analysis.get("error")
+            }, default=str) + "\n"
+            sent += 1
+        if sent < len(filenames):
+            await updated.wait()
@@ -2,19 +2,32 @@
 Contract analysis endpoints.
 """
 
+import asyncio
 import json
 import logging
+import uuid
 from datetime import datetime
-from typing import Optional
-from fastapi import APIRouter, UploadFile, File, HTTPException
+from pathlib import Path
+from typing import Awaitable, Optional, Tuple
+from fastapi import APIRouter, UploadFile, File, HTTPException, Header, Query
 from app.config import settings
 from app.utils.logger import setup_logger
 from app.utils.exceptions import ValidationError, FileProcessingError, ContractAnalysisError
 from app.core.file_handler import FileHandler
-from app.core.pdf_parser import PDFParser
+from app.core.page_index import PageIndex
+from app.core.package import PACKAGE_READER
+from app.core.scheduler import ANALYSIS_SCHEDULER, INTERACTIVE, estimate_analysis_tokens
+from app.core.coalescing import SingleFlight, content_key
+from app.core.similarity import SIMILARITY_INDEX
+from app.core.analytics import RISK_ANALYTICS
+from app.core.search import CONTRACT_SEARCH
+from app.agents.detections import DETECTIONS
 from app.agents.graph import AnalysisExecutor
+from app.agents.nodes.scoring import active_scoring_table
 from app.api.schemas.contract import UploadResponse, AnalysisStatusResponse
-from app.api.schemas.risk import AnalysisResultModel, ContractMetadata, RiskModel, RemediationModel
+from app.api.schemas.risk import (
+    AnalysisResultModel, ContractMetadata, RiskModel, RemediationModel, EvidenceLocation
+)
 
 logger = setup_logger(__name__)
 
@@ -23,52 +36,65 @@ logger = setup_logger(__name__)
 ANALYSIS_STORAGE = {}
 ANALYSIS_EXECUTOR = AnalysisExecutor()
 
+# Identical uploads arriving while an analysis of the same text is running share it
+ANALYSIS_FLIGHTS = SingleFlight("analyses")
+
+# Final steps of analyses that did not produce a result (scoring failure stops the finalize step)
+FAILED_STEPS = {"execution_failed", "parse_failed", "scoring_failed"}
+
 router = APIRouter(prefix="/api/v1", tags=["contracts"])
 
 
 @router.post("/contracts/upload", response_model=UploadResponse, status_code=202)
-async def upload_contract(file: UploadFile = File(...)):
+async def upload_contract(
+    file: UploadFile = File(...),
+    priority: str = Query(default=INTERACTIVE, pattern="^(interactive|batch)$"),
+    x_tenant_id: str = Header(default="default", pattern=r"^[A-Za-z0-9_.-]{1,64}$"),
+    revision_of: Optional[str] = Query(default=None)
+):
     """
     Upload a contract for analysis.
 
-    Accepts PDF or TXT files (max 10MB).
+    Accepts PDF or TXT files (max 10MB), or a ZIP package of a master
+    agreement with its schedules and exhibits, analyzed as one contract.
     Returns analysis ID for polling results.
+
+    The analysis is queued for the tenant named in the X-Tenant-ID header,
+    in the interactive lane unless priority=batch is given. An upload of a
+    text that the same tenant already has being analyzed in the same lane
+    with the same settings gets its own analysis ID but shares the running
+    analysis.
+
+    With revision_of naming an earlier analysis, the upload is treated as a
+    revision of that contract: only changed clauses are re-analyzed, and the
+    result lists the risks that appeared, disappeared or changed severity.
     """
     analysis_id = None
 
     try:
         # Validate file
         FileHandler.validate_file(file)
+        if revision_of and revision_of not in SIMILARITY_INDEX:
+            raise ValidationError(
+                f"Analysis {revision_of} not found or not revisable (only completed, non-degraded analyses are)"
+            )
 
-        # Save file temporarily
-        file_path = await FileHandler.save_temp_file(file)
-
-        # Extract text based on file type
-        if file.filename.lower().endswith(".pdf"):
-            contract_text, page_count = PDFParser.extract_pdf_text(file_path)
-        else:  # .txt
-            contract_text = FileHandler.read_text_file(file_path)
-            page_count = 0
-
-        # Validate extracted text
-        if not contract_text or len(contract_text) < 100:
-            raise ValidationError("Could not extract sufficient text from file")
-
-        # Create analysis record
-        analysis_id = file.filename.replace(".", "_") + "_" + str(datetime.utcnow().timestamp()).replace(".", "")[:10]
-
-        ANALYSIS_STORAGE[analysis_id] = {
-            "status": "pending",
-            "filename": file.filename,
-            "created_at": datetime.utcnow().isoformat(),
-            "progress": 0,
-            "result": None,
-            "error": None
-        }
-
-        # Queue analysis (in production, use Celery/RQ)
-        import asyncio
-        asyncio.create_task(_run_analysis(analysis_id, contract_text, file.filename, file_path))
+        if FileHandler.is_archive(file.filename):
+            # Members are parsed straight out of the upload, nothing to save
+            package = await PACKAGE_READER.read(file.file)
+            contract_text, page_index, file_path = package.text, package.page_index, None
+        else:
+            # Save file temporarily
+            package = None
+            file_path = await FileHandler.save_temp_file(file)
+
+            # Extract text based on file type
+            contract_text, page_index = FileHandler.extract_contract_text(file_path, file.filename)
+
+        analysis_id, _ = queue_analysis(
+            contract_text, page_index, file.filename, file_path, x_tenant_id, priority, revision_of,
+            package=package.summary() if package else None
+        )
 
         logger.info(f"File uploaded: {file.filename} -> Analysis ID: {analysis_id}")
 
@@ -101,9 +127,13 @@ async def get_analysis_status(analysis_id: str):
         analysis_id=analysis_id,
         status=analysis["status"],
         progress_percentage=analysis.get("progress", 0),
+        current_step=analysis.get("current_step"),
+        clauses_extracted=analysis.get("clauses_extracted", 0),
+        risks_detected=analysis.get("risks_detected", 0),
         created_at=analysis.get("created_at"),
         completed_at=analysis.get("completed_at"),
-        error_message=analysis.get("error")
+        error_message=analysis.get("error"),
+        coalesced_with=analysis.get("coalesced_with")
     )
 
 
@@ -124,59 +154,327 @@ async def get_analysis_results(analysis_id: str):
     return analysis.get("result")
 
 
-async def _run_analysis(analysis_id: str, contract_text: str, filename: str, file_path: str):
-    """Run analysis in background."""
-    try:
-        ANALYSIS_STORAGE[analysis_id]["status"] = "processing"
-        ANALYSIS_STORAGE[analysis_id]["progress"] = 10
+def queue_analysis(
+    contract_text: str,
+    page_index: Optional[PageIndex],
+    filename: str,
+    file_path: Optional[str],
+    tenant: str,
+    priority: str,
+    revision_of: Optional[str] = None,
+    package: Optional[dict] = None
+) -> Tuple[str, asyncio.Task]:
+    """
+    Create an analysis record and queue the analysis.
+
+    Args:
+        contract_text: Extracted contract text
+        page_index: Page index of the text (None for plain text)
+        filename: Original file name
+        file_path: Temporary file to remove once the analysis finishes
+        tenant: Tenant the analysis is billed to
+        priority: Scheduling lane
+        revision_of: Parent analysis ID for a revision upload
+        package: Summary of the contract package the text was combined from
+
+    Returns:
+        Tuple of (analysis ID, task that stores the result when the analysis finishes)
+    """
+    analysis_id = (
+        filename.replace(".", "_") + "_"
+        + str(datetime.utcnow().timestamp()).replace(".", "")[:10] + "_" + uuid.uuid4().hex[:6]
+    )
 
-        logger.info(f"Starting analysis: {analysis_id}")
+    created_at = datetime.utcnow().isoformat()
+    ANALYSIS_STORAGE[analysis_id] = {
+        "status": "pending",
+        "filename": filename,
+        "tenant": tenant,
+        "priority": priority,
+        "revision_of": revision_of,
+        "package": package,
+        "created_at": created_at,
+        "progress": 0,
+        "result": None,
+        "error": None
+    }
+
+    # Queue analysis behind the tenant scheduler, or attach to an identical
+    # one of the same tenant and lane already in flight (in production, use
+    # Celery/RQ); a batch upload never holds back an interactive one
+    flight_key = content_key(contract_text, settings.analysis_fingerprint(), revision_of or "", tenant, priority)
+    flight, leader = ANALYSIS_FLIGHTS.submit(flight_key, analysis_id, lambda: ANALYSIS_SCHEDULER.run(
+        tenant,
+        priority,
+        estimate_analysis_tokens(len(contract_text)),
+        lambda: ANALYSIS_EXECUTOR.analyze(
+            contract_text, filename, page_index,
+            on_progress=lambda update: _record_flight_progress(flight_key, update),
+            analysis_id=analysis_id,
+            revision_of=revision_of,
+            metadata={"tenant": tenant, "priority": priority, "created_at": created_at, "package": package}
+        )
+    ))
+    if not leader:
+        ANALYSIS_STORAGE[analysis_id]["coalesced_with"] = ANALYSIS_FLIGHTS.members(flight_key)[0]
+    task = asyncio.create_task(_run_analysis(analysis_id, flight, filename, file_path, contract_text))
+    return analysis_id, task
 
-        # Run analysis
-        result = await ANALYSIS_EXECUTOR.analyze(contract_text, filename)
 
-        # Format result for response
-        metadata = ContractMetadata(
-            filename=filename,
-            file_type="pdf" if filename.endswith(".pdf") else "txt",
-            page_count=result.get("page_count", 0),
-            word_count=result.get("word_count", 0)
-        )
+async def resume_interrupted_analyses() -> int:
+    """
+    Requeue analyses interrupted by the previous shutdown or crash.
 
-        # Format risks
-        risks = []
-        for risk in result.get("scored_risks", []):
-            remediation = RemediationModel(
-                suggestion=risk.get("remediation", {}).get("suggestion", ""),
-                priority=risk.get("remediation", {}).get("priority", "MEDIUM"),
-                effort=risk.get("remediation", {}).get("effort", "MEDIUM")
-            )
+    Each continues from its last checkpointed node under its original
+    analysis ID, tenant and priority. Uploads that had been coalesced onto
+    an interrupted analysis are not restored.
 
-            risk_model = RiskModel(
-                risk_id=risk.get("risk_id", ""),
-                category=risk.get("category", ""),
-                title=risk.get("title", ""),
-                description=risk.get("description", ""),
-                severity_score=risk.get("severity_score", 50),
-                severity_level=risk.get("severity_level", "MEDIUM"),
-                affected_clause=risk.get("affected_clause", ""),
-                explanation=risk.get("explanation", ""),
-                evidence=risk.get("evidence", []),
-                remediation=remediation
-            )
-            risks.append(risk_model)
-
-        formatted_result = {
-            "analysis_id": result.get("analysis_id", analysis_id),
-            "status": "completed",
-            "contract_metadata": metadata.dict(),
-            "risks": [r.dict() for r in risks],
-            "overall_risk_score": result.get("overall_risk_score", 0),
-            "summary": result.get("summary", ""),
-            "analyzed_at": datetime.utcnow().isoformat()
+    Returns:
+        Number of analyses resumed
+    """
+    runs = ANALYSIS_EXECUTOR.interrupted()
+    for run in runs:
+        analysis_id = run.thread_id
+        metadata = run.metadata
+        ANALYSIS_STORAGE[analysis_id] = {
+            "status": "pending",
+            "filename": metadata.get("filename", ""),
+            "tenant": metadata.get("tenant", "default"),
+            "priority": metadata.get("priority", INTERACTIVE),
+            "revision_of": metadata.get("revision_of"),
+            "package": metadata.get("package"),
+            "created_at": metadata.get("created_at") or datetime.utcnow().isoformat(),
+            "progress": 0,
+            "result": None,
+            "error": None
         }
+        analysis = ANALYSIS_SCHEDULER.run(
+            metadata.get("tenant", "default"),
+            metadata.get("priority", INTERACTIVE),
+            estimate_analysis_tokens(len(run.text)),
+            lambda run=run, analysis_id=analysis_id: ANALYSIS_EXECUTOR.resume(
+                run, on_progress=lambda update: _record_progress(analysis_id, update)
+            )
+        )
+        asyncio.create_task(_run_analysis(analysis_id, analysis, metadata.get("filename", ""), None, run.text))
+        logger.info(f"Resuming interrupted analysis {analysis_id}")
+    return len(runs)
+
+
+def _record_flight_progress(flight_key: str, update: dict):
+    """Copy a progress update into the status record of every upload sharing the analysis."""
+    for analysis_id in ANALYSIS_FLIGHTS.members(flight_key):
+        _record_progress(analysis_id, update)
+
+
+def _record_progress(analysis_id: str, update: dict):
+    """Copy a progress update from the analysis graph into the status record."""
+    analysis = ANALYSIS_STORAGE.get(analysis_id)
+    if analysis is None:
+        return
+    analysis["status"] = "processing"
+    analysis["current_step"] = update["step"]
+    analysis["progress"] = max(analysis.get("progress", 0), update["progress"])
+    analysis["clauses_extracted"] = update.get("clauses", 0)
+    analysis["risks_detected"] = update.get("risks", 0)
+
+
+def format_analysis_result(analysis_id: str, filename: str, result: dict) -> dict:
+    """
+    Format a finished analysis for the results endpoint.
+
+    Args:
+        analysis_id: Analysis ID
+        filename: Original file name
+        result: Result dictionary returned by AnalysisExecutor
+
+    Returns:
+        JSON-serializable result matching AnalysisResultModel
+    """
+    metadata = ContractMetadata(
+        filename=filename,
+        file_type=Path(filename).suffix.lower().lstrip(".") or "txt",
+        page_count=result.get("page_count", 0),
+        word_count=result.get("word_count", 0)
+    )
+
+    # Format risks
+    risks = []
+    for risk in result.get("scored_risks", []):
+        remediation = RemediationModel(
+            suggestion=risk.remediation_suggestion or "",
+            priority=risk.remediation_priority or "MEDIUM",
+            effort=risk.remediation_effort or "MEDIUM"
+        )
+
+        risk_model = RiskModel(
+            risk_id=risk.risk_id,
+            category=risk.category,
+            title=risk.title,
+            description=risk.description,
+            severity_score=risk.severity_score,
+            severity_level=risk.severity_level or "MEDIUM",
+            affected_clause=risk.affected_clause,
+            explanation=risk.explanation,
+            evidence=risk.evidence,
+            evidence_locations=[
+                EvidenceLocation(quote=quote, page=loc.page, start=loc.start, end=loc.end)
+                for quote, loc in zip(risk.evidence, risk.evidence_locations)
+                if loc is not None
+            ],
+            remediation=remediation
+        )
+        risks.append(risk_model)
+
+    return {
+        "analysis_id": analysis_id,
+        "status": "completed",
+        "contract_metadata": metadata.dict(),
+        "risks": [r.dict() for r in risks],
+        "overall_risk_score": result.get("overall_risk_score", 0),
+        "scoring_version": result.get("scoring_version") or None,
+        "summary": result.get("summary", ""),
+        "degradations": result.get("degradations", []),
+        "reused_from": result.get("reused_from") or None,
+        "similarity": result.get("similarity") if result.get("reused_from") else None,
+        "revision_of": result.get("revision_of") or None,
+        "revision_changes": result.get("revision_changes"),
+        "analyzed_at": datetime.utcnow().isoformat()
+    }
+
+
+def execution_completed(result: dict) -> bool:
+    """
+    Whether an analysis produced a result to keep and index.
+
+    That takes extracted clauses and scored risks; errors of detection or
+    remediation are not fatal and are reported with the result. Reuse by
+    later analyses is stricter (see remember_analysis).
+    """
+    return result.get("current_step") not in FAILED_STEPS and bool(result.get("extracted_clauses"))
+
+
+async def index_analysis_result(
+    analysis_id: str,
+    tenant: str,
+    contract_text: str,
+    result: dict,
+    formatted_result: dict
+) -> None:
+    """
+    Add a completed analysis to the detection store and the analytics and full-text search indexes.
+
+    Args:
+        analysis_id: Analysis ID
+        tenant: Tenant the analysis belongs to
+        contract_text: Analyzed contract text
+        result: Result dictionary returned by AnalysisExecutor
+        formatted_result: The result from format_analysis_result()
+    """
+    try:
+        await asyncio.to_thread(
+            DETECTIONS.add,
+            analysis_id,
+            tenant,
+            result.get("scored_risks", []),
+            result.get("scoring_version", ""),
+            formatted_result["overall_risk_score"],
+            formatted_result["contract_metadata"]["filename"],
+            formatted_result["analyzed_at"][:10],
+            formatted_result["summary"]
+        )
+        await asyncio.to_thread(RISK_ANALYTICS.add, analysis_id, tenant, formatted_result)
+        await asyncio.to_thread(
+            CONTRACT_SEARCH.add,
+            analysis_id,
+            tenant,
+            formatted_result["contract_metadata"]["filename"],
+            formatted_result["analyzed_at"],
+            contract_text,
+            result.get("extracted_clauses", []),
+            formatted_result["risks"]
+        )
+    except Exception as e:
+        # Indexes lag behind rather than failing the analysis
+        logger.warning(f"Failed to index analysis {analysis_id}: {str(e)}")
+
+
+async def rescore_stored_analyses(everything: bool = False) -> dict:
+    """
+    Re-score every stored analysis with the active scoring table, without the LLM.
+
+    Scores are recomputed from the stored detections and written to the
+    detection store, the analytics index and results still held in memory.
+
+    Args:
+        everything: Also re-score analyses already scored with the active table
+
+    Returns:
+        Dictionary with the version applied and the numbers of analyses and risks re-scored
+    """
+    table = active_scoring_table()
+    rescoring = await asyncio.to_thread(DETECTIONS.rescore, table, everything)
+    indexed = await asyncio.to_thread(
+        RISK_ANALYTICS.rescore, rescoring.analysis_ids, rescoring.counts, rescoring.scores, rescoring.levels
+    )
+
+    scores = rescoring.scores.tolist()
+    start = 0
+    for analysis_id, count, overall in zip(rescoring.analysis_ids, rescoring.counts.tolist(), rescoring.overall.tolist()):
+        result = ANALYSIS_STORAGE.get(analysis_id, {}).get("result")
+        if result and len(result["risks"]) == count:
+            for risk, score in zip(result["risks"], scores[start:start + count]):
+                level = rescoring.levels[score]
+                if risk["remediation"]["priority"] == risk["severity_level"]:
+                    risk["remediation"]["priority"] = level  # Priority follows the level by default
+                risk["severity_score"], risk["severity_level"] = score, level
+            result["overall_risk_score"] = overall
+            result["scoring_version"] = table.version
+        start += count
+
+    logger.info(
+        f"Re-scored {len(rescoring.analysis_ids)} analyses ({len(scores)} risks) with scoring table {table.version}"
+    )
+    return {
+        "version": table.version,
+        "analyses": len(rescoring.analysis_ids),
+        "risks": len(scores),
+        "indexed_risks": indexed
+    }
+
+
+async def _run_analysis(
+    analysis_id: str,
+    analysis: Awaitable[dict],
+    filename: str,
+    file_path: Optional[str],
+    contract_text: str
+):
+    """Wait for the (possibly shared) analysis in background and store its result."""
+    try:
+        logger.info(f"Waiting for analysis: {analysis_id}")
+
+        result = await analysis
+
+        formatted_result = format_analysis_result(analysis_id, filename, result)
+        formatted_result["package"] = ANALYSIS_STORAGE[analysis_id].get("package")
 
         ANALYSIS_STORAGE[analysis_id]["result"] = formatted_result
+        if not execution_completed(result):
+            error = "; ".join(result.get("errors") or ["Analysis failed"])
+            logger.warning(f"Analysis {analysis_id} did not complete, not indexing it: {error}")
+            ANALYSIS_STORAGE[analysis_id]["status"] = "failed"
+            ANALYSIS_STORAGE[analysis_id]["error"] = error
+            ANALYSIS_STORAGE[analysis_id]["progress"] = 0
+            return
+
+        await index_analysis_result(
+            analysis_id, ANALYSIS_STORAGE[analysis_id]["tenant"], contract_text, result, formatted_result
+        )
+        leader = ANALYSIS_STORAGE[analysis_id].get("coalesced_with")
+        if leader:
+            # Only the leader was indexed for reuse; let revisions name this upload too
+            await asyncio.to_thread(SIMILARITY_INDEX.alias, analysis_id, leader)
         ANALYSIS_STORAGE[analysis_id]["status"] = "completed"
         ANALYSIS_STORAGE[analysis_id]["completed_at"] = datetime.utcnow().isoformat()
         ANALYSIS_STORAGE[analysis_id]["progress"] = 100
@@ -190,8 +488,9 @@ async def _run_analysis(analysis_id: str, contract_text: str, filename: str, fil
         ANALYSIS_STORAGE[analysis_id]["progress"] = 0
 
     finally:
-        # Cleanup temp file
+        # Cleanup temp file (none for resumed analyses)
         try:
-            FileHandler.cleanup_temp_file(file_path)
+            if file_path:
+                FileHandler.cleanup_temp_file(file_path)
         except Exception as e:
             logger.warning(f"Failed to cleanup temp file: {str(e)}")
@@ -4,6 +4,7 @@ Health check endpoints.
 
 from fastapi import APIRouter
 from datetime import datetime
+from app.utils.metrics import METRICS
 
 router = APIRouter(prefix="/api/v1", tags=["health"])
 
@@ -17,3 +18,9 @@ async def health_check():
         "timestamp": datetime.utcnow().isoformat(),
         "version": "1.0.0"
     }
+
+
+@router.get("/metrics")
+async def metrics():
+    """Current process metrics (LLM concurrency limit, request counters)."""
+    return METRICS.snapshot()
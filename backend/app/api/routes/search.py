@@ -0,0 +1,50 @@
+"""
+Full-text search endpoints.
+"""
+
+import asyncio
+import logging
+from typing import Optional
+from fastapi import APIRouter, Query
+from app.utils.logger import setup_logger
+from app.core.search import CONTRACT_SEARCH
+from app.api.schemas.search import SearchHitModel, SearchResponse
+
+logger = setup_logger(__name__)
+
+router = APIRouter(prefix="/api/v1", tags=["search"])
+
+
+@router.get("/search", response_model=SearchResponse)
+async def search_contracts(
+    q: str = Query(..., min_length=1, max_length=500, description="Words to search for"),
+    kind: Optional[str] = Query(default=None, pattern="^(contract|clause|evidence)$"),
+    tenant: Optional[str] = Query(default=None),
+    phrase: bool = Query(default=False, description="Match the words as an exact phrase"),
+    limit: int = Query(default=20, ge=1, le=100),
+    offset: int = Query(default=0, ge=0)
+):
+    """
+    Search the text of analyzed contracts, their extracted clauses and risk evidence.
+
+    Every word must appear in a passage (stemmed, so "terminate" also finds
+    "termination"), or with phrase=true the words in order. Hits are ranked
+    by BM25 with clause and risk titles weighted above body text.
+    """
+    hits = await asyncio.to_thread(CONTRACT_SEARCH.search, q, phrase, kind, tenant, limit, offset)
+    return SearchResponse(
+        query=q,
+        hits=[
+            SearchHitModel(
+                analysis_id=hit.analysis_id,
+                filename=hit.filename,
+                tenant=hit.tenant,
+                kind=hit.kind,
+                title=hit.title,
+                page=hit.page,
+                snippet=hit.snippet,
+                score=hit.score
+            )
+            for hit in hits
+        ]
+    )
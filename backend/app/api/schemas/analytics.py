@@ -0,0 +1,56 @@
+"""
+Pydantic models for portfolio risk analytics.
+"""
+
+from typing import Dict, List
+from pydantic import BaseModel, Field
+
+
+class RiskCountResponse(BaseModel):
+    """Number of risks matching a filter."""
+    risks: int = Field(..., ge=0, description="Matching risks")
+    contracts: int = Field(..., ge=0, description="Analyses with at least one matching risk")
+
+
+class HistogramBucket(BaseModel):
+    """One bucket of a histogram."""
+    key: str
+    count: int = Field(..., ge=0)
+
+
+class RiskHistogramResponse(BaseModel):
+    """Matching risks counted per value of a field."""
+    field: str
+    buckets: List[HistogramBucket]
+
+
+class RankedRisk(BaseModel):
+    """A risk from the analytics index."""
+    analysis_id: str
+    tenant: str
+    category: str
+    title: str
+    severity_score: int = Field(..., ge=0, le=100)
+    severity_level: str
+    analyzed_on: str
+
+
+class TopRisksResponse(BaseModel):
+    """Highest-scored matching risks."""
+    risks: List[RankedRisk]
+
+
+class ScoringStatusResponse(BaseModel):
+    """Scoring tables and the versions stored analyses are scored with."""
+    active_version: str = Field(..., description="Table new analyses are scored with (SCORING_VERSION)")
+    versions: List[str] = Field(..., description="Available scoring tables")
+    stored_analyses: Dict[str, int] = Field(..., description="Stored analyses per scoring version")
+
+
+class RescoreResponse(BaseModel):
+    """Outcome of a bulk re-scoring."""
+    version: str
+    analyses: int = Field(..., ge=0, description="Analyses re-scored")
+    risks: int = Field(..., ge=0, description="Risks re-scored")
+    indexed_risks: int = Field(..., ge=0, description="Risks updated in the analytics index")
+    duration_ms: float
@@ -3,7 +3,7 @@ Pydantic models for contract operations.
 """
 
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Dict, List, Optional
 
 
 class AnalysisStatusResponse(BaseModel):
@@ -11,9 +11,13 @@ class AnalysisStatusResponse(BaseModel):
     analysis_id: str
     status: str = Field(..., description="Status: pending, processing, completed, failed")
     progress_percentage: int = Field(default=0, ge=0, le=100)
+    current_step: Optional[str] = None
+    clauses_extracted: int = Field(default=0, ge=0, description="Clauses parsed so far")
+    risks_detected: int = Field(default=0, ge=0, description="Risks found so far")
     created_at: Optional[str] = None
     completed_at: Optional[str] = None
     error_message: Optional[str] = None
+    coalesced_with: Optional[str] = Field(default=None, description="Analysis ID this upload shares its run with")
 
 
 class UploadResponse(BaseModel):
@@ -22,3 +26,35 @@ class UploadResponse(BaseModel):
     status: str = "pending"
     created_at: str
     message: str = "Contract received and queued for analysis"
+
+
+class BatchItemResponse(BaseModel):
+    """One file of a batch."""
+    filename: str
+    analysis_id: Optional[str] = Field(default=None, description="Analysis ID, or None if the file was rejected")
+    status: str = Field(..., description="Status: rejected, pending, processing, completed, failed")
+    progress_percentage: int = Field(default=0, ge=0, le=100)
+    error_message: Optional[str] = None
+
+
+class BatchUploadResponse(BaseModel):
+    """Response model for batch upload."""
+    batch_id: str
+    status: str = "pending"
+    created_at: str
+    accepted: int = Field(..., ge=0, description="Files queued for analysis")
+    rejected: int = Field(..., ge=0, description="Files that could not be analyzed")
+    items: List[BatchItemResponse]
+    message: str = "Contracts received and queued for analysis"
+
+
+class BatchStatusResponse(BaseModel):
+    """Response model for aggregate batch progress."""
+    batch_id: str
+    status: str = Field(..., description="Status: pending, processing, completed")
+    progress_percentage: int = Field(default=0, ge=0, le=100, description="Mean progress of the accepted files")
+    total: int = Field(..., ge=0)
+    counts: Dict[str, int] = Field(default_factory=dict, description="Number of files per status")
+    created_at: Optional[str] = None
+    completed_at: Optional[str] = None
+    items: List[BatchItemResponse]
@@ -2,7 +2,7 @@
 Pydantic models for risk data structures.
 """
 
-from typing import List
+from typing import List, Optional
 from enum import Enum
 from pydantic import BaseModel, Field
 
@@ -32,6 +32,14 @@ class RemediationModel(BaseModel):
     effort: str = Field(..., description="Implementation effort level")
 
 
+class EvidenceLocation(BaseModel):
+    """Where an evidence quote appears in the contract."""
+    quote: str = Field(..., description="Evidence quote")
+    page: int = Field(..., ge=1, description="1-based page number")
+    start: int = Field(..., ge=0, description="Start character offset")
+    end: int = Field(..., ge=0, description="End character offset")
+
+
 class RiskModel(BaseModel):
     """Individual risk model."""
     risk_id: str = Field(..., description="Unique risk identifier")
@@ -43,6 +51,9 @@ class RiskModel(BaseModel):
     affected_clause: str = Field(..., description="Affected contract clause")
     explanation: str = Field(..., description="Why this is problematic")
     evidence: List[str] = Field(default_factory=list, description="Evidence quotes")
+    evidence_locations: List[EvidenceLocation] = Field(
+        default_factory=list, description="Page and span of each evidence quote found in the contract"
+    )
     remediation: RemediationModel = Field(..., description="Remediation suggestion")
 
 
@@ -54,6 +65,58 @@ class ContractMetadata(BaseModel):
     word_count: int = 0
 
 
+class RiskChangeModel(BaseModel):
+    """A risk that differs between a parent analysis and its revision."""
+    category: str
+    title: str
+    severity_level: str
+    previous_severity_level: Optional[str] = None
+
+
+class RevisionChangesModel(BaseModel):
+    """Risk changes since the parent analysis."""
+    appeared: List[RiskChangeModel] = Field(default_factory=list)
+    disappeared: List[RiskChangeModel] = Field(default_factory=list)
+    changed: List[RiskChangeModel] = Field(default_factory=list, description="Risks whose severity changed")
+
+
+class PackageMemberModel(BaseModel):
+    """Extraction stats of one file of a contract package."""
+    name: str
+    role: str = Field(..., description="Role: master, exhibit or skipped")
+    size_bytes: int = Field(..., ge=0)
+    compressed_bytes: int = Field(..., ge=0)
+    label: Optional[str] = Field(None, description="Exhibit label, e.g. 'Exhibit A'")
+    characters: int = Field(default=0, ge=0)
+    pages: int = Field(default=0, ge=0)
+    first_page: Optional[int] = Field(None, description="Page of the analyzed text the file starts on")
+    parse_ms: float = Field(default=0.0, ge=0)
+    error: Optional[str] = None
+
+
+class SectionReferenceModel(BaseModel):
+    """A master agreement section referring to an exhibit."""
+    heading: Optional[str] = None
+    page: int = Field(..., ge=1)
+
+
+class CrossReferenceModel(BaseModel):
+    """Where the master agreement refers to an exhibit."""
+    label: Optional[str] = None
+    member: str
+    sections: List[SectionReferenceModel] = Field(default_factory=list)
+
+
+class PackageModel(BaseModel):
+    """Contract package an analysis was combined from."""
+    master: str
+    members: List[PackageMemberModel]
+    cross_references: List[CrossReferenceModel] = Field(default_factory=list)
+    unresolved_references: List[str] = Field(
+        default_factory=list, description="Exhibits the master refers to that are not in the package"
+    )
+
+
 class AnalysisResultModel(BaseModel):
     """Complete analysis result model."""
     analysis_id: str
@@ -61,5 +124,12 @@ class AnalysisResultModel(BaseModel):
     contract_metadata: ContractMetadata
     risks: List[RiskModel]
     overall_risk_score: int = Field(..., ge=0, le=100)
+    scoring_version: Optional[str] = Field(None, description="Scoring table the severity scores come from")
     summary: str
+    degradations: List[str] = Field(default_factory=list, description="Shortcuts taken under deadline or load pressure")
+    reused_from: Optional[str] = Field(None, description="Prior analysis whose clauses were reused")
+    similarity: Optional[float] = Field(None, description="Estimated similarity to the reused analysis")
+    revision_of: Optional[str] = Field(None, description="Parent analysis this contract revises")
+    revision_changes: Optional[RevisionChangesModel] = None
+    package: Optional[PackageModel] = None
     analyzed_at: str
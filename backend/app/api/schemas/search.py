@@ -0,0 +1,24 @@
+"""
+Pydantic models for full-text search.
+"""
+
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+
+class SearchHitModel(BaseModel):
+    """A passage matching a search."""
+    analysis_id: str
+    filename: str
+    tenant: str
+    kind: str = Field(..., description="contract, clause or evidence")
+    title: str = Field(..., description="File name, clause title or risk title")
+    page: Optional[int] = Field(default=None, ge=1, description="1-based page number, when known")
+    snippet: str = Field(..., description="Matching excerpt with terms wrapped in <mark> tags")
+    score: float = Field(..., description="BM25 relevance; higher is better")
+
+
+class SearchResponse(BaseModel):
+    """Search results, best first."""
+    query: str
+    hits: List[SearchHitModel]
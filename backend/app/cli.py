@@ -0,0 +1,281 @@
+"""
+Command-line batch analyzer for directories of contracts.
+
+Usage:
+    python -m app.cli CONTRACTS_DIR --output results.jsonl [--concurrency N] [--workers N]
+
+Runs the same analysis graph as the API, with its LLM limiter, clause memo
+and similarity index, without a web server. Re-running the same command
+resumes an interrupted run.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from app.config import settings
+from app.utils.logger import setup_logger
+from app.utils.exceptions import ContractAnalysisError
+from app.core.file_handler import FileHandler
+from app.core.page_index import PageIndex
+from app.core.scheduler import AnalysisScheduler, BATCH, estimate_analysis_tokens
+from app.agents.checkpoint import InterruptedRun, SQLiteCheckpointSaver
+from app.agents.graph import AnalysisExecutor
+from app.api.routes.contracts import execution_completed, format_analysis_result, index_analysis_result
+
+logger = setup_logger(__name__, settings.log_level)
+
+# Statuses that mark a file as done; failed analyses are retried on resume
+DONE_STATUSES = {"completed", "rejected"}
+PROGRESS_EVERY = 25  # Log progress after this many files
+
+
+def discover(root: Path) -> Iterator[Path]:
+    """Contract files under a directory, in a stable order (hidden files skipped)."""
+    allowed = set(settings.get_allowed_file_types())
+    for directory, subdirectories, filenames in os.walk(root):
+        subdirectories[:] = sorted(d for d in subdirectories if not d.startswith("."))
+        for filename in sorted(filenames):
+            if not filename.startswith(".") and Path(filename).suffix.lower().lstrip(".") in allowed:
+                yield Path(directory) / filename
+
+
+def analysis_id_for(relative_path: str) -> str:
+    """Stable analysis ID for a file, so a re-run resumes (and re-indexes) the same analysis."""
+    name = Path(relative_path).name.replace(".", "_")
+    return f"{name}_{hashlib.sha1(relative_path.encode('utf-8')).hexdigest()[:12]}"
+
+
+def load_done(output: Path) -> Set[str]:
+    """Relative paths already finished according to an existing output file."""
+    done: Set[str] = set()
+    if not output.exists():
+        return done
+    with open(output, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # Torn last line of an interrupted run
+            if record.get("status") in DONE_STATUSES:
+                done.add(record["path"])
+    return done
+
+
+def parse_file(file_path: str) -> Tuple[Optional[str], Optional[List[int]], Optional[str]]:
+    """
+    Extract a contract's text (runs in a worker process).
+
+    Returns:
+        Tuple of (text, page start offsets, error), with an error instead of
+        the text for a file that cannot be analyzed
+    """
+    try:
+        contract_text, page_index = FileHandler.extract_contract_text(file_path, file_path)
+        return contract_text, list(page_index.starts) if page_index else None, None
+    except ContractAnalysisError as e:
+        return None, None, str(e)
+
+
+class BatchRun:
+    """
+    Analyze every contract under a directory, appending one JSON line per file.
+
+    Files are parsed in a process pool and analyzed by a bounded number of
+    concurrent analyses, admitted by a scheduler with the service's
+    per-tenant token budget. At most a few files per worker are held parsed
+    in memory ahead of the analyses, so the directory can be any size.
+
+    Progress is checkpointed twice: the output file records finished files,
+    and the graph checkpoints (next to the output) let analyses cut off
+    mid-way resume from their last completed step.
+    """
+
+    def __init__(self, root: Path, output: Path, concurrency: int, workers: int, tenant: str):
+        """
+        Initialize the run.
+
+        Args:
+            root: Directory to analyze
+            output: JSON Lines file to append results to
+            concurrency: Analyses running at once
+            workers: Parsing processes
+            tenant: Tenant the analyses are billed to
+        """
+        self.root = root
+        self.output = output
+        self.concurrency = max(1, concurrency)
+        self.workers = max(1, workers)
+        self.tenant = tenant
+        self.scheduler = AnalysisScheduler(
+            max_concurrent=self.concurrency,
+            tenant_tokens_per_minute=settings.tenant_tokens_per_minute,
+            tenant_max_concurrent=self.concurrency
+        )
+        self.executor = AnalysisExecutor(
+            SQLiteCheckpointSaver(path=str(output.with_name(output.name + ".checkpoints.db")))
+        )
+        self.counts: Dict[str, int] = {}
+        self.total = 0
+        self._started = 0.0
+
+    async def run(self) -> Dict[str, int]:
+        """
+        Analyze the files not finished by a previous run.
+
+        Returns:
+            Number of files per outcome status
+        """
+        done = load_done(self.output)
+        pending = [
+            path for path in discover(self.root)
+            if path.relative_to(self.root).as_posix() not in done
+        ]
+        pending_paths = {path.relative_to(self.root).as_posix() for path in pending}
+        interrupted = {}
+        for run in self.executor.interrupted():
+            if run.metadata.get("path") in pending_paths:
+                interrupted[run.metadata["path"]] = run
+            else:
+                self.executor.checkpointer.finish(run.thread_id)  # Finished or no longer there
+
+        logger.info(
+            f"Analyzing {len(pending)} files under {self.root} ({len(done)} already done, "
+            f"{len(interrupted)} to resume) with {self.concurrency} concurrent analyses "
+            f"and {self.workers} parsing processes"
+        )
+        self._started = time.monotonic()
+        self.total = len(pending)
+        if not pending:
+            return self.counts
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency)
+        self.output.parent.mkdir(parents=True, exist_ok=True)
+        with ProcessPoolExecutor(max_workers=self.workers) as pool, open(self.output, "a", encoding="utf-8") as out:
+            analyzers = [asyncio.create_task(self._analyze(queue, out)) for _ in range(self.concurrency)]
+            await self._parse_all(pending, interrupted, pool, queue)
+            for _ in analyzers:
+                await queue.put(None)
+            await asyncio.gather(*analyzers)
+
+        logger.info(f"Finished in {time.monotonic() - self._started:.0f}s: {self.counts}")
+        return self.counts
+
+    async def _parse_all(
+        self,
+        pending: List[Path],
+        interrupted: Dict[str, InterruptedRun],
+        pool: ProcessPoolExecutor,
+        queue: asyncio.Queue
+    ) -> None:
+        """Parse pending files in the process pool and queue them for analysis."""
+        loop = asyncio.get_running_loop()
+        slots = asyncio.Semaphore(self.workers * 2)
+
+        async def parse(path: Path, relative_path: str) -> None:
+            try:
+                text, page_starts, error = await loop.run_in_executor(pool, parse_file, str(path))
+                await queue.put((relative_path, None, text, page_starts, error))
+            finally:
+                slots.release()
+
+        tasks = []
+        for path in pending:
+            relative_path = path.relative_to(self.root).as_posix()
+            run = interrupted.get(relative_path)
+            if run is not None:
+                # The checkpoint has the text already
+                await queue.put((relative_path, run, run.text, run.page_starts, None))
+                continue
+            await slots.acquire()
+            tasks.append(asyncio.create_task(parse(path, relative_path)))
+        await asyncio.gather(*tasks)
+
+    async def _analyze(self, queue: asyncio.Queue, out) -> None:
+        """Analyze queued files until the end marker."""
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            relative_path, run, text, page_starts, error = item
+            record = {"path": relative_path, "analysis_id": analysis_id_for(relative_path)}
+
+            if error is not None:
+                record.update({"status": "rejected", "error": error})
+            else:
+                try:
+                    result = await self.scheduler.run(
+                        self.tenant, BATCH, estimate_analysis_tokens(len(text)),
+                        lambda: self._start(relative_path, run, text, page_starts)
+                    )
+                    if not execution_completed(result):
+                        # Recorded as failed so the next run retries the file
+                        record.update({"status": "failed", "error": "; ".join(result.get("errors") or ["Analysis failed"])})
+                    else:
+                        record.update({
+                            "status": "completed",
+                            "result": format_analysis_result(record["analysis_id"], Path(relative_path).name, result)
+                        })
+                        await index_analysis_result(record["analysis_id"], self.tenant, text, result, record["result"])
+                except Exception as e:
+                    logger.error(f"Analysis of {relative_path} failed: {str(e)}")
+                    record.update({"status": "failed", "error": str(e)})
+
+            out.write(json.dumps(record, default=str) + "\n")
+            out.flush()
+            self._count(record["status"])
+
+    def _start(self, relative_path: str, run: Optional[InterruptedRun], text: str, page_starts: Optional[List[int]]):
+        if run is not None:
+            return self.executor.resume(run)
+        return self.executor.analyze(
+            text,
+            Path(relative_path).name,
+            PageIndex(page_starts) if page_starts else None,
+            analysis_id=analysis_id_for(relative_path),
+            metadata={"path": relative_path, "tenant": self.tenant, "created_at": datetime.utcnow().isoformat()}
+        )
+
+    def _count(self, status: str) -> None:
+        self.counts[status] = self.counts.get(status, 0) + 1
+        finished = sum(self.counts.values())
+        if finished % PROGRESS_EVERY == 0 or finished == self.total:
+            elapsed = time.monotonic() - self._started
+            logger.info(
+                f"{finished}/{self.total} files ({finished / elapsed * 60:.1f}/min): {self.counts}"
+            )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point; returns the exit status."""
+    parser = argparse.ArgumentParser(description="Analyze every contract under a directory")
+    parser.add_argument("directory", type=Path, help="Directory to search for PDF and TXT contracts")
+    parser.add_argument("-o", "--output", type=Path, required=True,
+                        help="JSON Lines file to append results to; re-running resumes from it")
+    parser.add_argument("-c", "--concurrency", type=int, default=settings.max_concurrent_analyses,
+                        help="Analyses running at once (default: MAX_CONCURRENT_ANALYSES)")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1,
+                        help="PDF parsing processes (default: number of CPUs)")
+    parser.add_argument("--tenant", default="default",
+                        help="Tenant whose token budget the analyses count against")
+    args = parser.parse_args(argv)
+
+    if not args.directory.is_dir():
+        parser.error(f"Not a directory: {args.directory}")
+
+    run = BatchRun(args.directory, args.output, args.concurrency, args.workers, args.tenant)
+    counts = asyncio.run(run.run())
+    return 1 if counts.get("failed") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
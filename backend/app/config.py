@@ -29,12 +29,33 @@ class Settings(BaseSettings):
     openai_api_key: str = Field(..., env="OPENAI_API_KEY", description="OpenAI API Key")
     openai_model: str = Field(default="gpt-4o-mini", env="OPENAI_MODEL")
     openai_temperature: float = Field(default=0.1, env="OPENAI_TEMPERATURE")
+    extraction_model: str = Field(default="", env="EXTRACTION_MODEL")  # Empty = OPENAI_MODEL
+    detection_model: str = Field(default="", env="DETECTION_MODEL")  # Empty = OPENAI_MODEL
+    cascade_enabled: bool = Field(default=False, env="CASCADE_ENABLED")
+    cascade_small_model: str = Field(default="gpt-4o-mini", env="CASCADE_SMALL_MODEL")
+    cascade_max_chars: int = Field(default=60000, env="CASCADE_MAX_CHARS")
+    cascade_risk_threshold: int = Field(default=2, env="CASCADE_RISK_THRESHOLD")  # 0 = never skip on risk
+    cascade_min_confidence: float = Field(default=0.6, env="CASCADE_MIN_CONFIDENCE")
+    llm_initial_concurrency: int = Field(default=4, env="LLM_INITIAL_CONCURRENCY")
+    llm_min_concurrency: int = Field(default=1, env="LLM_MIN_CONCURRENCY")
+    llm_max_concurrency: int = Field(default=32, env="LLM_MAX_CONCURRENCY")
+    llm_max_retries: int = Field(default=4, env="LLM_MAX_RETRIES")
+    hedge_enabled: bool = Field(default=False, env="HEDGE_ENABLED")
+    hedge_percentile: float = Field(default=95.0, env="HEDGE_PERCENTILE")
+    hedge_budget_percent: float = Field(default=5.0, env="HEDGE_BUDGET_PERCENT")
+    hedge_min_samples: int = Field(default=20, env="HEDGE_MIN_SAMPLES")
+    structured_output_mode: str = Field(default="json_schema", env="STRUCTURED_OUTPUT_MODE")  # json_schema, json_object or none
 
     # Application Settings
     environment: str = Field(default="development", env="ENVIRONMENT")
     log_level: str = Field(default="INFO", env="LOG_LEVEL")
     max_file_size_mb: int = Field(default=10, env="MAX_FILE_SIZE_MB")
     allowed_file_types: str = Field(default="pdf,txt", env="ALLOWED_FILE_TYPES")
+    max_batch_files: int = Field(default=500, env="MAX_BATCH_FILES")
+    max_archive_size_mb: int = Field(default=200, env="MAX_ARCHIVE_SIZE_MB")
+    max_extracted_size_mb: int = Field(default=500, env="MAX_EXTRACTED_SIZE_MB")  # Total uncompressed per archive
+    max_package_files: int = Field(default=100, env="MAX_PACKAGE_FILES")
+    parse_workers: int = Field(default=4, env="PARSE_WORKERS")  # Processes parsing archive members; 0 = threads
 
     # CORS Settings
     cors_origins: str = Field(
@@ -45,6 +66,25 @@ class Settings(BaseSettings):
     # Analysis Settings
     max_concurrent_analyses: int = Field(default=5, env="MAX_CONCURRENT_ANALYSES")
     analysis_timeout_seconds: int = Field(default=300, env="ANALYSIS_TIMEOUT_SECONDS")
+    degradation_enabled: bool = Field(default=True, env="DEGRADATION_ENABLED")
+    degraded_max_clauses: int = Field(default=12, env="DEGRADED_MAX_CLAUSES")
+    prescreen_enabled: bool = Field(default=True, env="PRESCREEN_ENABLED")
+    detection_batch_size: int = Field(default=8, env="DETECTION_BATCH_SIZE")  # 0 = detect after extraction
+    scoring_version: str = Field(default="v1", env="SCORING_VERSION")
+    scoring_tables_file: str = Field(default="", env="SCORING_TABLES_FILE")  # JSON of versions beyond the built-in v1
+
+    # Analysis Reuse
+    data_dir: str = Field(default="data", env="DATA_DIR")
+    similarity_enabled: bool = Field(default=True, env="SIMILARITY_ENABLED")  # Automatic near-duplicate reuse
+    similarity_threshold: float = Field(default=0.8, env="SIMILARITY_THRESHOLD")
+    clause_memo_enabled: bool = Field(default=True, env="CLAUSE_MEMO_ENABLED")
+    checkpoint_enabled: bool = Field(default=True, env="CHECKPOINT_ENABLED")  # Resume interrupted analyses on startup
+
+    # Tenant Scheduling
+    tenant_tokens_per_minute: int = Field(default=400000, env="TENANT_TOKENS_PER_MINUTE")
+    tenant_max_concurrent_analyses: int = Field(default=3, env="TENANT_MAX_CONCURRENT_ANALYSES")
+    tenant_weights: str = Field(default="", env="TENANT_WEIGHTS")  # e.g. "legal:3,procurement:1"
+    interactive_reserved_analyses: int = Field(default=1, env="INTERACTIVE_RESERVED_ANALYSES")  # Slots batch jobs never take
 
     model_config = SettingsConfigDict(
         env_file=find_env_file(),
@@ -61,6 +101,24 @@ class Settings(BaseSettings):
         """Get list of CORS origins."""
         return [origin.strip() for origin in self.cors_origins.split(",")]
 
+    def get_tenant_weights(self) -> dict:
+        """Get fair-share weight per tenant."""
+        weights = {}
+        for entry in self.tenant_weights.split(","):
+            if ":" in entry:
+                tenant, weight = entry.rsplit(":", 1)
+                weights[tenant.strip()] = float(weight)
+        return weights
+
+    def analysis_fingerprint(self) -> str:
+        """Settings that change what an analysis produces, for keying shared or reused results."""
+        return "|".join(str(value) for value in (
+            self.openai_model, self.extraction_model, self.detection_model, self.openai_temperature,
+            self.cascade_enabled, self.cascade_small_model, self.cascade_max_chars,
+            self.cascade_risk_threshold, self.cascade_min_confidence,
+            self.structured_output_mode, self.prescreen_enabled
+        ))
+
     def validate_openai_key(self) -> None:
         """Validate that OpenAI API key is configured."""
         if not self.openai_api_key:
@@ -0,0 +1,425 @@
+"""
+Columnar index of analyzed risks for portfolio analytics.
+"""
+
+import logging
+import sqlite3
+import threading
+from dataclasses import dataclass
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import settings
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+SEVERITY_LEVELS = ("LOW", "MEDIUM", "HIGH", "CRITICAL")  # Codes follow severity order
+_EPOCH = np.datetime64("1970-01-01", "D")
+
+
+class _Dictionary:
+    """Dictionary encoding of a string column."""
+
+    __slots__ = ("values", "_codes")
+
+    def __init__(self, values: Iterable[str] = ()):
+        self.values: List[str] = []
+        self._codes: Dict[str, int] = {}
+        for value in values:
+            self.encode(value)
+
+    def encode(self, value: str) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def code(self, value: str) -> int:
+        """Code of a value, or -1 if it never occurred."""
+        return self._codes.get(value, -1)
+
+
+@dataclass(slots=True)
+class RiskFilter:
+    """Conditions on indexed risks; None matches everything."""
+    category: Optional[str] = None
+    tenant: Optional[str] = None
+    severity_level: Optional[str] = None  # This level or above
+    min_score: Optional[int] = None
+    max_score: Optional[int] = None
+    since: Optional[date] = None
+    until: Optional[date] = None  # Inclusive
+
+    def selects_risks(self) -> bool:
+        """Whether any condition is on the risks themselves rather than on their analysis."""
+        return any(
+            value is not None for value in (self.category, self.severity_level, self.min_score, self.max_score)
+        )
+
+
+class RiskAnalyticsIndex:
+    """
+    Risks of every completed analysis, held as NumPy columns.
+
+    Each risk is a row of category, severity score and level, tenant, analysis
+    and analysis date; strings are dictionary-encoded to small integers, so a
+    filter is a few vectorized comparisons and counts and histograms are a
+    bincount, without touching any stored result. Columns grow by doubling.
+
+    Rows are persisted in SQLite and loaded back on startup. Indexing an
+    analysis again (e.g. a re-analysis under the same ID) replaces its rows;
+    the replaced rows stay in memory as dead rows until the next restart.
+    """
+
+    def __init__(self, path: Optional[str], capacity: int = 1024):
+        """
+        Initialize the index, loading persisted rows.
+
+        Args:
+            path: SQLite file to persist to, or None to keep the index in memory
+            capacity: Initial number of rows to allocate
+        """
+        self._lock = threading.Lock()
+        self._size = 0
+        self._allocate(max(1, capacity))
+        self._categories = _Dictionary()
+        self._tenants = _Dictionary()
+        self._analysis_ids: List[str] = []
+        self._analysis_rows: Dict[str, Tuple[int, int]] = {}  # Analysis ID -> (first row, end row)
+        self._titles: List[str] = []
+
+        if path:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(path or ":memory:", check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS risks (analysis_id TEXT NOT NULL, tenant TEXT NOT NULL, "
+            "category TEXT NOT NULL, title TEXT NOT NULL, severity_score INTEGER NOT NULL, "
+            "severity_level TEXT NOT NULL, analyzed_on INTEGER NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS risks_analysis ON risks (analysis_id)")
+        self._db.commit()
+        self._load()
+
+    @classmethod
+    def from_settings(cls) -> "RiskAnalyticsIndex":
+        """Create the index persisted under DATA_DIR."""
+        return cls(str(Path(settings.data_dir) / "analytics.db"))
+
+    def _allocate(self, capacity: int) -> None:
+        def grow(column: Optional[np.ndarray], dtype) -> np.ndarray:
+            array = np.zeros(capacity, dtype=dtype)
+            if column is not None:
+                array[:self._size] = column[:self._size]
+            return array
+
+        self._category = grow(getattr(self, "_category", None), np.int16)
+        self._tenant = grow(getattr(self, "_tenant", None), np.int32)
+        self._analysis = grow(getattr(self, "_analysis", None), np.int32)
+        self._score = grow(getattr(self, "_score", None), np.int16)
+        self._level = grow(getattr(self, "_level", None), np.int8)
+        self._day = grow(getattr(self, "_day", None), np.int32)  # Days since 1970-01-01
+        self._live = grow(getattr(self, "_live", None), np.bool_)
+        self._rowid = grow(getattr(self, "_rowid", None), np.int64)  # SQLite rowid
+
+    def _load(self) -> None:
+        rows = self._db.execute(
+            "SELECT analysis_id, tenant, category, title, severity_score, severity_level, analyzed_on, rowid "
+            "FROM risks ORDER BY rowid"
+        ).fetchall()
+        if rows:
+            self._append(rows)
+            logger.info(f"Loaded {self._size} risks of {len(self._analysis_rows)} analyses into the analytics index")
+
+    def _append(self, rows: List[tuple]) -> None:
+        """
+        Append rows, grouped by analysis; an analysis already indexed has its old rows replaced.
+
+        Rows are the columns of the risks table followed by the SQLite rowid.
+        """
+        start, end = self._size, self._size + len(rows)
+        if end > len(self._score):
+            self._allocate(max(end, 2 * len(self._score)))
+
+        analyses = np.empty(len(rows), dtype=np.int32)
+        group_start = 0
+        for offset in range(len(rows) + 1):
+            if offset < len(rows) and offset > group_start and rows[offset][0] == rows[group_start][0]:
+                continue
+            if offset > group_start:
+                analysis_id = rows[group_start][0]
+                previous = self._analysis_rows.get(analysis_id)
+                if previous is not None:
+                    self._live[previous[0]:previous[1]] = False
+                    analysis = int(self._analysis[previous[0]])
+                else:
+                    analysis = self._new_analysis(analysis_id)
+                analyses[group_start:offset] = analysis
+                self._analysis_rows[analysis_id] = (start + group_start, start + offset)
+            group_start = offset
+
+        self._analysis[start:end] = analyses
+        self._category[start:end] = [self._categories.encode(row[2]) for row in rows]
+        self._tenant[start:end] = [self._tenants.encode(row[1]) for row in rows]
+        self._score[start:end] = [row[4] for row in rows]
+        self._level[start:end] = [_level_code(row[5]) for row in rows]
+        self._day[start:end] = [row[6] for row in rows]
+        self._rowid[start:end] = [row[7] for row in rows]
+        self._live[start:end] = True
+        self._titles.extend(row[3] for row in rows)
+        self._size = end
+
+    def _new_analysis(self, analysis_id: str) -> int:
+        self._analysis_ids.append(analysis_id)
+        return len(self._analysis_ids) - 1
+
+    def add(self, analysis_id: str, tenant: str, result: dict) -> None:
+        """
+        Index the risks of a completed analysis, replacing any indexed before under its ID.
+
+        Args:
+            analysis_id: Analysis ID
+            tenant: Tenant the analysis belongs to
+            result: Formatted analysis result (see format_analysis_result)
+        """
+        analyzed_on = _day_number(result.get("analyzed_at"))
+        rows = [
+            (analysis_id, tenant, _plain(risk["category"]), risk.get("title", ""),
+             int(risk["severity_score"]), _plain(risk["severity_level"]), analyzed_on)
+            for risk in result.get("risks", [])
+        ]
+        with self._lock:
+            self._db.execute("DELETE FROM risks WHERE analysis_id = ?", (analysis_id,))
+            self._db.executemany("INSERT INTO risks VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            rowids = self._db.execute(
+                "SELECT rowid FROM risks WHERE analysis_id = ? ORDER BY rowid", (analysis_id,)
+            ).fetchall()
+            self._db.commit()
+            if rows:
+                self._append([row + rowid for row, rowid in zip(rows, rowids)])
+            elif analysis_id in self._analysis_rows:
+                first, end = self._analysis_rows.pop(analysis_id)
+                self._live[first:end] = False
+
+    def rescore(self, analysis_ids: List[str], counts: np.ndarray, scores: np.ndarray, levels: List[str]) -> int:
+        """
+        Replace the severity scores and levels of indexed analyses.
+
+        Args:
+            analysis_ids: Re-scored analyses
+            counts: Number of risks of each analysis
+            scores: New score of each risk, concatenated in analysis order
+                (the risks of an analysis in the order they were indexed)
+            levels: Severity level of each score 0-100
+
+        Returns:
+            Number of risks re-scored; analyses not indexed, or indexed with a
+            different number of risks, are left alone
+        """
+        level_codes = np.array([_level_code(level) for level in levels], dtype=np.int8)
+        starts = (np.cumsum(counts) - counts).astype(np.int64)
+        with self._lock:
+            # Row of the index for each position in scores, -1 if not updated
+            first_rows = np.full(len(analysis_ids), -1, dtype=np.int64)
+            for position, analysis_id in enumerate(analysis_ids):
+                span = self._analysis_rows.get(analysis_id)
+                if span is not None and span[1] - span[0] == counts[position]:
+                    first_rows[position] = span[0]
+            selected = np.repeat(first_rows >= 0, counts)
+            sources = np.flatnonzero(selected)
+            rows = sources + np.repeat(first_rows - starts, counts)[selected]
+
+            # Only rows whose score or level moved are written back
+            new_scores = scores[sources].astype(self._score.dtype)
+            new_levels = level_codes[new_scores]
+            changed = (self._score[rows] != new_scores) | (self._level[rows] != new_levels)
+            rows, new_scores, new_levels = rows[changed], new_scores[changed], new_levels[changed]
+            self._db.executemany(
+                "UPDATE risks SET severity_score = ?, severity_level = ? WHERE rowid = ?",
+                zip(new_scores.tolist(), [SEVERITY_LEVELS[level] for level in new_levels.tolist()],
+                    self._rowid[rows].tolist())
+            )
+            self._db.commit()
+            self._score[rows] = new_scores
+            self._level[rows] = new_levels
+        return len(sources)
+
+    def _mask(self, conditions: RiskFilter, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """Boolean mask of the rows matching a filter, over the given rows (default: all filled so far)."""
+        if rows is None:
+            rows = slice(0, self._size)
+        mask = self._live[rows].copy()
+        if conditions.category is not None:
+            mask &= self._category[rows] == self._categories.code(conditions.category)
+        if conditions.tenant is not None:
+            mask &= self._tenant[rows] == self._tenants.code(conditions.tenant)
+        if conditions.severity_level is not None:
+            mask &= self._level[rows] >= _level_code(conditions.severity_level)
+        if conditions.min_score is not None:
+            mask &= self._score[rows] >= conditions.min_score
+        if conditions.max_score is not None:
+            mask &= self._score[rows] <= conditions.max_score
+        if conditions.since is not None:
+            mask &= self._day[rows] >= _day_number(conditions.since)
+        if conditions.until is not None:
+            mask &= self._day[rows] <= _day_number(conditions.until)
+        return mask
+
+    def count(self, conditions: RiskFilter) -> Dict[str, int]:
+        """
+        Count matching risks and the analyses they belong to.
+
+        Returns:
+            Dictionary with "risks" and "contracts" counts
+        """
+        with self._lock:
+            mask = self._mask(conditions)
+            analyses = self._analysis[:len(mask)][mask]
+        contracts = int(np.count_nonzero(np.bincount(analyses))) if len(analyses) else 0
+        return {"risks": int(np.count_nonzero(mask)), "contracts": contracts}
+
+    def histogram(self, conditions: RiskFilter, field: str, bins: int = 10) -> List[Tuple[str, int]]:
+        """
+        Count matching risks per value of a field.
+
+        Args:
+            conditions: Rows to count
+            field: "category", "severity_level", "tenant", "month" or
+                "severity_score" (split into `bins` equal-width bins over 0-100)
+            bins: Number of score bins
+
+        Returns:
+            List of (bucket label, count), empty buckets omitted except for scores
+        """
+        with self._lock:
+            mask = self._mask(conditions)
+            rows = slice(0, len(mask))
+            if field == "severity_score":
+                # Count per score, then fold the 101 scores into bins
+                per_score = np.bincount(self._score[rows][mask], minlength=101)[:101]
+                bins = max(1, bins)
+                counts = np.bincount(np.minimum(np.arange(101) * bins // 100, bins - 1), per_score, bins)
+                edges = np.linspace(0, 100, bins + 1)
+                return [
+                    (f"{low:.4g}-{high:.4g}", int(count))
+                    for low, high, count in zip(edges[:-1], edges[1:], counts)
+                ]
+            if field == "category":
+                values, labels = self._category[rows][mask], list(self._categories.values)
+            elif field == "tenant":
+                values, labels = self._tenant[rows][mask], list(self._tenants.values)
+            elif field == "severity_level":
+                values, labels = self._level[rows][mask], list(SEVERITY_LEVELS)
+            elif field == "month":
+                # Count per day, then merge the (few) distinct days into months
+                days = self._day[rows][mask]
+                if not len(days):
+                    return []
+                first = int(days.min())
+                per_day = np.bincount(days - first)
+                present = np.flatnonzero(per_day)
+                months = (_EPOCH + (present + first).astype("timedelta64[D]")).astype("datetime64[M]")
+                keys, group = np.unique(months, return_inverse=True)
+                counts = np.bincount(group, per_day[present])
+                return [(str(key), int(count)) for key, count in zip(keys, counts)]
+            else:
+                raise ValueError(f"Unknown histogram field: {field}")
+
+        counts = np.bincount(values.astype(np.int64), minlength=len(labels))
+        return [(labels[code], int(count)) for code, count in enumerate(counts) if count]
+
+    def top(self, conditions: RiskFilter, limit: int = 10) -> List[dict]:
+        """
+        Highest-scored matching risks.
+
+        Returns:
+            Up to `limit` risks, highest severity score first
+        """
+        with self._lock:
+            candidates = np.flatnonzero(self._mask(conditions))
+            if len(candidates) > limit:
+                # Partial selection, then sort only the winners
+                chosen = np.argpartition(-self._score[candidates], limit - 1)[:limit]
+                candidates = candidates[chosen]
+            candidates = candidates[np.argsort(-self._score[candidates], kind="stable")]
+            return [
+                {
+                    "analysis_id": self._analysis_ids[self._analysis[row]],
+                    "tenant": self._tenants.values[self._tenant[row]],
+                    "category": self._categories.values[self._category[row]],
+                    "title": self._titles[row],
+                    "severity_score": int(self._score[row]),
+                    "severity_level": SEVERITY_LEVELS[self._level[row]],
+                    "analyzed_on": str(_EPOCH + np.timedelta64(int(self._day[row]), "D"))
+                }
+                for row in candidates
+            ]
+
+    def analysis_risks(
+        self,
+        analysis_ids: List[str],
+        conditions: RiskFilter
+    ) -> Dict[str, Tuple[int, List[Tuple[int, int, str]]]]:
+        """
+        Matching risks of some analyses, for joining with their stored results.
+
+        Args:
+            analysis_ids: Analyses to look up
+            conditions: Risks to keep
+
+        Returns:
+            For each indexed analysis, a tuple of (number of risks indexed
+            for it, (position among those risks, severity score, severity
+            level) of each matching one); analyses not indexed are left out
+        """
+        with self._lock:
+            spans = {
+                analysis_id: self._analysis_rows[analysis_id]
+                for analysis_id in analysis_ids if analysis_id in self._analysis_rows
+            }
+            firsts = np.array([first for first, _ in spans.values()], dtype=np.int64)
+            counts = np.array([end - first for first, end in spans.values()], dtype=np.int64)
+            positions = np.arange(int(counts.sum())) - np.repeat(np.cumsum(counts) - counts, counts)
+            rows = np.repeat(firsts, counts) + positions
+            mask = self._mask(conditions, rows)
+            owners = np.repeat(np.arange(len(spans)), counts)[mask].tolist()
+            matches = zip(positions[mask].tolist(), self._score[rows][mask].tolist(), self._level[rows][mask].tolist())
+
+        risks = {analysis_id: (int(count), []) for analysis_id, count in zip(spans, counts.tolist())}
+        keys = list(spans)
+        for owner, (position, score, level) in zip(owners, matches):
+            risks[keys[owner]][1].append((position, score, SEVERITY_LEVELS[level]))
+        return risks
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self._live[:self._size]))
+
+
+def _plain(value) -> str:
+    """String value of an enum member or string."""
+    return str(getattr(value, "value", value))
+
+
+def _level_code(level: str) -> int:
+    try:
+        return SEVERITY_LEVELS.index(str(level).upper())
+    except ValueError:
+        return SEVERITY_LEVELS.index("MEDIUM")
+
+
+def _day_number(value) -> int:
+    """Days since 1970-01-01 of a date, datetime or ISO string (today if missing)."""
+    if value is None:
+        value = datetime.utcnow()
+    if isinstance(value, str):
+        value = value[:10]
+    elif isinstance(value, datetime):
+        value = value.date()
+    return int((np.datetime64(value, "D") - _EPOCH).astype(np.int64))
+
+
+RISK_ANALYTICS = RiskAnalyticsIndex.from_settings()
@@ -0,0 +1,140 @@
+"""
+Persistent memo of per-clause risk assessments.
+"""
+
+import hashlib
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.config import settings
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+_WORD = re.compile(r"\w+")
+
+
+def clause_fingerprint(text: str) -> str:
+    """
+    Fingerprint of a clause's wording.
+
+    Case, punctuation, whitespace and leading section numbers are ignored, so
+    the same boilerplate paragraph fingerprints the same in every contract.
+    """
+    words = _WORD.findall(text.lower())
+    while words and words[0].isdigit():
+        words.pop(0)
+    return hashlib.sha256(" ".join(words).encode("utf-8")).hexdigest()[:32]
+
+
+class ClauseMemo:
+    """
+    Risk assessments of individual clauses, keyed by clause fingerprint and version.
+
+    The version identifies what produced an assessment (prompt and model), so
+    changing either starts a fresh memo instead of serving stale judgements.
+    Each entry also records the risk categories the clause was judged against;
+    it only answers lookups for a subset of them.
+    """
+
+    def __init__(self, path: Optional[str]):
+        """
+        Open the memo.
+
+        Args:
+            path: SQLite file to persist to, or None to keep the memo in memory
+        """
+        if path:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(path or ":memory:", check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS clause_risks ("
+            "fingerprint TEXT NOT NULL, version TEXT NOT NULL, categories TEXT NOT NULL, "
+            "risks TEXT NOT NULL, updated_at REAL NOT NULL, PRIMARY KEY (fingerprint, version))"
+        )
+        self._db.commit()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls) -> "ClauseMemo":
+        """Create the memo persisted under DATA_DIR."""
+        return cls(str(Path(settings.data_dir) / "clause_memo.db"))
+
+    def lookup(self, fingerprints: Iterable[str], version: str, categories: Iterable[str]) -> Dict[str, List[dict]]:
+        """
+        Find memoized assessments.
+
+        Args:
+            fingerprints: Clause fingerprints to look up
+            version: Assessment version
+            categories: Categories the caller needs judged
+
+        Returns:
+            Mapping of fingerprint to its risks (restricted to `categories`),
+            for clauses judged against all of `categories`
+        """
+        wanted = set(categories)
+        keys = list(dict.fromkeys(fingerprints))
+        if not keys:
+            return {}
+
+        placeholders = ",".join("?" * len(keys))
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT fingerprint, categories, risks FROM clause_risks "
+                f"WHERE version = ? AND fingerprint IN ({placeholders})",
+                (version, *keys)
+            ).fetchall()
+
+        found = {}
+        for fingerprint, judged, risks in rows:
+            if wanted <= set(json.loads(judged)):
+                found[fingerprint] = [risk for risk in json.loads(risks) if risk.get("category") in wanted]
+        return found
+
+    def store(self, entries: Iterable[Tuple[str, List[dict]]], version: str, categories: Iterable[str]) -> None:
+        """
+        Record assessments for clauses judged against some categories.
+
+        An existing entry for the same clause and version keeps its risks in
+        the categories not judged this time, so the entry only ever widens.
+
+        Args:
+            entries: Pairs of (fingerprint, risks found in that clause)
+            version: Assessment version
+            categories: Categories the clauses were judged against
+        """
+        judged = set(categories)
+        entries = dict(entries)
+        if not entries:
+            return
+
+        now = time.time()
+        placeholders = ",".join("?" * len(entries))
+        with self._lock:
+            existing = self._db.execute(
+                f"SELECT fingerprint, categories, risks FROM clause_risks "
+                f"WHERE version = ? AND fingerprint IN ({placeholders})",
+                (version, *entries)
+            ).fetchall()
+            previous = {fingerprint: (set(json.loads(c)), json.loads(r)) for fingerprint, c, r in existing}
+
+            rows = []
+            for fingerprint, risks in entries.items():
+                old_categories, old_risks = previous.get(fingerprint, (set(), []))
+                kept = [risk for risk in old_risks if risk.get("category") not in judged]
+                rows.append((
+                    fingerprint, version, json.dumps(sorted(judged | old_categories)),
+                    json.dumps(kept + risks), now
+                ))
+            self._db.executemany("INSERT OR REPLACE INTO clause_risks VALUES (?, ?, ?, ?, ?)", rows)
+            self._db.commit()
+
+
+CLAUSE_MEMO = ClauseMemo.from_settings()
@@ -0,0 +1,92 @@
+"""
+Single-flight coalescing of identical concurrent work.
+"""
+
+import asyncio
+import hashlib
+import logging
+from typing import Awaitable, Callable, Dict, List, Tuple
+
+from app.utils.logger import setup_logger
+from app.utils.metrics import METRICS
+
+logger = setup_logger(__name__)
+
+
+def content_key(text: str, *parts: str) -> str:
+    """Key for work on a text under a given configuration."""
+    digest = hashlib.sha256(text.encode("utf-8", "surrogatepass"))
+    for part in parts:
+        digest.update(b"\0" + part.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class _Flight:
+    __slots__ = ("task", "members")
+
+    def __init__(self, task: asyncio.Task, member: str):
+        self.task = task
+        self.members: List[str] = [member]
+
+
+class SingleFlight:
+    """
+    Run at most one instance of a job per key at a time.
+
+    The first submission for a key starts the job; submissions arriving while
+    it runs attach to the same task instead of starting their own. The key is
+    forgotten as soon as the job finishes, so this only removes duplicate
+    work during a burst and never serves stale results.
+    """
+
+    def __init__(self, name: str):
+        """
+        Initialize with no jobs in flight.
+
+        Args:
+            name: Metric name prefix
+        """
+        self.name = name
+        self._flights: Dict[str, _Flight] = {}
+
+    def submit(self, key: str, member: str, job: Callable[[], Awaitable]) -> Tuple[asyncio.Future, bool]:
+        """
+        Start a job for a key, or attach to the one already running.
+
+        Registration happens synchronously, so two submissions in the same
+        event loop turn can never both start the job.
+
+        Args:
+            key: Identity of the work
+            member: Identifier of the submitter (e.g. its analysis ID)
+            job: Zero-argument callable starting the work (only called when leading)
+
+        Returns:
+            Tuple of (awaitable for the shared result, whether this submission leads)
+        """
+        flight = self._flights.get(key)
+        if flight is not None:
+            flight.members.append(member)
+            METRICS.increment(f"{self.name}_coalesced")
+            logger.info(f"Coalesced {member} onto in-flight {flight.members[0]}")
+            # Shield so one member giving up does not cancel the shared work
+            return asyncio.shield(flight.task), False
+
+        task = asyncio.ensure_future(job())
+        flight = _Flight(task, member)
+        self._flights[key] = flight
+        task.add_done_callback(lambda _: self._finish(key, flight))
+        METRICS.increment(f"{self.name}_started")
+        return asyncio.shield(task), True
+
+    def _finish(self, key: str, flight: _Flight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    def members(self, key: str) -> List[str]:
+        """Submitters attached to a key's running job (leader first)."""
+        flight = self._flights.get(key)
+        return list(flight.members) if flight else []
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._flights
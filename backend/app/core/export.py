@@ -0,0 +1,214 @@
+"""
+Bulk export of analyzed contracts and their risks as NDJSON, CSV or Parquet.
+"""
+
+import csv
+import io
+import json
+import logging
+from datetime import date
+from typing import Dict, Iterable, Iterator, List
+
+from app.core.analytics import RiskAnalyticsIndex, RiskFilter
+from app.utils.exceptions import ValidationError
+from app.utils.logger import setup_logger
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet export is optional
+    pa = pq = None
+
+logger = setup_logger(__name__)
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet"
+}
+
+# Analysis columns, then risk columns (empty on the row of an analysis without risks)
+ANALYSIS_COLUMNS = ("analysis_id", "tenant", "filename", "analyzed_on", "overall_risk_score", "summary")
+RISK_COLUMNS = (
+    "category", "title", "description", "severity_score", "severity_level", "evidence", "recommendation"
+)
+EXPORT_COLUMNS = ANALYSIS_COLUMNS + RISK_COLUMNS
+
+_NDJSON_LINE = "{" + ", ".join(f'"{name}": %s' for name in EXPORT_COLUMNS) + "}\n"
+
+
+def check_format(export_format: str) -> None:
+    """
+    Check that an export format is known and available.
+
+    Raises:
+        ValidationError: If the format is unknown, or Parquet without pyarrow installed
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValidationError(f"Unknown export format: {export_format}. Use one of: {', '.join(EXPORT_FORMATS)}")
+    if export_format == "parquet" and pa is None:
+        raise ValidationError("Parquet export requires the pyarrow package")
+
+
+def export_risks(
+    index: RiskAnalyticsIndex,
+    analyses: Iterable[List],
+    conditions: RiskFilter,
+    export_format: str
+) -> Iterator[bytes]:
+    """
+    Encode stored analyses and their matching risks, one chunk of analyses at a time.
+
+    Each risk is a row of EXPORT_COLUMNS: its analysis's file name, date,
+    overall score and summary, and the risk's description, evidence and
+    remediation suggestion from the stored detections, joined with its
+    current severity score and level from the analytics index. An analysis
+    without risks gets one row with the risk columns empty, unless the
+    filter has conditions on the risks themselves (category, severity or
+    score), in which case only analyses with matching risks appear. Memory
+    use is bounded by the chunk size, so the output can be streamed to a
+    response or file of any size.
+
+    Args:
+        index: Analytics index holding the severity of every risk
+        analyses: Chunks of stored analyses matching the filter's tenant and
+            dates, in order (see DetectionStore.export)
+        conditions: Risks to export
+        export_format: "ndjson", "csv" or "parquet"
+
+    Returns:
+        Iterator of the encoded output, in order
+
+    Raises:
+        ValidationError: If the format is unknown or unavailable
+    """
+    check_format(export_format)
+    chunks = _join(index, analyses, conditions)
+    if export_format == "ndjson":
+        return _ndjson(chunks)
+    if export_format == "csv":
+        return _csv(chunks)
+    return _parquet(chunks)
+
+
+def _join(index: RiskAnalyticsIndex, analyses: Iterable[List], conditions: RiskFilter) -> Iterator[Dict[str, list]]:
+    """Rows of each chunk of analyses, as lists per column; chunks without rows are skipped."""
+    selects_risks = conditions.selects_risks()
+    for chunk in analyses:
+        matches = index.analysis_risks([analysis.analysis_id for analysis in chunk], conditions)
+        columns: Dict[str, list] = {name: [] for name in EXPORT_COLUMNS}
+        for analysis in chunk:
+            indexed = matches.get(analysis.analysis_id)
+            if not analysis.risks:
+                rows = []
+            elif indexed is not None and indexed[0] == len(analysis.risks):
+                rows = [(analysis.risks[position], score, level) for position, score, level in indexed[1]]
+            elif selects_risks:
+                rows = []  # Severity unknown, so the risk conditions cannot be checked
+            else:
+                logger.warning(
+                    f"Risks of analysis {analysis.analysis_id} are not in the analytics index, exporting them unscored"
+                )
+                rows = [(risk, None, None) for risk in analysis.risks]
+            if not rows:
+                if selects_risks:
+                    continue
+                rows = [({}, None, None)]
+
+            for risk, score, level in rows:
+                for name in ANALYSIS_COLUMNS:
+                    columns[name].append(getattr(analysis, name))
+                columns["category"].append(risk.get("category"))
+                columns["title"].append(risk.get("title"))
+                columns["description"].append(risk.get("description"))
+                columns["severity_score"].append(score)
+                columns["severity_level"].append(level)
+                columns["evidence"].append(risk.get("evidence"))
+                columns["recommendation"].append(risk.get("recommendation"))
+        if columns["analysis_id"]:
+            yield columns
+
+
+def _ndjson(chunks: Iterator[Dict[str, list]]) -> Iterator[bytes]:
+    for chunk in chunks:
+        # Values repeat a lot (tenants, categories, an analysis's columns), so
+        # each distinct value of the chunk is JSON-encoded once
+        encoded: Dict = {}
+
+        def encode(value) -> str:
+            text = encoded.get(value)
+            if text is None:
+                text = encoded[value] = json.dumps(value)
+            return text
+
+        # Evidence lists are unhashable and rarely repeat
+        fragments = [list(map(json.dumps if name == "evidence" else encode, chunk[name])) for name in EXPORT_COLUMNS]
+        yield "".join(_NDJSON_LINE % row for row in zip(*fragments)).encode("utf-8")
+
+
+def _csv(chunks: Iterator[Dict[str, list]]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for chunk in chunks:
+        # Evidence quotes one per line of the cell
+        chunk = dict(chunk, evidence=["\n".join(quotes) if quotes else None for quotes in chunk["evidence"]])
+        writer.writerows(zip(*(chunk[name] for name in EXPORT_COLUMNS)))
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")  # Header of an empty export
+
+
+class _Drain(io.RawIOBase):
+    """Write-only file whose contents are taken out as they are written."""
+
+    def __init__(self):
+        super().__init__()
+        self._parts: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        return len(data)
+
+    def take(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def _parquet(chunks: Iterator[Dict[str, list]]) -> Iterator[bytes]:
+    """One row group per chunk, written out as soon as it is encoded."""
+    schema = pa.schema([
+        ("analysis_id", pa.string()),
+        ("tenant", pa.dictionary(pa.int32(), pa.string())),
+        ("filename", pa.string()),
+        ("analyzed_on", pa.date32()),
+        ("overall_risk_score", pa.int16()),
+        ("summary", pa.string()),
+        ("category", pa.dictionary(pa.int16(), pa.string())),
+        ("title", pa.string()),
+        ("description", pa.string()),
+        ("severity_score", pa.int16()),
+        ("severity_level", pa.dictionary(pa.int8(), pa.string())),
+        ("evidence", pa.list_(pa.string())),
+        ("recommendation", pa.string())
+    ])
+    sink = _Drain()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    try:
+        for chunk in chunks:
+            chunk = dict(chunk, analyzed_on=[date.fromisoformat(day) if day else None for day in chunk["analyzed_on"]])
+            table = pa.table(
+                {name: pa.array(chunk[name], type=schema.field(name).type) for name in EXPORT_COLUMNS},
+                schema=schema
+            )
+            writer.write_table(table)
+            yield sink.take()
+    finally:
+        writer.close()
+    yield sink.take()  # Footer
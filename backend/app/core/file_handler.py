@@ -4,12 +4,16 @@ File upload and validation utilities.
 
 import logging
 import os
+import shutil
 import tempfile
+import zipfile
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional, Tuple
 from fastapi import UploadFile
 
 from app.config import settings
+from app.core.page_index import PageIndex
+from app.core.pdf_parser import PDFParser
 from app.utils.logger import setup_logger
 from app.utils.exceptions import ValidationError, FileProcessingError
 
@@ -20,47 +24,63 @@ class FileHandler:
     """Handle file uploads and validation."""
 
     ALLOWED_EXTENSIONS = {"pdf", "txt"}
+    ARCHIVE_EXTENSIONS = {"zip"}
 
     @staticmethod
     def validate_file(file: UploadFile) -> None:
-        """Validate uploaded file."""
+        """Validate uploaded file (a contract, or a ZIP archive of contracts)."""
         # Check file extension
         file_ext = Path(file.filename).suffix.lower().lstrip('.')
         allowed = settings.get_allowed_file_types()
-        if file_ext not in allowed:
+        if file_ext in FileHandler.ARCHIVE_EXTENSIONS:
+            max_size_mb = settings.max_archive_size_mb
+        elif file_ext in allowed:
+            max_size_mb = settings.max_file_size_mb
+        else:
             raise ValidationError(
-                f"Invalid file type. Allowed types: {', '.join(allowed)}"
+                f"Invalid file type. Allowed types: {', '.join(allowed + sorted(FileHandler.ARCHIVE_EXTENSIONS))}"
             )
 
         # Check file size (max 10MB by default)
-        max_size = settings.max_file_size_mb * 1024 * 1024
+        max_size = max_size_mb * 1024 * 1024
         if file.size and file.size > max_size:
             raise ValidationError(
-                f"File too large. Maximum size: {settings.max_file_size_mb}MB"
+                f"File too large. Maximum size: {max_size_mb}MB"
             )
 
         logger.info(f"File validation passed: {file.filename}")
 
     @staticmethod
-    async def save_temp_file(file: UploadFile) -> str:
+    def is_archive(filename: str) -> bool:
+        """True if the file name has an archive extension."""
+        return Path(filename).suffix.lower().lstrip('.') in FileHandler.ARCHIVE_EXTENSIONS
+
+    @staticmethod
+    def _temp_dir() -> Path:
+        temp_dir = Path(tempfile.gettempdir()) / "contract_analysis"
+        temp_dir.mkdir(exist_ok=True)
+        return temp_dir
+
+    @staticmethod
+    async def save_temp_file(file: UploadFile, prefix: str = "") -> str:
         """
         Save uploaded file to temporary directory.
 
         Args:
             file: Uploaded file
+            prefix: Prefix for the saved file name, to keep files with the
+                same name apart
 
         Returns:
             Path to saved file
         """
         try:
             FileHandler.validate_file(file)
-
-            # Create temp directory if not exists
-            temp_dir = Path(tempfile.gettempdir()) / "contract_analysis"
-            temp_dir.mkdir(exist_ok=True)
+            if FileHandler.is_archive(file.filename):
+                raise ValidationError("Archives cannot be saved as a single contract")
 
             # Save file
-            file_path = temp_dir / file.filename
+            file_path = FileHandler._temp_dir() / (prefix + Path(file.filename).name)
             content = await file.read()
 
             with open(file_path, 'wb') as f:
@@ -75,6 +95,115 @@ class FileHandler:
             logger.error(f"Failed to save file: {str(e)}")
             raise FileProcessingError(f"Failed to process file: {str(e)}")
 
+    @staticmethod
+    def save_temp_archive(file: UploadFile, prefix: str = "") -> str:
+        """
+        Validate an uploaded archive and stream it to the temporary directory.
+
+        Args:
+            file: Uploaded archive
+            prefix: Prefix for the saved file name
+
+        Returns:
+            Path to saved archive
+        """
+        FileHandler.validate_file(file)
+        if not FileHandler.is_archive(file.filename):
+            raise ValidationError(
+                f"Invalid archive type. Allowed types: {', '.join(sorted(FileHandler.ARCHIVE_EXTENSIONS))}"
+            )
+
+        try:
+            file_path = FileHandler._temp_dir() / (prefix + Path(file.filename).name)
+            file.file.seek(0)
+            with open(file_path, 'wb') as f:
+                shutil.copyfileobj(file.file, f)
+            logger.info(f"Archive saved: {file_path}")
+            return str(file_path)
+        except Exception as e:
+            logger.error(f"Failed to save archive: {str(e)}")
+            raise FileProcessingError(f"Failed to process archive: {str(e)}")
+
+    @staticmethod
+    def extract_archive(
+        archive_path: str,
+        prefix: str = "",
+        max_files: Optional[int] = None
+    ) -> List[Tuple[str, Optional[str], Optional[str]]]:
+        """
+        Extract the contract files of a ZIP archive to the temporary directory.
+
+        Directories, hidden files and members of types that are not allowed
+        are skipped. Members are copied in chunks and cut off at the maximum
+        file size, so an archive cannot expand past its declared sizes, and
+        their declared sizes may add up to MAX_EXTRACTED_SIZE_MB at most.
+
+        Args:
+            archive_path: Path of the saved archive
+            prefix: Prefix for the extracted file names
+            max_files: Maximum number of files (extracted or rejected), or None for no limit
+
+        Returns:
+            List of (member name, extracted path, error) in archive order,
+            with a path for each extracted member and an error for each
+            rejected one
+
+        Raises:
+            ValidationError: If the archive is invalid, has more than max_files
+                files or expands past MAX_EXTRACTED_SIZE_MB; nothing is left
+                extracted then
+        """
+        allowed = settings.get_allowed_file_types()
+        max_size = settings.max_file_size_mb * 1024 * 1024
+        max_extracted = settings.max_extracted_size_mb * 1024 * 1024
+        temp_dir = FileHandler._temp_dir()
+        members = []
+        extracted = 0
+
+        try:
+            with zipfile.ZipFile(archive_path) as archive:
+                for index, info in enumerate(archive.infolist()):
+                    name = Path(info.filename).name
+                    if info.is_dir() or not name or name.startswith(".") or "__MACOSX" in info.filename:
+                        continue
+                    if max_files is not None and len(members) >= max_files:
+                        raise ValidationError(f"Too many files. Maximum per batch: {settings.max_batch_files}")
+                    if Path(name).suffix.lower().lstrip('.') not in allowed:
+                        members.append((info.filename, None, f"Invalid file type. Allowed types: {', '.join(allowed)}"))
+                        continue
+                    if info.file_size > max_size:
+                        members.append((info.filename, None, f"File too large. Maximum size: {settings.max_file_size_mb}MB"))
+                        continue
+                    extracted += info.file_size
+                    if extracted > max_extracted:
+                        raise ValidationError(
+                            f"Archive too large when extracted. Maximum: {settings.max_extracted_size_mb}MB"
+                        )
+
+                    file_path = temp_dir / f"{prefix}{index}_{name}"
+                    with archive.open(info) as source, open(file_path, 'wb') as target:
+                        written = 0
+                        while chunk := source.read(1 << 16):
+                            written += len(chunk)
+                            if written > max_size:
+                                break
+                            target.write(chunk)
+                    if written > max_size:
+                        FileHandler.cleanup_temp_file(str(file_path))
+                        members.append((info.filename, None, f"File too large. Maximum size: {settings.max_file_size_mb}MB"))
+                        continue
+                    members.append((info.filename, str(file_path), None))
+        except (zipfile.BadZipFile, ValidationError) as e:
+            for _, path, _ in members:
+                if path:
+                    FileHandler.cleanup_temp_file(path)
+            if isinstance(e, ValidationError):
+                raise
+            raise ValidationError(f"Invalid archive: {str(e)}")
+
+        logger.info(f"Extracted {sum(1 for _, path, _ in members if path)} files from {archive_path}")
+        return members
+
     @staticmethod
     def cleanup_temp_file(file_path: str) -> None:
         """Clean up temporary file."""
@@ -85,6 +214,29 @@ class FileHandler:
         except Exception as e:
             logger.warning(f"Failed to cleanup temp file {file_path}: {str(e)}")
 
+    @staticmethod
+    def extract_contract_text(file_path: str, filename: str) -> Tuple[str, Optional[PageIndex]]:
+        """
+        Extract the text of a saved contract file.
+
+        Args:
+            file_path: Path of the saved file
+            filename: Original file name (its extension selects the parser)
+
+        Returns:
+            Tuple of (contract text, page index or None for plain text)
+        """
+        if filename.lower().endswith(".pdf"):
+            contract_text, page_index = PDFParser.extract_pdf_document(file_path)
+        else:  # .txt
+            contract_text = FileHandler.read_text_file(file_path)
+            page_index = None
+
+        # Validate extracted text
+        if not contract_text or len(contract_text) < 100:
+            raise ValidationError("Could not extract sufficient text from file")
+        return contract_text, page_index
+
     @staticmethod
     def read_text_file(file_path: str) -> str:
         """Read text from text file."""
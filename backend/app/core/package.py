@@ -0,0 +1,310 @@
+"""
+Contract packages: a master agreement and its exhibits uploaded as one ZIP archive.
+"""
+
+import asyncio
+import logging
+import re
+import time
+import zipfile
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.core.page_index import PageIndex
+from app.core.pdf_parser import PDFParser
+from app.utils.exceptions import ContractAnalysisError, ValidationError
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+MEMBER_SEPARATOR = "\n\n"
+
+# "Exhibit A", "Schedule 2", "Annex B-1" in running text; identifiers must be
+# upper case or numeric so "schedule a meeting" is not a reference
+_REFERENCE = re.compile(
+    r"\b((?i:exhibit|schedule|annex|appendix|attachment|addendum))\s+([A-Z](?:-?\d+)?|\d+(?:\.\d+)?)\b"
+)
+# The same in a file name, where case carries no meaning ("exhibit_a-pricing.pdf")
+_NAME_LABEL = re.compile(
+    r"\b(exhibit|schedule|annex|appendix|attachment|addendum)\s+([a-z](?:\d+)?|\d+(?:\.\d+)?)\b", re.IGNORECASE
+)
+# Numbered section headings on a line of their own ("4. Payment Terms", "Section 4.2 Fees")
+_HEADING = re.compile(
+    r"^[ \t]*(?:(?i:section|article)[ \t]+)?\d+(?:\.\d+)*[.)]?[ \t]+[A-Z][^\n]{2,80}$", re.MULTILINE
+)
+
+
+@dataclass(slots=True)
+class PackageMember:
+    """Extraction stats of one archive member."""
+    name: str
+    role: str  # master, exhibit or skipped
+    size_bytes: int
+    compressed_bytes: int
+    label: Optional[str] = None  # e.g. "Exhibit A"
+    characters: int = 0
+    pages: int = 0
+    first_page: Optional[int] = None  # Page of the combined text the member starts on
+    parse_ms: float = 0.0
+    error: Optional[str] = None
+
+
+@dataclass(slots=True)
+class ContractPackage:
+    """A package combined into one text for analysis."""
+    text: str
+    page_index: PageIndex
+    master: str
+    members: List[PackageMember]
+    cross_references: List[dict] = field(default_factory=list)
+    unresolved_references: List[str] = field(default_factory=list)
+
+    def summary(self) -> dict:
+        """JSON-serializable description of the package (everything but the text)."""
+        return {
+            "master": self.master,
+            "members": [asdict(member) for member in self.members],
+            "cross_references": self.cross_references,
+            "unresolved_references": self.unresolved_references
+        }
+
+
+def parse_member(name: str, data: bytes) -> Tuple[Optional[str], Optional[List[int]], Optional[str], float]:
+    """
+    Extract the text of an archive member (runs in a worker process).
+
+    Returns:
+        Tuple of (text, page start offsets, error, milliseconds spent)
+    """
+    started = time.perf_counter()
+    try:
+        if name.lower().endswith(".pdf"):
+            text, page_index = PDFParser.extract_pdf_document(data)
+            starts = list(page_index.starts)
+        else:
+            text, starts = data.decode("utf-8"), [0]
+        error = None if text.strip() else "No text found"
+    except ContractAnalysisError as e:
+        text, starts, error = None, None, str(e)
+    except UnicodeDecodeError as e:
+        text, starts, error = None, None, f"Failed to read text file: {str(e)}"
+    return text, starts, error, (time.perf_counter() - started) * 1000
+
+
+def _label(kind: str, identifier: str) -> str:
+    return f"{kind.title()} {identifier.upper()}"
+
+
+def _name_label(name: str) -> Optional[str]:
+    match = _NAME_LABEL.search(re.sub(r"[_\-.]+", " ", Path(name).stem))
+    return _label(*match.groups()) if match else None
+
+
+def _text_label(text: str) -> Optional[str]:
+    """Label from a title line at the top of the text ("EXHIBIT A - PRICING")."""
+    head = text.lstrip()[:200]
+    match = _REFERENCE.match(head) or _NAME_LABEL.match(head)
+    return _label(*match.groups()) if match else None
+
+
+class PackageReader:
+    """
+    Read a contract package out of a ZIP archive.
+
+    Members are read from the archive one at a time and handed to a process
+    pool as soon as they are read, so parsing of earlier members overlaps
+    with reading later ones and nothing is written to disk. At most two
+    members per worker are held in memory waiting for or in a parse; reading
+    waits for the pool beyond that.
+
+    The master agreement is the largest member not labelled as an exhibit,
+    schedule, annex, appendix, attachment or addendum (by file name or title
+    line). The combined text is the master followed by each exhibit under a
+    header naming the master sections that refer to it, so clauses split
+    between the two are read together.
+    """
+
+    def __init__(self, workers: int):
+        """
+        Initialize the reader.
+
+        Args:
+            workers: Parsing processes (0 parses in threads of this process)
+        """
+        self.workers = workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    @classmethod
+    def from_settings(cls) -> "PackageReader":
+        """Create the reader configured by PARSE_WORKERS."""
+        return cls(settings.parse_workers)
+
+    def _parse(self, name: str, data: bytes) -> asyncio.Future:
+        if self.workers <= 0:
+            return asyncio.ensure_future(asyncio.to_thread(parse_member, name, data))
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return asyncio.get_running_loop().run_in_executor(self._pool, parse_member, name, data)
+
+    @staticmethod
+    def _cancel(parsing: List[Tuple[PackageMember, asyncio.Future]]) -> None:
+        for _, future in parsing:
+            future.cancel()
+
+    async def read(self, archive: BinaryIO) -> ContractPackage:
+        """
+        Parse the members of an archive and combine them into one contract.
+
+        Args:
+            archive: Seekable binary file object of the ZIP archive
+
+        Returns:
+            The combined package
+
+        Raises:
+            ValidationError: If the archive is invalid, has too many files or
+                too much data, or has no readable contract
+        """
+        allowed = settings.get_allowed_file_types()
+        max_size = settings.max_file_size_mb * 1024 * 1024
+        max_extracted = settings.max_extracted_size_mb * 1024 * 1024
+        members: List[PackageMember] = []
+        parsing: List[Tuple[PackageMember, asyncio.Future]] = []
+        slots = asyncio.Semaphore(max(self.workers, 1) * 2)
+        extracted = 0
+
+        try:
+            with zipfile.ZipFile(archive) as zf:
+                for info in zf.infolist():
+                    name = Path(info.filename).name
+                    if info.is_dir() or not name or name.startswith(".") or "__MACOSX" in info.filename:
+                        continue
+                    member = PackageMember(info.filename, "skipped", info.file_size, info.compress_size)
+                    members.append(member)
+                    if len(members) > settings.max_package_files:
+                        raise ValidationError(
+                            f"Too many files in the archive. Maximum: {settings.max_package_files}"
+                        )
+                    if Path(name).suffix.lower().lstrip('.') not in allowed:
+                        member.error = f"Invalid file type. Allowed types: {', '.join(allowed)}"
+                    elif info.file_size > max_size:
+                        member.error = f"File too large. Maximum size: {settings.max_file_size_mb}MB"
+                    else:
+                        # Reading never yields more than the declared size, so
+                        # the declared sizes bound what the archive expands to
+                        extracted += info.file_size
+                        if extracted > max_extracted:
+                            raise ValidationError(
+                                f"Archive too large when extracted. Maximum: {settings.max_extracted_size_mb}MB"
+                            )
+                        await slots.acquire()
+                        try:
+                            data = await asyncio.to_thread(zf.read, info)
+                        except (RuntimeError, NotImplementedError) as e:
+                            slots.release()
+                            member.error = f"Could not read file: {str(e)}"  # Encrypted or unsupported compression
+                            continue
+                        future = self._parse(name, data)
+                        future.add_done_callback(lambda _: slots.release())
+                        parsing.append((member, future))
+        except zipfile.BadZipFile as e:
+            self._cancel(parsing)
+            raise ValidationError(f"Invalid archive: {str(e)}")
+        except ValidationError:
+            self._cancel(parsing)
+            raise
+
+        texts: Dict[str, Tuple[str, List[int]]] = {}
+        for member, future in parsing:
+            text, starts, error, elapsed = await future
+            member.parse_ms = round(elapsed, 1)
+            if error:
+                member.error = error
+                continue
+            member.characters = len(text)
+            member.pages = len(starts)
+            member.label = _name_label(member.name) or _text_label(text)
+            texts[member.name] = (text, starts)
+
+        if not texts:
+            raise ValidationError("Could not extract text from any file in the archive")
+
+        package = self._combine(members, texts)
+        if len(package.text) < 100:
+            raise ValidationError("Could not extract sufficient text from file")
+
+        logger.info(
+            f"Read package with master {package.master}: {len(texts) - 1} exhibits, "
+            f"{sum(1 for m in members if m.role == 'skipped')} skipped, {len(package.text)} characters"
+        )
+        return package
+
+    def _combine(self, members: List[PackageMember], texts: Dict[str, Tuple[str, List[int]]]) -> ContractPackage:
+        """Pick the master, cross-reference the exhibits and join the texts."""
+        parsed = [member for member in members if member.name in texts]
+        unlabelled = [member for member in parsed if member.label is None]
+        master = max(unlabelled or parsed, key=lambda member: member.characters)
+        master.role, master.label = "master", None
+        exhibits = [member for member in parsed if member is not master]
+        for exhibit in exhibits:
+            exhibit.role = "exhibit"
+
+        master_text, master_starts = texts[master.name]
+        master_pages = PageIndex(master_starts)
+        headings = [(match.start(), " ".join(match.group(0).split())) for match in _HEADING.finditer(master_text)]
+        heading_offsets = [offset for offset, _ in headings]
+
+        # Where the master refers to each label, in order of first reference
+        references: Dict[str, List[dict]] = {}
+        for match in _REFERENCE.finditer(master_text):
+            sections = references.setdefault(_label(*match.groups()), [])
+            index = bisect_right(heading_offsets, match.start()) - 1
+            section = {
+                "heading": headings[index][1] if index >= 0 else None,
+                "page": master_pages.page_of(match.start())
+            }
+            if section not in sections:
+                sections.append(section)
+
+        order = list(references)
+        exhibits.sort(key=lambda m: order.index(m.label) if m.label in order else len(order))
+
+        cross_references = []
+        labels = {exhibit.label for exhibit in exhibits}
+        blocks = [master_text]
+        starts = list(master_starts)
+        offset = len(master_text) + len(MEMBER_SEPARATOR)
+        master.first_page = 1
+
+        for exhibit in exhibits:
+            sections = references.get(exhibit.label, [])
+            cross_references.append({"label": exhibit.label, "member": exhibit.name, "sections": sections})
+
+            header = f"=== {exhibit.label or 'Attachment'} ({Path(exhibit.name).name})"
+            cited = [s["heading"] or f"page {s['page']}" for s in sections]
+            if cited:
+                header += f", referenced in the master agreement at: {'; '.join(cited)}"
+            header += " ===\n"
+
+            text, member_starts = texts[exhibit.name]
+            exhibit.first_page = len(starts) + 1
+            starts.append(offset)
+            starts.extend(offset + len(header) + start for start in member_starts[1:])
+            blocks.append(header + text)
+            offset += len(header) + len(text) + len(MEMBER_SEPARATOR)
+
+        return ContractPackage(
+            text=MEMBER_SEPARATOR.join(blocks),
+            page_index=PageIndex(starts),
+            master=master.name,
+            members=members,
+            cross_references=cross_references,
+            unresolved_references=[label for label in references if label not in labels]
+        )
+
+
+PACKAGE_READER = PackageReader.from_settings()
@@ -0,0 +1,182 @@
+"""
+Page offset index and quote locator for extracted contract text.
+"""
+
+import logging
+import re
+from array import array
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class PageIndex:
+    """
+    Sorted start offsets of each page within the document text.
+
+    Offsets refer to the final (cleaned) text, so any character offset can be
+    mapped to its page with a single binary search.
+    """
+
+    __slots__ = ("starts",)
+
+    def __init__(self, starts: Sequence[int] = (0,)):
+        """Initialize from sorted page start offsets (first page starts at 0)."""
+        self.starts = array("l", starts or (0,))
+
+    @classmethod
+    def from_pages(cls, pages: Iterable[str], separator: str = "\n") -> Tuple[str, "PageIndex"]:
+        """
+        Join page texts and record where each page starts.
+
+        Returns:
+            Tuple of (joined_text, page_index)
+        """
+        parts: List[str] = []
+        starts = array("l")
+        offset = 0
+        for page_text in pages:
+            if parts:
+                parts.append(separator)
+                offset += len(separator)
+            starts.append(offset)
+            parts.append(page_text)
+            offset += len(page_text)
+
+        index = cls()
+        index.starts = starts or array("l", [0])
+        return "".join(parts), index
+
+    @classmethod
+    def from_text(cls, text: str) -> "PageIndex":
+        """Build an index from form-feed page breaks (single page if none)."""
+        return cls([0] + [m.end() for m in re.finditer("\f", text)])
+
+    @property
+    def page_count(self) -> int:
+        return len(self.starts)
+
+    def page_of(self, offset: int) -> int:
+        """1-based page number containing a character offset."""
+        return max(1, bisect_right(self.starts, offset))
+
+
+@dataclass(slots=True, frozen=True)
+class TextLocation:
+    """Where a quote was found in the document."""
+    page: int  # 1-based
+    start: int
+    end: int
+
+
+class TextLocator:
+    """
+    Map quotes (clause text, risk evidence) back to document offsets.
+
+    The document is normalized once (lowercase, whitespace runs collapsed)
+    with a sparse offset map, so quotes that differ from the source only in
+    case or line wrapping are still found. Lookups are cached and accept a
+    position hint so quotes arriving in document order are found without
+    rescanning from the start.
+    """
+
+    _WHITESPACE = re.compile(r"\s+")
+    _MULTI_WHITESPACE = re.compile(r"\s{2,}")
+    _ELLIPSIS = re.compile(r"\.{3,}|…")
+
+    def __init__(self, text: str, page_index: Optional[PageIndex] = None):
+        """
+        Build the normalized search text.
+
+        Args:
+            text: Document text
+            page_index: Page offsets for the text (single page if omitted)
+        """
+        self.page_index = page_index or PageIndex()
+        self._length = len(text)
+
+        self._normalized = self._WHITESPACE.sub(" ", self._lower(text))
+
+        # Only runs of two or more whitespace characters shift offsets; record
+        # (normalized, original) anchors right after each of them.
+        self._anchors_norm = array("l", [0])
+        self._anchors_orig = array("l", [0])
+        shrink = 0
+        for match in self._MULTI_WHITESPACE.finditer(text):
+            start, end = match.span()
+            self._anchors_norm.append(start - shrink + 1)
+            self._anchors_orig.append(end)
+            shrink += end - start - 1
+
+        self._cache: Dict[str, Optional[TextLocation]] = {}
+
+    @staticmethod
+    def _lower(text: str) -> str:
+        """
+        Lowercase without changing the length, so offsets still line up.
+
+        The few characters that lowercase to several ("İ" -> "i̇") are
+        reduced to the first one, in the document and quotes alike.
+        """
+        lowered = text.lower()
+        if len(lowered) == len(text):
+            return lowered
+        expanding = {ord(char): char.lower()[0] for char in set(text) if len(char.lower()) != 1}
+        return text.translate(expanding).lower()
+
+    def _to_original(self, offset: int) -> int:
+        k = bisect_right(self._anchors_norm, offset) - 1
+        return min(self._length, self._anchors_orig[k] + offset - self._anchors_norm[k])
+
+    def _normalize(self, quote: str) -> str:
+        quote = self._lower(quote).strip().strip("\"'“”‘’").strip()
+        return self._WHITESPACE.sub(" ", quote)
+
+    def _find(self, needle: str, hint: int) -> int:
+        position = self._normalized.find(needle, hint)
+        if position == -1 and hint:
+            position = self._normalized.find(needle, 0, hint + len(needle))
+        return position
+
+    def locate(self, quote: str, hint: int = 0) -> Optional[TextLocation]:
+        """
+        Locate a quote in the document.
+
+        Args:
+            quote: Text to find (case and whitespace insensitive)
+            hint: Original-text offset to start searching from
+
+        Returns:
+            TextLocation, or None if the quote does not occur in the document
+        """
+        if quote in self._cache:
+            return self._cache[quote]
+
+        needle = self._normalize(quote)
+        location = None
+        if needle:
+            norm_hint = 0
+            if hint:
+                k = bisect_right(self._anchors_orig, hint) - 1
+                norm_hint = max(0, self._anchors_norm[k] + hint - self._anchors_orig[k])
+
+            position = self._find(needle, norm_hint)
+            if position == -1:
+                # LLM quotes often elide text; fall back to the longest fragment
+                fragments = [f.strip() for f in self._ELLIPSIS.split(needle)]
+                longest = max(fragments, key=len)
+                if longest != needle and len(longest) >= 20:
+                    needle = longest
+                    position = self._find(needle, norm_hint)
+
+            if position != -1:
+                start = self._to_original(position)
+                end = self._to_original(position + len(needle) - 1) + 1
+                location = TextLocation(page=self.page_index.page_of(start), start=start, end=end)
+
+        self._cache[quote] = location
+        return location
@@ -2,12 +2,16 @@
 PDF extraction and text processing module with multiple fallback strategies.
 """
 
+import io
 import logging
 from pathlib import Path
-from typing import Tuple, Optional
+from typing import Iterator, Tuple, Optional, Union
 import PyPDF2
 import pdfplumber
 
+from app.core.page_index import PageIndex
+from app.core.text_index import SectionIndex
+from app.core.text_normalizer import TextNormalizer
 from app.utils.exceptions import PDFParsingError, InsufficientTextError
 from app.utils.logger import setup_logger
 
@@ -35,25 +39,48 @@ class PDFParser:
             PDFParsingError: If PDF parsing fails
             InsufficientTextError: If extracted text is too short
         """
-        logger.info(f"Starting PDF extraction: {file_path}")
+        text, page_index = PDFParser.extract_pdf_document(file_path)
+        return text, page_index.page_count
+
+    @staticmethod
+    def extract_pdf_document(file_path: Union[str, bytes]) -> Tuple[str, PageIndex]:
+        """
+        Extract text from PDF along with the offset where each page starts.
+
+        Pages are streamed from the PDF reader through the normalizer and
+        joined with a newline, so the page index refers to offsets in the
+        cleaned text.
+
+        Args:
+            file_path: Path to PDF file, or the file's content
+
+        Returns:
+            Tuple of (extracted_text, page_index)
+
+        Raises:
+            PDFParsingError: If PDF parsing fails
+            InsufficientTextError: If extracted text is too short
+        """
+        logger.info(f"Starting PDF extraction: {file_path if isinstance(file_path, str) else 'in-memory file'}")
 
         try:
             # Strategy 1: PyPDF2 - Fast, standard method
-            text, page_count = PDFParser._extract_with_pypdf2(file_path)
+            text, page_index = TextNormalizer.normalize_document(PDFParser._extract_with_pypdf2(file_path))
+            page_count = page_index.page_count
             text_density = len(text) / (page_count * 5000) if page_count > 0 else 0
 
             if len(text) >= PDFParser.MIN_TEXT_LENGTH and text_density >= PDFParser.MIN_TEXT_DENSITY:
                 logger.info(f"Successfully extracted text using PyPDF2 ({len(text)} characters)")
-                return PDFParser._clean_text(text), page_count
+                return text, page_index
 
             logger.debug("PyPDF2 extraction insufficient, trying pdfplumber...")
 
             # Strategy 2: pdfplumber - Better for complex layouts
-            text, page_count = PDFParser._extract_with_pdfplumber(file_path)
+            text, page_index = TextNormalizer.normalize_document(PDFParser._extract_with_pdfplumber(file_path))
 
             if len(text) >= PDFParser.MIN_TEXT_LENGTH:
                 logger.info(f"Successfully extracted text using pdfplumber ({len(text)} characters)")
-                return PDFParser._clean_text(text), page_count
+                return text, page_index
 
             logger.warning("Both extraction methods returned insufficient text")
             raise InsufficientTextError(
@@ -68,73 +95,51 @@ class PDFParser:
             raise PDFParsingError(f"Failed to parse PDF: {str(e)}")
 
     @staticmethod
-    def _extract_with_pypdf2(file_path: str) -> Tuple[str, int]:
-        """Extract text using PyPDF2."""
+    def _extract_with_pypdf2(file_path: Union[str, bytes]) -> Iterator[str]:
+        """Extract text page by page using PyPDF2."""
         try:
-            with open(file_path, 'rb') as file:
+            with PDFParser._open(file_path) as file:
                 reader = PyPDF2.PdfReader(file)
-                page_count = len(reader.pages)
-                text = ""
 
                 for page_num, page in enumerate(reader.pages):
                     try:
-                        text += page.extract_text() or ""
+                        page_text = page.extract_text() or ""
                     except Exception as e:
                         logger.warning(f"Failed to extract text from page {page_num}: {str(e)}")
-                        continue
-
-                return text, page_count
+                        page_text = ""
+                    yield page_text
         except Exception as e:
             logger.error(f"PyPDF2 extraction failed: {str(e)}")
             raise
 
     @staticmethod
-    def _extract_with_pdfplumber(file_path: str) -> Tuple[str, int]:
-        """Extract text using pdfplumber."""
+    def _extract_with_pdfplumber(file_path: Union[str, bytes]) -> Iterator[str]:
+        """Extract text page by page using pdfplumber."""
         try:
-            text = ""
-            with pdfplumber.open(file_path) as pdf:
-                page_count = len(pdf.pages)
-
+            with pdfplumber.open(io.BytesIO(file_path) if isinstance(file_path, bytes) else file_path) as pdf:
                 for page_num, page in enumerate(pdf.pages):
                     try:
-                        page_text = page.extract_text()
-                        if page_text:
-                            text += page_text
+                        page_text = page.extract_text() or ""
                     except Exception as e:
                         logger.warning(f"Failed to extract text from page {page_num}: {str(e)}")
-                        continue
+                        page_text = ""
+                    yield page_text
 
-                return text, page_count
+                    # Release cached layout objects as soon as the page is done
+                    page.flush_cache()
         except Exception as e:
             logger.error(f"pdfplumber extraction failed: {str(e)}")
             raise
 
+    @staticmethod
+    def _open(file_path: Union[str, bytes]):
+        """Binary file object over a path or in-memory content."""
+        return io.BytesIO(file_path) if isinstance(file_path, bytes) else open(file_path, 'rb')
+
     @staticmethod
     def _clean_text(text: str) -> str:
         """Clean and normalize extracted text."""
-        # Remove excessive whitespace
-        lines = text.split('\n')
-        cleaned_lines = []
-
-        for line in lines:
-            # Strip leading/trailing whitespace
-            line = line.strip()
-            # Skip empty lines
-            if line:
-                cleaned_lines.append(line)
-
-        # Join with single newline
-        text = '\n'.join(cleaned_lines)
-
-        # Remove multiple consecutive newlines
-        while '\n\n\n' in text:
-            text = text.replace('\n\n\n', '\n\n')
-
-        # Fix common encoding issues
-        text = text.encode('utf-8', errors='ignore').decode('utf-8')
-
-        return text
+        return TextNormalizer.normalize(text)
 
     @staticmethod
     def get_page_count(file_path: str) -> int:
@@ -164,32 +169,8 @@ class TextProcessor:
         Returns:
             Dictionary mapping section names to section text
         """
-        sections = {
-            "insurance": [],
-            "liability": [],
-            "payment": [],
-            "indemnification": [],
-            "termination": [],
-            "scope": []
-        }
-
-        keywords = {
-            "insurance": ["insurance", "coverage", "insured", "policy"],
-            "liability": ["liability", "limit", "damages", "claims"],
-            "payment": ["payment", "fee", "invoice", "compensation", "price"],
-            "indemnification": ["indemnif", "hold harmless", "defend"],
-            "termination": ["termination", "terminate", "end", "expiration"],
-            "scope": ["scope", "services", "deliverables", "work"]
+        index = SectionIndex(text)
+        return {
+            section: [str(context) for context in index.contexts(section)]
+            for section in index.SECTIONS
         }
-
-        lines = text.split('\n')
-
-        for i, line in enumerate(lines):
-            line_lower = line.lower()
-            for section, keywords_list in keywords.items():
-                if any(keyword in line_lower for keyword in keywords_list):
-                    # Include context: current line + next few lines
-                    context = '\n'.join(lines[i:min(i+5, len(lines))])
-                    sections[section].append(context)
-
-        return sections
@@ -0,0 +1,270 @@
+"""
+Tenant-aware admission scheduler for analysis jobs.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, TypeVar
+
+from app.config import settings
+from app.utils.logger import setup_logger
+from app.utils.metrics import METRICS
+
+logger = setup_logger(__name__)
+
+T = TypeVar("T")
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+LANES = (INTERACTIVE, BATCH)  # Highest priority first
+
+# Rough LLM tokens consumed per character of contract text: the extraction
+# prompt carries the full text, detection and the JSON replies add about as much again
+TOKENS_PER_CHARACTER = 0.5
+TOKENS_PER_ANALYSIS = 3000
+
+
+def estimate_analysis_tokens(text_length: int) -> int:
+    """Estimate the LLM tokens one analysis of a contract will consume."""
+    return int(text_length * TOKENS_PER_CHARACTER) + TOKENS_PER_ANALYSIS
+
+
+class TokenBucket:
+    """Tokens-per-minute budget that refills continuously."""
+
+    __slots__ = ("capacity", "tokens", "_rate", "_updated")
+
+    def __init__(self, tokens_per_minute: int):
+        """Initialize a full bucket."""
+        self.capacity = float(max(1, tokens_per_minute))
+        self.tokens = self.capacity
+        self._rate = self.capacity / 60
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+    def can_spend(self, cost: int) -> bool:
+        """True if the cost fits now (a cost above capacity fits a full bucket)."""
+        self._refill()
+        return self.tokens >= min(cost, self.capacity)
+
+    def spend(self, cost: int) -> None:
+        self._refill()
+        self.tokens -= min(cost, self.capacity)
+
+    def wait_time(self, cost: int) -> float:
+        """Seconds until the cost fits."""
+        self._refill()
+        return max(0.0, (min(cost, self.capacity) - self.tokens) / self._rate)
+
+
+@dataclass
+class _Job:
+    tenant: str
+    lane: str
+    cost: int
+    tag: float  # Virtual finish time for weighted fair ordering
+    admitted: asyncio.Future = field(repr=False)
+
+
+@dataclass
+class _Tenant:
+    weight: float
+    bucket: TokenBucket
+    running: int = 0
+    last_tag: Dict[str, float] = field(default_factory=lambda: {lane: 0.0 for lane in LANES})
+    queues: Dict[str, Deque[_Job]] = field(default_factory=lambda: {lane: deque() for lane in LANES})
+
+
+class AnalysisScheduler:
+    """
+    Admit analysis jobs under global and per-tenant limits.
+
+    Jobs are queued per tenant in two priority lanes. Interactive jobs are
+    always admitted ahead of batch jobs, so batch work only fills capacity
+    interactive reviewers leave idle, and batch jobs never take the last
+    `interactive_reserved` slots, so an interactive upload arriving behind
+    a bulk import starts right away instead of waiting for a batch analysis
+    to finish. Within a lane, tenants are interleaved
+    by weighted fair queuing: each job gets a virtual finish tag of
+    cost / tenant weight past the tenant's previous tag, and the eligible job
+    with the smallest tag goes first, so a tenant with a long bulk import
+    cannot push others back.
+
+    A tenant is eligible while it is under its concurrent-analysis quota and
+    its tokens-per-minute bucket covers the job's estimated token cost.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int,
+        tenant_tokens_per_minute: int,
+        tenant_max_concurrent: int,
+        weights: Optional[Dict[str, float]] = None,
+        interactive_reserved: int = 0
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            max_concurrent: Analyses running at once across all tenants
+            tenant_tokens_per_minute: Token budget per tenant
+            tenant_max_concurrent: Analyses running at once per tenant
+            weights: Fair-share weight per tenant (1 if not listed)
+            interactive_reserved: Slots only interactive jobs may use (batch
+                jobs always keep at least one)
+        """
+        self.max_concurrent = max(1, max_concurrent)
+        self.batch_max_concurrent = max(1, self.max_concurrent - interactive_reserved)
+        self.tenant_tokens_per_minute = tenant_tokens_per_minute
+        self.tenant_max_concurrent = max(1, tenant_max_concurrent)
+        self.weights = weights or {}
+
+        self._tenants: Dict[str, _Tenant] = {}
+        self._virtual_time = {lane: 0.0 for lane in LANES}
+        self._running = 0
+        self._running_lanes = {lane: 0 for lane in LANES}
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    @classmethod
+    def from_settings(cls) -> "AnalysisScheduler":
+        """Create the scheduler configured by the analysis and tenant settings."""
+        return cls(
+            max_concurrent=settings.max_concurrent_analyses,
+            tenant_tokens_per_minute=settings.tenant_tokens_per_minute,
+            tenant_max_concurrent=settings.tenant_max_concurrent_analyses,
+            weights=settings.get_tenant_weights(),
+            interactive_reserved=settings.interactive_reserved_analyses
+        )
+
+    def _tenant(self, name: str) -> _Tenant:
+        tenant = self._tenants.get(name)
+        if tenant is None:
+            tenant = _Tenant(
+                weight=max(0.01, self.weights.get(name, 1.0)),
+                bucket=TokenBucket(self.tenant_tokens_per_minute)
+            )
+            self._tenants[name] = tenant
+        return tenant
+
+    def queued(self, lane: Optional[str] = None) -> int:
+        """Number of jobs waiting for admission (in one lane or all)."""
+        lanes = [lane] if lane else LANES
+        return sum(len(t.queues[l]) for t in self._tenants.values() for l in lanes)
+
+    def _publish(self) -> None:
+        METRICS.set_gauge("analyses_running", self._running)
+        for lane in LANES:
+            METRICS.set_gauge(f"analyses_running_{lane}", self._running_lanes[lane])
+            METRICS.set_gauge(f"analyses_queued_{lane}", self.queued(lane))
+
+    async def run(self, tenant: str, lane: str, cost: int, job: Callable[[], Awaitable[T]]) -> T:
+        """
+        Wait for admission, then run a job.
+
+        Args:
+            tenant: Tenant the job is billed to
+            lane: INTERACTIVE or BATCH
+            cost: Estimated LLM tokens the job will consume
+            job: Zero-argument callable returning the job's awaitable
+
+        Returns:
+            The job's result
+        """
+        if lane not in LANES:
+            raise ValueError(f"Unknown scheduling lane: {lane}")
+
+        state = self._tenant(tenant)
+        tag = max(self._virtual_time[lane], state.last_tag[lane]) + cost / state.weight
+        state.last_tag[lane] = tag
+        entry = _Job(tenant, lane, cost, tag, asyncio.get_running_loop().create_future())
+        state.queues[lane].append(entry)
+        self._dispatch()
+
+        try:
+            await entry.admitted
+        except asyncio.CancelledError:
+            if entry.admitted.done() and not entry.admitted.cancelled():
+                self._finish(state, lane)
+            elif entry in state.queues[lane]:
+                state.queues[lane].remove(entry)
+                self._publish()
+            raise
+
+        try:
+            return await job()
+        finally:
+            self._finish(state, lane)
+
+    def _finish(self, state: _Tenant, lane: str) -> None:
+        state.running -= 1
+        self._running -= 1
+        self._running_lanes[lane] -= 1
+        self._dispatch()
+
+    def _lane_full(self, lane: str) -> bool:
+        return lane == BATCH and self._running_lanes[BATCH] >= self.batch_max_concurrent
+
+    def _eligible(self, state: _Tenant, lane: str) -> Optional[_Job]:
+        queue = state.queues[lane]
+        while queue and queue[0].admitted.done():
+            queue.popleft()  # Cancelled while waiting
+        if not queue or state.running >= self.tenant_max_concurrent:
+            return None
+        head = queue[0]
+        return head if state.bucket.can_spend(head.cost) else None
+
+    def _dispatch(self) -> None:
+        """Admit queued jobs while there is capacity."""
+        while self._running < self.max_concurrent:
+            chosen = None
+            for lane in LANES:
+                if self._lane_full(lane):
+                    continue
+                candidates: List[_Job] = [
+                    job for job in (self._eligible(t, lane) for t in self._tenants.values())
+                    if job is not None
+                ]
+                if candidates:
+                    chosen = min(candidates, key=lambda job: job.tag)
+                    break
+            if chosen is None:
+                break
+
+            state = self._tenants[chosen.tenant]
+            state.queues[chosen.lane].popleft()
+            state.bucket.spend(chosen.cost)
+            state.running += 1
+            self._running += 1
+            self._running_lanes[chosen.lane] += 1
+            self._virtual_time[chosen.lane] = chosen.tag
+            chosen.admitted.set_result(None)
+
+        self._schedule_refill_check()
+        self._publish()
+
+    def _schedule_refill_check(self) -> None:
+        """Re-run dispatch when the earliest token-blocked job can afford its cost."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._running >= self.max_concurrent:
+            return
+
+        waits = [
+            t.bucket.wait_time(q[0].cost)
+            for t in self._tenants.values() if t.running < self.tenant_max_concurrent
+            for lane, q in t.queues.items() if q and not self._lane_full(lane)
+        ]
+        waits = [w for w in waits if w > 0]
+        if waits:
+            self._timer = asyncio.get_running_loop().call_later(min(waits), self._dispatch)
+
+
+ANALYSIS_SCHEDULER = AnalysisScheduler.from_settings()
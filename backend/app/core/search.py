@@ -0,0 +1,211 @@
+"""
+Full-text search over analyzed contracts, their clauses and risk evidence.
+"""
+
+import logging
+import re
+import sqlite3
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from app.config import settings
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+KINDS = ("contract", "clause", "evidence")
+SNIPPET_TOKENS = 16
+
+_TOKEN = re.compile(r"\w+")
+
+
+@dataclass(slots=True)
+class SearchHit:
+    """A matching passage."""
+    analysis_id: str
+    filename: str
+    tenant: str
+    kind: str  # contract, clause or evidence
+    title: str
+    page: Optional[int]
+    snippet: str
+    score: float  # Higher is more relevant
+
+
+def match_expression(query: str, phrase: bool = False) -> Optional[str]:
+    """
+    FTS5 query for user input: every word must match, or the words in order with phrase.
+
+    Words are quoted, so punctuation and FTS5 operators in the input are
+    taken literally. Returns None for input without words.
+    """
+    words = _TOKEN.findall(query)
+    if not words:
+        return None
+    if phrase:
+        return '"' + " ".join(words) + '"'
+    return " ".join(f'"{word}"' for word in words)
+
+
+class ContractSearchIndex:
+    """
+    SQLite FTS5 index of analyzed contracts.
+
+    Each analysis contributes one passage for its full text, one per
+    extracted clause (title and text) and one per risk evidence quote (risk
+    title and quote). Passages are ranked by BM25 with titles weighted above
+    bodies, and returned with a highlighted snippet. An analysis's passages
+    are written in one transaction with consecutive rowids, so indexing it
+    again replaces them with a rowid range delete.
+    """
+
+    def __init__(self, path: Optional[str]):
+        """
+        Open the index.
+
+        Args:
+            path: SQLite file to persist to, or None to keep the index in memory
+        """
+        if path:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(path or ":memory:", check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS documents (analysis_id TEXT PRIMARY KEY, tenant TEXT NOT NULL, "
+            "filename TEXT NOT NULL, analyzed_at TEXT NOT NULL, first_rowid INTEGER NOT NULL, "
+            "last_rowid INTEGER NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS documents_tenant ON documents (tenant)")
+        self._db.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS passages USING fts5("
+            "analysis_id UNINDEXED, kind UNINDEXED, page UNINDEXED, title, body, "
+            "tokenize = 'porter unicode61')"
+        )
+        self._db.commit()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls) -> "ContractSearchIndex":
+        """Create the index persisted under DATA_DIR."""
+        return cls(str(Path(settings.data_dir) / "search.db"))
+
+    def add(
+        self,
+        analysis_id: str,
+        tenant: str,
+        filename: str,
+        analyzed_at: str,
+        contract_text: str,
+        clauses: Iterable,
+        risks: Iterable[dict]
+    ) -> None:
+        """
+        Index an analysis, replacing anything indexed before under its ID.
+
+        Args:
+            analysis_id: Analysis ID
+            tenant: Tenant the analysis belongs to
+            filename: Original file name
+            analyzed_at: ISO timestamp of the analysis
+            contract_text: Full contract text
+            clauses: Extracted clauses (Clause records); missing ones are skipped
+            risks: Formatted risks (with "title" and "evidence_locations")
+        """
+        passages = [(analysis_id, "contract", None, filename, contract_text)]
+        passages.extend(
+            (analysis_id, "clause", clause.page_reference, clause.title, clause.text)
+            for clause in clauses
+            if clause.status != "missing" and clause.text
+        )
+        passages.extend(
+            (analysis_id, "evidence", location["page"], risk["title"], location["quote"])
+            for risk in risks
+            for location in risk.get("evidence_locations", [])
+        )
+
+        with self._lock:
+            db = self._db
+            try:
+                self._remove(analysis_id)
+                first = last = None
+                for passage in passages:
+                    rowid = db.execute(
+                        "INSERT INTO passages (analysis_id, kind, page, title, body) VALUES (?, ?, ?, ?, ?)", passage
+                    ).lastrowid
+                    first = rowid if first is None else first
+                    last = rowid
+                db.execute(
+                    "INSERT INTO documents VALUES (?, ?, ?, ?, ?, ?)",
+                    (analysis_id, tenant, filename, analyzed_at, first, last)
+                )
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+
+    def _remove(self, analysis_id: str) -> None:
+        row = self._db.execute(
+            "SELECT first_rowid, last_rowid FROM documents WHERE analysis_id = ?", (analysis_id,)
+        ).fetchone()
+        if row:
+            self._db.execute("DELETE FROM passages WHERE rowid BETWEEN ? AND ?", row)
+            self._db.execute("DELETE FROM documents WHERE analysis_id = ?", (analysis_id,))
+
+    def search(
+        self,
+        query: str,
+        phrase: bool = False,
+        kind: Optional[str] = None,
+        tenant: Optional[str] = None,
+        limit: int = 20,
+        offset: int = 0
+    ) -> List[SearchHit]:
+        """
+        Find passages matching a query, best first.
+
+        Args:
+            query: Words to search for
+            phrase: Match the words as an exact phrase instead of anywhere in the passage
+            kind: Only search passages of this kind (contract, clause or evidence)
+            tenant: Only search analyses of this tenant
+            limit: Maximum number of hits
+            offset: Number of hits to skip (for paging)
+
+        Returns:
+            Matching passages
+        """
+        expression = match_expression(query, phrase)
+        if expression is None:
+            return []
+
+        conditions = ["passages MATCH ?"]
+        parameters: list = [expression]
+        if kind:
+            conditions.append("p.kind = ?")
+            parameters.append(kind)
+        if tenant:
+            conditions.append("d.tenant = ?")
+            parameters.append(tenant)
+
+        sql = (
+            f"SELECT p.analysis_id, d.filename, d.tenant, p.kind, p.title, p.page, "
+            f"snippet(passages, 4, '<mark>', '</mark>', '…', {SNIPPET_TOKENS}), "
+            f"bm25(passages, 0, 0, 0, 2.0, 1.0) AS rank "
+            f"FROM passages p JOIN documents d ON d.analysis_id = p.analysis_id "
+            f"WHERE {' AND '.join(conditions)} ORDER BY rank LIMIT ? OFFSET ?"
+        )
+        with self._lock:
+            rows = self._db.execute(sql, (*parameters, limit, offset)).fetchall()
+
+        return [
+            SearchHit(analysis_id, filename, tenant_, kind_, title, page, snippet, round(-rank, 4))
+            for analysis_id, filename, tenant_, kind_, title, page, snippet, rank in rows
+        ]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT count(*) FROM documents").fetchone()[0]
+
+
+CONTRACT_SEARCH = ContractSearchIndex.from_settings()
@@ -0,0 +1,279 @@
+"""
+MinHash/LSH near-duplicate index over analyzed contract texts.
+"""
+
+import itertools
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import settings
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+_WORD = re.compile(r"\w+")
+
+# Universal hashing (a * x + b) mod p over 32-bit shingle hashes; a, b < 2^31
+# keeps every intermediate below 2^64
+_PRIME = np.uint64(4294967311)
+_EMPTY = np.uint64(np.iinfo(np.uint64).max)
+
+
+class MinHasher:
+    """
+    MinHash signatures over word shingles.
+
+    The fraction of equal positions in two signatures estimates the Jaccard
+    similarity of the two texts' shingle sets.
+    """
+
+    CHUNK = 4096  # Shingles hashed per vectorized step
+
+    def __init__(self, num_perm: int = 128, shingle_words: int = 5, seed: int = 1):
+        """
+        Initialize the hash family.
+
+        Args:
+            num_perm: Signature length (number of hash functions)
+            shingle_words: Words per shingle
+            seed: Seed for the hash family; signatures are only comparable
+                between hashers with the same seed and num_perm
+        """
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.shingle_words = shingle_words
+        self._a = rng.integers(1, 1 << 31, num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 1 << 31, num_perm, dtype=np.uint64)
+
+    def shingles(self, text: str) -> np.ndarray:
+        """Distinct 32-bit hashes of the text's word shingles (case and punctuation ignored)."""
+        words = _WORD.findall(text.lower())
+        k = min(self.shingle_words, len(words))
+        if not k:
+            return np.empty(0, dtype=np.uint64)
+        hashes = np.fromiter(
+            (zlib.crc32(" ".join(words[i:i + k]).encode("utf-8")) for i in range(len(words) - k + 1)),
+            dtype=np.uint64
+        )
+        return np.unique(hashes)
+
+    def signature(self, text: str) -> np.ndarray:
+        """MinHash signature of a text (all positions _EMPTY for a text without words)."""
+        hashes = self.shingles(text)
+        signature = np.full(self.num_perm, _EMPTY, dtype=np.uint64)
+        for start in range(0, len(hashes), self.CHUNK):
+            chunk = hashes[start:start + self.CHUNK]
+            values = (np.outer(self._a, chunk) + self._b[:, None]) % _PRIME
+            np.minimum(signature, values.min(axis=1), out=signature)
+        return signature
+
+
+@dataclass(slots=True)
+class IndexedDocument:
+    """A document stored in the similarity index."""
+    key: str
+    text: str
+    payload: dict = field(default_factory=dict)
+
+
+class SimilarityIndex:
+    """
+    Find the most similar previously indexed text.
+
+    Signatures are split into `bands` bands; two texts become candidates when
+    any band matches exactly, which happens with high probability above
+    roughly (1 / bands) ** (1 / rows) similarity. Candidates are ranked by
+    their estimated similarity. Band buckets and signatures are held in
+    memory, so a lookup is a handful of dict probes; documents, their text
+    and caller payload are persisted in SQLite and loaded back on startup.
+
+    Each document carries a tag (e.g. a settings fingerprint) and only
+    documents with the same tag are returned for a query. A document can
+    also be reached by get() under aliases, which nearest() never returns.
+    """
+
+    def __init__(self, path: Optional[str], num_perm: int = 128, bands: int = 16):
+        """
+        Initialize the index, loading persisted documents.
+
+        Args:
+            path: SQLite file to persist to, or None to keep the index in memory
+            num_perm: Signature length
+            bands: Number of LSH bands (must divide num_perm)
+        """
+        if num_perm % bands:
+            raise ValueError(f"bands ({bands}) must divide num_perm ({num_perm})")
+
+        self.hasher = MinHasher(num_perm)
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._signatures: Dict[str, np.ndarray] = {}
+        self._tags: Dict[str, str] = {}
+        self._added: Dict[str, int] = {}  # Insertion sequence, to prefer newer documents
+        self._sequence = itertools.count()
+        self._buckets: List[Dict[bytes, List[str]]] = [{} for _ in range(bands)]
+        self._aliases: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+        if path:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(path or ":memory:", check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS documents ("
+            "key TEXT PRIMARY KEY, tag TEXT NOT NULL, signature BLOB NOT NULL, "
+            "text BLOB NOT NULL, payload TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._db.execute("CREATE TABLE IF NOT EXISTS aliases (alias TEXT PRIMARY KEY, key TEXT NOT NULL)")
+        self._db.commit()
+        self._load()
+
+    @classmethod
+    def from_settings(cls) -> "SimilarityIndex":
+        """Create the index persisted under DATA_DIR."""
+        return cls(str(Path(settings.data_dir) / "similarity.db"))
+
+    def _load(self) -> None:
+        rows = self._db.execute("SELECT key, tag, signature FROM documents ORDER BY created_at").fetchall()
+        for key, tag, blob in rows:
+            signature = np.frombuffer(blob, dtype=np.uint64)
+            if len(signature) == self.hasher.num_perm:
+                self._insert(key, tag, signature)
+        self._aliases.update(self._db.execute("SELECT alias, key FROM aliases").fetchall())
+        if rows:
+            logger.info(f"Loaded {len(self._signatures)} documents into the similarity index")
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def _insert(self, key: str, tag: str, signature: np.ndarray) -> None:
+        self._remove(key)
+        self._signatures[key] = signature
+        self._tags[key] = tag
+        self._added[key] = next(self._sequence)
+        for bucket, band in zip(self._buckets, self._band_keys(signature)):
+            bucket.setdefault(band, []).append(key)
+
+    def _remove(self, key: str) -> None:
+        signature = self._signatures.pop(key, None)
+        if signature is None:
+            return
+        del self._tags[key]
+        del self._added[key]
+        for bucket, band in zip(self._buckets, self._band_keys(signature)):
+            keys = bucket.get(band, [])
+            if key in keys:
+                keys.remove(key)
+            if not keys:
+                bucket.pop(band, None)
+
+    def signature(self, text: str) -> np.ndarray:
+        """Signature of a text, for nearest() and add()."""
+        return self.hasher.signature(text)
+
+    def nearest(self, signature: np.ndarray, tag: str = "") -> Optional[Tuple[str, float]]:
+        """
+        Find the most similar indexed document.
+
+        Args:
+            signature: Query signature from signature()
+            tag: Only consider documents indexed with this tag
+
+        Returns:
+            Tuple of (document key, estimated similarity), or None without a candidate
+        """
+        if signature[0] == _EMPTY:
+            return None
+
+        with self._lock:
+            candidates = {
+                key
+                for bucket, band in zip(self._buckets, self._band_keys(signature))
+                for key in bucket.get(band, ())
+                if self._tags[key] == tag
+            }
+            scored = [
+                (float(np.mean(self._signatures[key] == signature)), self._added[key], key)
+                for key in candidates
+            ]
+        if not scored:
+            return None
+        # Newer documents win ties, so the latest of several copies is reused
+        similarity, _, key = max(scored)
+        return key, similarity
+
+    def similarity(self, key: str, signature: np.ndarray) -> float:
+        """Estimated similarity between an indexed document and a signature (0 if not indexed)."""
+        indexed = self._signatures.get(self._aliases.get(key, key))
+        if indexed is None:
+            return 0.0
+        return float(np.mean(indexed == signature))
+
+    def add(self, key: str, text: str, signature: np.ndarray, payload: dict, tag: str = "") -> None:
+        """
+        Index a document, replacing any previous one with the same key.
+
+        Args:
+            key: Document key returned by nearest()
+            text: Full text, returned by get()
+            signature: Signature of the text
+            payload: JSON-serializable data kept with the document
+            tag: Tag the document is matched under
+        """
+        if signature[0] == _EMPTY:
+            return
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO documents VALUES (?, ?, ?, ?, ?, ?)",
+                (key, tag, signature.tobytes(), zlib.compress(text.encode("utf-8")), json.dumps(payload), time.time())
+            )
+            self._db.commit()
+            self._insert(key, tag, signature)
+
+    def alias(self, alias: str, key: str) -> bool:
+        """
+        Make an indexed document reachable under another key as well.
+
+        Args:
+            alias: Additional key (e.g. the ID of an upload that shared the document's analysis)
+            key: Key of the indexed document
+
+        Returns:
+            Whether the document is indexed (nothing is aliased otherwise)
+        """
+        with self._lock:
+            key = self._aliases.get(key, key)
+            if key not in self._signatures:
+                return False
+            self._db.execute("INSERT OR REPLACE INTO aliases VALUES (?, ?)", (alias, key))
+            self._db.commit()
+            self._aliases[alias] = key
+        return True
+
+    def get(self, key: str) -> Optional[IndexedDocument]:
+        """Load an indexed document's text and payload, by key or alias."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT text, payload FROM documents WHERE key = ?", (self._aliases.get(key, key),)
+            ).fetchone()
+        if row is None:
+            return None
+        return IndexedDocument(key, zlib.decompress(row[0]).decode("utf-8"), json.loads(row[1]))
+
+    def __contains__(self, key: str) -> bool:
+        return self._aliases.get(key, key) in self._signatures
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+
+SIMILARITY_INDEX = SimilarityIndex.from_settings()
@@ -0,0 +1,113 @@
+"""
+Line-level diff between two versions of a text, in character offsets.
+"""
+
+import logging
+from dataclasses import dataclass
+from difflib import SequenceMatcher
+from itertools import accumulate
+from typing import List, Optional, Tuple
+
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+@dataclass(slots=True)
+class MatchedBlock:
+    """A run of identical lines, as character offsets into both texts."""
+    old_start: int
+    new_start: int
+    length: int
+
+    @property
+    def old_end(self) -> int:
+        return self.old_start + self.length
+
+    @property
+    def new_end(self) -> int:
+        return self.new_start + self.length
+
+
+class TextDiff:
+    """
+    Match unchanged lines between an old and a new version of a text.
+
+    Spans of the old text can be carried into the new one through the
+    matched blocks; everything in the new text outside them is changed.
+    """
+
+    def __init__(self, old: str, new: str):
+        """
+        Diff two texts.
+
+        Args:
+            old: Previous version
+            new: Current version
+        """
+        self.new_length = len(new)
+        old_lines = old.splitlines(keepends=True)
+        new_lines = new.splitlines(keepends=True)
+        old_offsets = [0, *accumulate(len(line) for line in old_lines)]
+        new_offsets = [0, *accumulate(len(line) for line in new_lines)]
+
+        matcher = SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+        self.blocks: List[MatchedBlock] = [
+            MatchedBlock(old_offsets[a], new_offsets[b], old_offsets[a + size] - old_offsets[a])
+            for a, b, size in matcher.get_matching_blocks()
+            if size
+        ]
+
+    @property
+    def unchanged_ratio(self) -> float:
+        """Share of the new text carried over unchanged."""
+        if not self.new_length:
+            return 1.0
+        return sum(block.length for block in self.blocks) / self.new_length
+
+    def map_span(self, start: int, end: int) -> Optional[int]:
+        """Start of an old span in the new text, or None unless it is entirely unchanged."""
+        for block in self.blocks:
+            if block.old_start <= start and end <= block.old_end:
+                return block.new_start + (start - block.old_start)
+        return None
+
+    def project(self, start: int, end: int) -> Optional[Tuple[int, int]]:
+        """
+        Smallest span of the new text covering what survives of an old span.
+
+        Returns:
+            Tuple of (start, end) in the new text, or None if none of it survives
+        """
+        spans = [
+            (block.new_start + max(start, block.old_start) - block.old_start,
+             block.new_start + min(end, block.old_end) - block.old_start)
+            for block in self.blocks
+            if block.old_start < end and start < block.old_end
+        ]
+        if not spans:
+            return None
+        return min(s for s, _ in spans), max(e for _, e in spans)
+
+    def changed_regions(self) -> List[Tuple[int, int]]:
+        """Spans of the new text not matched to the old one, in order."""
+        regions = []
+        position = 0
+        for block in sorted(self.blocks, key=lambda b: b.new_start):
+            if block.new_start > position:
+                regions.append((position, block.new_start))
+            position = max(position, block.new_end)
+        if position < self.new_length:
+            regions.append((position, self.new_length))
+        return regions
+
+
+def merge_spans(spans: List[Tuple[int, int]], gap: int = 0) -> List[Tuple[int, int]]:
+    """Merge overlapping spans, and spans at most `gap` characters apart."""
+    merged: List[Tuple[int, int]] = []
+    for start, end in sorted(spans):
+        if merged and start <= merged[-1][1] + gap:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
@@ -0,0 +1,202 @@
+"""
+Single-pass keyword index over contract text.
+"""
+
+import logging
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Sequence
+
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+SECTION_KEYWORDS = {
+    "insurance": ["insurance", "coverage", "insured", "policy"],
+    "liability": ["liability", "limit", "damages", "claims"],
+    "payment": ["payment", "fee", "invoice", "compensation", "price"],
+    "indemnification": ["indemnif", "hold harmless", "defend"],
+    "termination": ["termination", "terminate", "end", "expiration"],
+    "scope": ["scope", "services", "deliverables", "work"]
+}
+
+
+def _trie_pattern(words: Sequence[str]) -> str:
+    """
+    Compile keywords into a trie-shaped regex.
+
+    Shared prefixes are factored out so the regex engine walks one automaton
+    per text position instead of trying every keyword in turn.
+    """
+    trie: dict = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def emit(node: dict) -> str:
+        terminal = "" in node
+        branches = [re.escape(char) + emit(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if terminal:
+            return "(?:" + body + ")?"
+        return body
+
+    return emit(trie)
+
+
+def _keyword_sections(sections: List[str]) -> Dict[str, List[int]]:
+    """Map each keyword to the ids of the sections it belongs to."""
+    mapping: Dict[str, List[int]] = {}
+    for section_id, section in enumerate(sections):
+        for keyword in SECTION_KEYWORDS[section]:
+            mapping.setdefault(keyword, []).append(section_id)
+    return mapping
+
+
+@dataclass(slots=True, frozen=True)
+class TextSpan:
+    """Lazy view over a region of a document; text is sliced only on demand."""
+    source: str
+    start: int
+    end: int
+
+    @property
+    def text(self) -> str:
+        return self.source[self.start:self.end]
+
+    def __str__(self) -> str:
+        return self.text
+
+    def __len__(self) -> int:
+        return self.end - self.start
+
+
+@dataclass(slots=True, frozen=True)
+class SectionHit:
+    """A keyword occurrence located in the document."""
+    section: str
+    keyword: str
+    offset: int
+    line_number: int  # 1-based
+    page_number: int  # 1-based
+
+
+class SectionIndex:
+    """
+    Keyword index built in one pass over the document.
+
+    Every keyword of every section is matched simultaneously by a single
+    compiled automaton. Hits are kept as compact per-section offset arrays;
+    lines and pages are resolved by binary search, and context windows are
+    views, so lookups never rescan or copy the text.
+    """
+
+    SECTIONS = list(SECTION_KEYWORDS)
+    KEYWORDS = list(_keyword_sections(SECTIONS))
+    _KEYWORD_SECTIONS = _keyword_sections(SECTIONS)
+    # Keywords anchor at a word start so "end" no longer fires inside "defend"
+    PATTERN = re.compile(r"\b" + _trie_pattern(KEYWORDS))
+    PATTERN_IGNORECASE = re.compile(PATTERN.pattern, re.IGNORECASE)
+
+    def __init__(self, text: str, page_starts: Optional[Sequence[int]] = None):
+        """
+        Build the index.
+
+        Args:
+            text: Document text
+            page_starts: Sorted character offsets where each page begins.
+                Defaults to form-feed boundaries, or a single page.
+        """
+        self.text = text
+        self.line_starts = array("l", [0])
+        self.line_starts.extend(m.end() for m in re.finditer("\n", text))
+
+        if page_starts is None:
+            page_starts = [0] + [m.end() for m in re.finditer("\f", text)]
+        self.page_starts = array("l", page_starts or [0])
+
+        self._offsets: List[array] = [array("l") for _ in self.SECTIONS]
+        self._keyword_ids: List[array] = [array("b") for _ in self.SECTIONS]
+
+        # Case-sensitive matching on lowered text is much faster than
+        # IGNORECASE, but only valid when lowering keeps every offset.
+        lowered = text.lower()
+        if len(lowered) == len(text):
+            matches = self.PATTERN.finditer(lowered)
+        else:
+            matches = self.PATTERN_IGNORECASE.finditer(text)
+
+        keyword_ids = {keyword: i for i, keyword in enumerate(self.KEYWORDS)}
+        targets = {
+            keyword: [(self._offsets[s], self._keyword_ids[s]) for s in sections]
+            for keyword, sections in self._KEYWORD_SECTIONS.items()
+        }
+        for match in matches:
+            keyword = match.group().lower()
+            for offsets, ids in targets[keyword]:
+                offsets.append(match.start())
+                ids.append(keyword_ids[keyword])
+
+        logger.debug(f"Indexed {sum(len(o) for o in self._offsets)} keyword hits")
+
+    def _section_id(self, section: str) -> int:
+        try:
+            return self.SECTIONS.index(section)
+        except ValueError:
+            raise KeyError(f"Unknown section: {section}")
+
+    def count(self, section: str) -> int:
+        """Number of keyword hits for a section."""
+        return len(self._offsets[self._section_id(section)])
+
+    def count_between(self, section: str, start: int, end: int) -> int:
+        """Number of keyword hits for a section starting within [start, end)."""
+        offsets = self._offsets[self._section_id(section)]
+        return bisect_left(offsets, end) - bisect_left(offsets, start)
+
+    def counts(self) -> Dict[str, int]:
+        """Hit counts for every section."""
+        return {section: len(offsets) for section, offsets in zip(self.SECTIONS, self._offsets)}
+
+    def line_of(self, offset: int) -> int:
+        """0-based line index containing a character offset."""
+        return bisect_right(self.line_starts, offset) - 1
+
+    def page_of(self, offset: int) -> int:
+        """1-based page number containing a character offset."""
+        return max(1, bisect_right(self.page_starts, offset))
+
+    def hits(self, section: str) -> Iterator[SectionHit]:
+        """Iterate keyword hits for a section in document order."""
+        section_id = self._section_id(section)
+        for offset, keyword_id in zip(self._offsets[section_id], self._keyword_ids[section_id]):
+            yield SectionHit(
+                section=section,
+                keyword=self.KEYWORDS[keyword_id],
+                offset=offset,
+                line_number=self.line_of(offset) + 1,
+                page_number=self.page_of(offset)
+            )
+
+    def line_window(self, line: int, lines: int = 5) -> TextSpan:
+        """View over `lines` lines starting at a 0-based line index."""
+        start = self.line_starts[line]
+        last = line + lines
+        end = self.line_starts[last] - 1 if last < len(self.line_starts) else len(self.text)
+        return TextSpan(self.text, start, end)
+
+    def contexts(self, section: str, lines: int = 5) -> Iterator[TextSpan]:
+        """Context windows (one per matching line) for a section."""
+        previous = -1
+        for offset in self._offsets[self._section_id(section)]:
+            line = self.line_of(offset)
+            if line != previous:
+                previous = line
+                yield self.line_window(line, lines)
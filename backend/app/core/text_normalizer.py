@@ -0,0 +1,133 @@
+"""
+Streaming normalizer for extracted contract text.
+"""
+
+import logging
+import re
+import unicodedata
+from typing import Iterable, Iterator, List, NamedTuple, Tuple
+
+from app.core.page_index import PageIndex
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class NormalizedChunk(NamedTuple):
+    """Normalized text of one source page and where it lands in the output."""
+    text: str
+    offset: int  # Start offset of this chunk in the normalized document
+    page: int    # 1-based source page number
+
+
+def _blank_table() -> dict:
+    """Translation table for characters that are not printable on a line."""
+    table = {code: None for code in range(0x20)}
+    table.update({code: " " for code in (0x09, 0x0B, 0x0C, 0x0D, 0x85, 0xA0, 0x2028, 0x2029)})
+    table[0x7F] = None
+    table.update({code: None for code in range(0xD800, 0xE000)})  # Lone surrogates
+    return table
+
+
+class TextNormalizer:
+    """
+    Normalize page texts in a single pass per page.
+
+    Each page is split into lines once and every line is handled in place:
+    - Unicode normalization (NFKC), only for pages that are not already
+      normalized
+    - control characters and lone surrogates dropped, other blanks turned
+      into spaces, only for lines that are not printable
+    - leading/trailing whitespace stripped and inner runs collapsed to a
+      single space
+    - blank lines folded away
+    - words hyphenated across a line break ("indemni-" / "fication") joined
+
+    Every step is a C-level string method gated by a cheap check, so clean
+    text costs little more than the split and join. Pages are consumed
+    lazily from any iterable, so the raw text of the whole document never
+    has to be held in memory at once.
+    """
+
+    SEPARATOR = "\n"
+
+    _BLANKS = _blank_table()
+    _LEADING_WORD = re.compile(r"\w+")
+
+    @classmethod
+    def normalize(cls, text: str) -> str:
+        """Normalize a single block of text."""
+        if not text.isascii() and not unicodedata.is_normalized("NFKC", text):
+            text = unicodedata.normalize("NFKC", text)
+
+        blanks = cls._BLANKS
+        lines: List[str] = []
+        append = lines.append
+        previous = ""
+        for line in text.split("\n"):
+            if not line.isprintable():
+                line = line.translate(blanks)
+            line = " ".join(line.split()) if "  " in line else line.strip()
+            if not line:
+                continue
+
+            if previous[-1:] == "-" and previous[-2:-1].isalnum() and line[0].isalnum():
+                line = previous[:-1] + line
+                lines[-1] = line
+            else:
+                append(line)
+            previous = line
+
+        return "\n".join(lines)
+
+    @classmethod
+    def normalize_pages(cls, pages: Iterable[str]) -> Iterator[NormalizedChunk]:
+        """
+        Normalize pages lazily.
+
+        A word hyphenated across a page break is joined onto the earlier page,
+        so every chunk starts on a word boundary.
+
+        Args:
+            pages: Iterable of raw page texts (may be a generator)
+
+        Yields:
+            NormalizedChunk for each page, with offsets that account for the
+            separator placed between consecutive pages
+        """
+        offset = 0
+        pending = None  # Previous page, held back to repair cross-page hyphenation
+        for page_number, page_text in enumerate(pages, start=1):
+            text = cls.normalize(page_text or "")
+
+            if pending is not None:
+                previous = pending.text
+                if previous[-1:] == "-" and previous[-2:-1].isalnum() and text[:1].isalnum():
+                    word = cls._LEADING_WORD.match(text).group()
+                    pending = pending._replace(text=previous[:-1] + word)
+                    text = text[len(word):].lstrip()
+                yield pending
+                offset = pending.offset + len(pending.text) + len(cls.SEPARATOR)
+
+            pending = NormalizedChunk(text=text, offset=offset, page=page_number)
+
+        if pending is not None:
+            yield pending
+
+    @classmethod
+    def normalize_document(cls, pages: Iterable[str]) -> Tuple[str, PageIndex]:
+        """
+        Normalize pages and join them into one document.
+
+        Returns:
+            Tuple of (normalized_text, page_index)
+        """
+        parts: List[str] = []
+        starts: List[int] = []
+        for chunk in cls.normalize_pages(pages):
+            if parts:
+                parts.append(cls.SEPARATOR)
+            parts.append(chunk.text)
+            starts.append(chunk.offset)
+
+        return "".join(parts), PageIndex(starts or [0])
@@ -0,0 +1,71 @@
+"""
+Command-line bulk export of analyzed risks.
+
+Usage:
+    python -m app.export --output risks.csv [--format csv] [--tenant T] [--category C]
+        [--severity-level LEVEL] [--since YYYY-MM-DD] [--until YYYY-MM-DD]
+
+Writes the same rows as GET /api/v1/analytics/risks/export, read from the
+detection store and analytics index under DATA_DIR.
+"""
+
+import argparse
+import logging
+import sys
+import time
+from datetime import date
+from pathlib import Path
+from typing import List, Optional
+
+from app.config import settings
+from app.utils.logger import setup_logger
+from app.utils.exceptions import ValidationError
+from app.core.analytics import RISK_ANALYTICS, SEVERITY_LEVELS, RiskFilter
+from app.agents.detections import DETECTIONS
+from app.core.export import EXPORT_FORMATS, export_risks
+
+logger = setup_logger(__name__, settings.log_level)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point; returns the exit status."""
+    parser = argparse.ArgumentParser(description="Export analyzed contracts and their risks as NDJSON, CSV or Parquet")
+    parser.add_argument("-o", "--output", type=Path, required=True, help="File to write")
+    parser.add_argument("-f", "--format", choices=list(EXPORT_FORMATS),
+                        help="Output format (default: from the output file extension, else ndjson)")
+    parser.add_argument("--tenant", help="Only risks of this tenant")
+    parser.add_argument("--category", help="Only risks of this category, e.g. uncapped_liability")
+    parser.add_argument("--severity-level", choices=SEVERITY_LEVELS, help="Only risks of this level or above")
+    parser.add_argument("--min-score", type=int, help="Only risks scored at least this")
+    parser.add_argument("--max-score", type=int, help="Only risks scored at most this")
+    parser.add_argument("--since", type=date.fromisoformat, help="Only analyses on or after this date (YYYY-MM-DD)")
+    parser.add_argument("--until", type=date.fromisoformat, help="Only analyses on or before this date (YYYY-MM-DD)")
+    args = parser.parse_args(argv)
+
+    export_format = args.format or args.output.suffix.lstrip(".").lower()
+    if export_format not in EXPORT_FORMATS:
+        export_format = "ndjson"
+
+    conditions = RiskFilter(
+        args.category, args.tenant, args.severity_level, args.min_score, args.max_score, args.since, args.until
+    )
+    try:
+        chunks = export_risks(
+            RISK_ANALYTICS, DETECTIONS.export(args.tenant, args.since, args.until), conditions, export_format
+        )
+    except ValidationError as e:
+        parser.error(str(e))
+
+    started = time.monotonic()
+    written = 0
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, "wb") as out:
+        for data in chunks:
+            out.write(data)
+            written += len(data)
+    logger.info(f"Exported {written} bytes of {export_format} to {args.output} in {time.monotonic() - started:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,7 +9,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
 from app.config import settings
-from app.api.routes import health, contracts
+from app.api.routes import health, contracts, batches, analytics, search
 from app.utils.logger import setup_logger
 
 # Setup logging
@@ -22,6 +22,9 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info(f"Starting ContractsConnected API in {settings.environment} mode")
     logger.info(f"OpenAI Model: {settings.openai_model}")
+    resumed = await contracts.resume_interrupted_analyses()
+    if resumed:
+        logger.info(f"Resumed {resumed} interrupted analyses")
     yield
     # Shutdown
     logger.info("Shutting down ContractsConnected API")
@@ -48,6 +51,9 @@ app.add_middleware(
 # Include routers
 app.include_router(health.router)
 app.include_router(contracts.router)
+app.include_router(batches.router)
+app.include_router(analytics.router)
+app.include_router(search.router)
 
 
 @app.get("/")
@@ -0,0 +1,39 @@
+"""
+In-process metrics registry.
+"""
+
+import threading
+from typing import Dict
+
+
+class MetricsRegistry:
+    """
+    Process-wide gauges and counters.
+
+    Values are plain numbers read by the metrics endpoint; there is no
+    history or aggregation beyond what the caller records.
+    """
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self._gauges: Dict[str, float] = {}
+        self._counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def set_gauge(self, name: str, value: float) -> None:
+        """Set a gauge to its current value."""
+        with self._lock:
+            self._gauges[name] = value
+
+    def increment(self, name: str, amount: int = 1) -> None:
+        """Add to a monotonically increasing counter."""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def snapshot(self) -> dict:
+        """Current values of all metrics."""
+        with self._lock:
+            return {"gauges": dict(self._gauges), "counters": dict(self._counters)}
+
+
+METRICS = MetricsRegistry()
@@ -0,0 +1,13 @@
+"""
+Shared test setup.
+
+Settings are read when the app modules are imported, so the environment is
+prepared here first: a dummy API key (no test calls the LLM) and a scratch
+DATA_DIR for the stores created at import time.
+"""
+
+import os
+import tempfile
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+os.environ.setdefault("DATA_DIR", tempfile.mkdtemp(prefix="contract-analysis-tests-"))
@@ -0,0 +1,103 @@
+from datetime import date
+
+import numpy as np
+
+from app.core.analytics import RiskAnalyticsIndex, RiskFilter
+
+
+def result(day: str, *risks):
+    return {
+        "analyzed_at": f"{day}T10:00:00",
+        "risks": [
+            {"category": category, "title": f"{category} {i}", "severity_score": score, "severity_level": level}
+            for i, (category, score, level) in enumerate(risks)
+        ]
+    }
+
+
+def build() -> RiskAnalyticsIndex:
+    index = RiskAnalyticsIndex(None, capacity=2)  # Forces the columns to grow
+    index.add("a1", "acme", result("2026-01-15", ("missing_insurance", 90, "CRITICAL"), ("ambiguous_scope", 40, "MEDIUM")))
+    index.add("a2", "acme", result("2026-02-03", ("missing_insurance", 60, "HIGH")))
+    index.add("b1", "globex", result("2026-02-20", ("vague_payment_terms", 20, "LOW"), ("missing_insurance", 80, "CRITICAL")))
+    index.add("b2", "globex", result("2026-03-01"))
+    return index
+
+
+def test_mask_combines_conditions():
+    index = build()
+    assert index._mask(RiskFilter()).tolist() == [True] * 5
+    assert index._mask(RiskFilter(category="missing_insurance", tenant="acme")).tolist() == [
+        True, False, True, False, False
+    ]
+    assert index._mask(RiskFilter(severity_level="HIGH", max_score=85)).tolist() == [False, False, True, False, True]
+    assert index._mask(RiskFilter(since=date(2026, 2, 1), until=date(2026, 2, 3))).tolist() == [
+        False, False, True, False, False
+    ]
+    assert not index._mask(RiskFilter(category="never_seen")).any()
+
+
+def test_mask_over_selected_rows():
+    index = build()
+    rows = np.array([4, 0])
+    assert index._mask(RiskFilter(min_score=85), rows).tolist() == [False, True]
+
+
+def test_count_counts_risks_and_contracts():
+    index = build()
+    assert index.count(RiskFilter(category="missing_insurance")) == {"risks": 3, "contracts": 3}
+    assert index.count(RiskFilter(tenant="globex")) == {"risks": 2, "contracts": 1}
+
+
+def test_histograms():
+    index = build()
+    assert index.histogram(RiskFilter(), "category") == [
+        ("missing_insurance", 3), ("ambiguous_scope", 1), ("vague_payment_terms", 1)
+    ]
+    assert index.histogram(RiskFilter(tenant="acme"), "severity_level") == [("MEDIUM", 1), ("HIGH", 1), ("CRITICAL", 1)]
+    assert index.histogram(RiskFilter(), "month") == [("2026-01", 2), ("2026-02", 3)]
+    assert index.histogram(RiskFilter(), "severity_score", bins=4) == [
+        ("0-25", 1), ("25-50", 1), ("50-75", 1), ("75-100", 2)
+    ]
+    assert index.histogram(RiskFilter(category="never_seen"), "month") == []
+
+
+def test_re_adding_an_analysis_replaces_its_rows():
+    index = build()
+    index.add("a1", "acme", result("2026-01-15", ("ambiguous_scope", 30, "MEDIUM")))
+    assert len(index) == 4
+    assert index.count(RiskFilter(tenant="acme")) == {"risks": 2, "contracts": 2}
+    index.add("a2", "acme", result("2026-02-03"))
+    assert index.count(RiskFilter(tenant="acme")) == {"risks": 1, "contracts": 1}
+
+
+def test_analysis_risks_joins_positions_with_scores():
+    index = build()
+    risks = index.analysis_risks(["b1", "a1", "b2", "unknown"], RiskFilter(min_score=50))
+    assert risks == {
+        "b1": (2, [(1, 80, "CRITICAL")]),
+        "a1": (2, [(0, 90, "CRITICAL")])
+    }
+    assert index.analysis_risks([], RiskFilter()) == {}
+
+
+def test_rescore_updates_changed_rows_only():
+    index = build()
+    updated = index.rescore(
+        ["a1", "b1", "a2"],
+        np.array([2, 2, 5]),
+        np.array([90, 55, 20, 80, 1, 2, 3, 4, 5]),
+        ["LOW"] * 26 + ["MEDIUM"] * 25 + ["HIGH"] * 25 + ["CRITICAL"] * 25
+    )
+    assert updated == 4  # a2 was indexed with a different number of risks
+    assert index.analysis_risks(["a1"], RiskFilter())["a1"][1] == [(0, 90, "CRITICAL"), (1, 55, "HIGH")]
+
+
+def test_index_is_reloaded_from_disk(tmp_path):
+    path = str(tmp_path / "analytics.db")
+    index = RiskAnalyticsIndex(path)
+    index.add("a1", "acme", result("2026-01-15", ("missing_insurance", 90, "CRITICAL")))
+    index.add("a1", "acme", result("2026-01-15", ("ambiguous_scope", 40, "MEDIUM")))
+
+    reloaded = RiskAnalyticsIndex(path)
+    assert reloaded.histogram(RiskFilter(), "category") == [("ambiguous_scope", 1)]
@@ -0,0 +1,78 @@
+import asyncio
+
+import pytest
+
+from app.core.coalescing import SingleFlight, content_key
+
+
+def test_content_key_depends_on_text_and_configuration():
+    assert content_key("text", "a") == content_key("text", "a")
+    assert content_key("text", "a") != content_key("text", "b")
+    assert content_key("text", "a", "b") != content_key("text", "ab")
+
+
+async def test_concurrent_submissions_share_one_run():
+    flights = SingleFlight("test")
+    calls = []
+    release = asyncio.Event()
+
+    async def job():
+        calls.append(1)
+        await release.wait()
+        return "result"
+
+    leader, leads = flights.submit("key", "first", job)
+    follower, follows = flights.submit("key", "second", job)
+    assert leads and not follows
+    assert flights.members("key") == ["first", "second"]
+
+    release.set()
+    assert await leader == "result"
+    assert await follower == "result"
+    assert calls == [1]
+
+
+async def test_key_is_forgotten_when_the_job_finishes():
+    flights = SingleFlight("test")
+
+    async def job():
+        return 1
+
+    shared, _ = flights.submit("key", "first", job)
+    await shared
+    await asyncio.sleep(0)
+    assert "key" not in flights
+    _, leads = flights.submit("key", "later", job)
+    assert leads
+
+
+async def test_a_member_giving_up_does_not_cancel_the_shared_job():
+    flights = SingleFlight("test")
+    release = asyncio.Event()
+
+    async def job():
+        await release.wait()
+        return "done"
+
+    leader, _ = flights.submit("key", "first", job)
+    follower, _ = flights.submit("key", "second", job)
+    follower.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await follower
+
+    release.set()
+    assert await leader == "done"
+
+
+async def test_failures_reach_every_member():
+    flights = SingleFlight("test")
+
+    async def job():
+        await asyncio.sleep(0)
+        raise RuntimeError("provider outage")
+
+    leader, _ = flights.submit("key", "first", job)
+    follower, _ = flights.submit("key", "second", job)
+    for shared in (leader, follower):
+        with pytest.raises(RuntimeError):
+            await shared
@@ -0,0 +1,74 @@
+from app.agents.llm.json_stream import JSONArrayStream
+
+
+def feed_in_chunks(text: str, size: int) -> JSONArrayStream:
+    stream = JSONArrayStream()
+    items = []
+    for i in range(0, len(text), size):
+        items.extend(stream.feed(text[i:i + size]))
+    assert items == stream.items
+    return stream
+
+
+def test_items_complete_across_arbitrary_chunks():
+    text = '{"clauses": [{"title": "Payment", "text": "Net 30 [days]"}, {"title": "Scope", "tags": ["a", "b"]}]}'
+    for size in (1, 3, 7, len(text)):
+        stream = feed_in_chunks(text, size)
+        assert stream.items == [
+            {"title": "Payment", "text": "Net 30 [days]"},
+            {"title": "Scope", "tags": ["a", "b"]}
+        ]
+        assert stream.complete
+        assert not stream.truncated
+
+
+def test_items_are_emitted_as_soon_as_they_close():
+    stream = JSONArrayStream()
+    assert stream.feed('[{"a": 1}, {"b"') == [{"a": 1}]
+    assert stream.feed(': 2}]') == [{"b": 2}]
+
+
+def test_prose_brackets_before_the_array_are_skipped():
+    text = 'Findings [see below], as in [1] and [ 2 ]:\n```json\n{"risks": [{"title": "Vague payment"}]}\n```'
+    for size in (1, 5, len(text)):
+        assert feed_in_chunks(text, size).items == [{"title": "Vague payment"}]
+
+
+def test_bracket_followed_only_by_whitespace_waits_for_the_next_chunk():
+    stream = JSONArrayStream()
+    assert stream.feed("Result: [") == []
+    assert stream.feed('\n  {"a": 1}]') == [{"a": 1}]
+    assert stream.complete
+
+
+def test_empty_array_is_complete():
+    stream = JSONArrayStream.parse('{"risks": []}')
+    assert stream.items == []
+    assert stream.complete
+
+
+def test_string_elements_and_escapes_split_across_chunks():
+    stream = JSONArrayStream()
+    stream.feed('["say \\')
+    stream.feed('"hi\\"", "x"]')
+    assert stream.items == ['say "hi"', "x"]
+
+
+def test_truncated_response_keeps_completed_items():
+    stream = JSONArrayStream.parse('[{"a": 1}, {"b": ')
+    assert stream.items == [{"a": 1}]
+    assert stream.truncated
+    assert not stream.complete
+
+
+def test_invalid_elements_are_counted_and_skipped():
+    stream = JSONArrayStream.parse('[{"a": 1,}, {"b": 2}]')
+    assert stream.items == [{"b": 2}]
+    assert stream.invalid_items == 1
+
+
+def test_text_without_an_array_yields_nothing():
+    stream = JSONArrayStream.parse("I could not find any clauses.")
+    assert stream.items == []
+    assert not stream.complete
+    assert not stream.truncated
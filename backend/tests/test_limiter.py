@@ -0,0 +1,104 @@
+import asyncio
+
+import pytest
+
+from app.agents.llm.limiter import AdaptiveLimiter
+
+
+async def test_permits_beyond_the_limit_queue_until_released():
+    limiter = AdaptiveLimiter(initial=2)
+    await limiter.acquire()
+    await limiter.acquire()
+    waiter = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    assert limiter.in_flight == 2 and limiter.queued == 1
+
+    limiter.release()
+    await waiter
+    assert limiter.in_flight == 2 and limiter.queued == 0
+
+
+async def test_cancelled_waiter_leaves_the_queue():
+    limiter = AdaptiveLimiter(initial=1)
+    await limiter.acquire()
+    waiter = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    assert limiter.queued == 0
+    limiter.release()
+    assert limiter.in_flight == 0
+
+
+def test_additive_increase_while_latency_is_stable():
+    limiter = AdaptiveLimiter(initial=2, maximum=4)
+    limiter.on_success(1.0)
+    assert limiter.limit == pytest.approx(2.5)
+    limiter.on_success(1.2)
+    assert limiter.limit == pytest.approx(2.9)
+
+
+def test_no_increase_when_latency_degrades():
+    limiter = AdaptiveLimiter(initial=2)
+    limiter.on_success(1.0)
+    limiter.on_success(10.0)
+    assert limiter.limit == pytest.approx(2.5)
+
+
+def test_growth_stops_at_the_maximum():
+    limiter = AdaptiveLimiter(initial=3, maximum=3)
+    limiter.on_success(1.0)
+    assert limiter.limit == 3
+
+
+def test_multiplicative_decrease_once_per_congestion_signal():
+    limiter = AdaptiveLimiter(initial=8, minimum=3)
+    limiter.on_success(5.0)
+    limit = limiter.limit
+    limiter.on_overload()
+    assert limiter.limit == pytest.approx(limit / 2)
+    limiter.on_overload()  # Same burst of throttled calls
+    assert limiter.limit == pytest.approx(limit / 2)
+
+    limiter._last_decrease -= 10
+    limiter.on_overload()
+    assert limiter.limit == 3  # Floor
+
+
+async def test_slot_feeds_outcomes_back():
+    limiter = AdaptiveLimiter(initial=2)
+    async with limiter.slot():
+        assert limiter.in_flight == 1
+    assert limiter.in_flight == 0
+    assert limiter.limit > 2
+
+    limit = limiter.limit
+    with pytest.raises(asyncio.TimeoutError):
+        async with limiter.slot():
+            raise asyncio.TimeoutError()
+    assert limiter.limit == pytest.approx(limit / 2)
+    assert limiter.in_flight == 0
+
+
+def test_retry_delay_only_for_transient_errors():
+    limiter = AdaptiveLimiter(initial=1, max_retries=2)
+    assert limiter.retry_delay(ValueError("bad prompt"), 0) is None
+    assert 0.5 <= limiter.retry_delay(asyncio.TimeoutError(), 0) <= 1.0
+    assert 1.0 <= limiter.retry_delay(asyncio.TimeoutError(), 1) <= 2.0
+    assert limiter.retry_delay(asyncio.TimeoutError(), 2) is None
+
+
+async def test_call_retries_transient_failures(monkeypatch):
+    limiter = AdaptiveLimiter(initial=1)
+    monkeypatch.setattr(limiter, "retry_delay", lambda error, attempt: 0 if attempt < 2 else None)
+    attempts = []
+
+    async def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise asyncio.TimeoutError()
+        return "ok"
+
+    assert await limiter.call(flaky) == "ok"
+    assert len(attempts) == 3
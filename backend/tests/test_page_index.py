@@ -0,0 +1,63 @@
+from app.core.page_index import PageIndex, TextLocation, TextLocator
+
+
+def test_from_pages_records_page_starts():
+    text, index = PageIndex.from_pages(["first page", "second", "third"])
+    assert text == "first page\nsecond\nthird"
+    assert list(index.starts) == [0, 11, 18]
+    assert index.page_count == 3
+    assert [index.page_of(offset) for offset in (0, 10, 11, 17, 18, 100)] == [1, 1, 2, 2, 3, 3]
+
+
+def test_from_text_splits_on_form_feeds():
+    index = PageIndex.from_text("one\ftwo\fthree")
+    assert list(index.starts) == [0, 4, 8]
+    assert PageIndex.from_text("no breaks").page_count == 1
+
+
+TEXT = (
+    "MASTER SERVICES AGREEMENT\n"
+    "1. Payment.  Client shall pay\n   Contractor within 30 days.\n"
+    "\f2. Termination. Either party may terminate on notice.\n"
+    "3. Payment. Client shall pay Contractor within 30 days.\n"
+)
+
+
+def locator() -> TextLocator:
+    return TextLocator(TEXT, PageIndex.from_text(TEXT))
+
+
+def test_locates_quotes_ignoring_case_and_line_wrapping():
+    location = locator().locate("client shall pay contractor within 30 days")
+    assert location == TextLocation(page=1, start=TEXT.index("Client"), end=TEXT.index(" days.") + 5)
+
+
+def test_hint_finds_the_occurrence_after_it():
+    hint = TEXT.index("3. Payment")
+    location = locator().locate("Client shall pay Contractor within 30 days", hint)
+    assert location.start == TEXT.index("Client", hint)
+    assert location.page == 2
+
+
+def test_search_wraps_around_before_the_hint():
+    location = locator().locate("Either party may terminate", len(TEXT) - 5)
+    assert location.start == TEXT.index("Either")
+
+
+def test_quote_marks_and_elisions_are_tolerated():
+    location = locator().locate('"Either party may terminate ... on notice"')
+    assert TEXT[location.start:location.end] in "Either party may terminate on notice"
+
+
+def test_missing_quote_is_none():
+    assert locator().locate("limitation of liability") is None
+    assert locator().locate("   ") is None
+
+
+def test_case_insensitive_when_lowering_changes_the_length():
+    text = "İstanbul Office\nThe  Contractor shall PAY all fees."
+    located = TextLocator(text)
+    location = located.locate("the contractor shall pay")
+    assert text[location.start:location.end] == "The  Contractor shall PAY"
+    location = located.locate("İSTANBUL office")
+    assert (location.start, location.end) == (0, 15)
@@ -0,0 +1,106 @@
+import asyncio
+
+from app.core.scheduler import BATCH, INTERACTIVE, AnalysisScheduler, TokenBucket
+
+UNLIMITED = 10 ** 9
+
+
+async def run_queued(scheduler: AnalysisScheduler, jobs):
+    """Hold the only slot, queue the jobs, then release it; returns the admission order."""
+    order = []
+    release = asyncio.Event()
+
+    async def blocker():
+        await release.wait()
+
+    async def job(name):
+        order.append(name)
+
+    running = [asyncio.create_task(scheduler.run("blocker", INTERACTIVE, 1, blocker))]
+    await asyncio.sleep(0)
+    for name, tenant, lane, cost in jobs:
+        running.append(asyncio.create_task(scheduler.run(tenant, lane, cost, lambda name=name: job(name))))
+        await asyncio.sleep(0)
+    release.set()
+    await asyncio.gather(*running)
+    return order
+
+
+async def test_weighted_fair_queuing_interleaves_tenants():
+    scheduler = AnalysisScheduler(1, UNLIMITED, 1, weights={"heavy": 2})
+    jobs = [(f"heavy{i}", "heavy", BATCH, 100) for i in range(3)]
+    jobs += [(f"light{i}", "light", BATCH, 100) for i in range(3)]
+    order = await run_queued(scheduler, jobs)
+    assert order == ["heavy0", "heavy1", "light0", "heavy2", "light1", "light2"]
+
+
+async def test_interactive_jobs_go_ahead_of_batch_jobs():
+    scheduler = AnalysisScheduler(1, UNLIMITED, 5)
+    jobs = [("batch0", "a", BATCH, 1), ("batch1", "b", BATCH, 1), ("upload", "c", INTERACTIVE, 1000)]
+    order = await run_queued(scheduler, jobs)
+    assert order[0] == "upload"
+
+
+async def test_batch_jobs_leave_reserved_slots_to_interactive_ones():
+    scheduler = AnalysisScheduler(2, UNLIMITED, 5, interactive_reserved=1)
+    release = asyncio.Event()
+    started = []
+
+    async def job(name):
+        started.append(name)
+        await release.wait()
+
+    tasks = [asyncio.create_task(scheduler.run("t", BATCH, 1, lambda i=i: job(f"batch{i}"))) for i in range(2)]
+    await asyncio.sleep(0)
+    assert started == ["batch0"]
+
+    tasks.append(asyncio.create_task(scheduler.run("u", INTERACTIVE, 1, lambda: job("upload"))))
+    await asyncio.sleep(0)
+    assert started == ["batch0", "upload"]
+
+    release.set()
+    await asyncio.gather(*tasks)
+    assert started == ["batch0", "upload", "batch1"]
+
+
+async def test_tenant_quota_lets_other_tenants_through():
+    scheduler = AnalysisScheduler(3, UNLIMITED, 1)
+    release = asyncio.Event()
+    started = []
+
+    async def job(name):
+        started.append(name)
+        await release.wait()
+
+    tasks = [
+        asyncio.create_task(scheduler.run(tenant, BATCH, 1, lambda name=name: job(name)))
+        for name, tenant in (("a0", "a"), ("a1", "a"), ("b0", "b"))
+    ]
+    await asyncio.sleep(0)
+    assert started == ["a0", "b0"]
+    assert scheduler.queued() == 1
+    release.set()
+    await asyncio.gather(*tasks)
+
+
+async def test_cancelled_job_leaves_the_queue():
+    scheduler = AnalysisScheduler(1, UNLIMITED, 1)
+    release = asyncio.Event()
+    holder = asyncio.create_task(scheduler.run("a", BATCH, 1, release.wait))
+    waiting = asyncio.create_task(scheduler.run("b", BATCH, 1, release.wait))
+    await asyncio.sleep(0)
+    assert scheduler.queued() == 1
+
+    waiting.cancel()
+    await asyncio.gather(waiting, return_exceptions=True)
+    assert scheduler.queued() == 0
+    release.set()
+    await holder
+
+
+def test_token_bucket_caps_oversized_costs():
+    bucket = TokenBucket(600)
+    assert bucket.can_spend(10_000)  # Larger than the bucket, fits when full
+    bucket.spend(10_000)
+    assert not bucket.can_spend(10)
+    assert 0.9 < bucket.wait_time(10) <= 1.0
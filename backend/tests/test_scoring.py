@@ -0,0 +1,85 @@
+import numpy as np
+
+from app.agents.detections import DetectionStore
+from app.agents.nodes.scoring import BUILTIN_SCORING_VERSION, ScoringTable, score_risks_node
+from app.agents.state import Risk
+
+FACTORS = ["LOW", "MEDIUM", "HIGH", "UNKNOWN"]
+TABLE_V2 = ScoringTable.from_dict("v2", {
+    "impact_scores": {"HIGH": 95, "LOW": 20},
+    "likelihood_multipliers": {"LOW": 0.5},
+    "severity_ranges": {"LOW": [0, 30], "MEDIUM": [31, 60], "HIGH": [61, 85], "CRITICAL": [86, 100]}
+})
+
+
+def risks(*factors):
+    return [
+        Risk(category="vague_payment_terms", title=f"Risk {i}", financial_impact=impact, likelihood=likelihood)
+        for i, (impact, likelihood) in enumerate(factors)
+    ]
+
+
+def test_score_grid_matches_score():
+    for table in (ScoringTable(BUILTIN_SCORING_VERSION), TABLE_V2):
+        grid = table.score_grid(FACTORS, FACTORS)
+        assert grid.dtype == np.int16
+        for i, impact in enumerate(FACTORS):
+            for j, likelihood in enumerate(FACTORS):
+                assert grid[i, j] == table.score(impact, likelihood)
+
+
+def test_scores_are_clamped_and_levelled():
+    table = ScoringTable(BUILTIN_SCORING_VERSION)
+    assert table.score("HIGH", "HIGH") == 100  # 80 * 1.3 clamped
+    assert table.score("LOW", "LOW") == 24
+    assert table.level(24) == "LOW"
+    assert table.levels()[76] == "CRITICAL"
+    assert TABLE_V2.level(76) == "HIGH"
+
+
+async def test_rescore_matches_the_scoring_node():
+    analyses = {
+        "a": risks(("HIGH", "LOW"), ("MEDIUM", "HIGH"), ("LOW", "MEDIUM")),
+        "b": risks(("UNKNOWN", "HIGH"), ("HIGH", "HIGH")),
+        "c": []
+    }
+    store = DetectionStore(None)
+    for analysis_id, detected in analyses.items():
+        store.add(analysis_id, "tenant", detected, "v0", 0)
+
+    rescoring = store.rescore(ScoringTable(BUILTIN_SCORING_VERSION))
+    assert rescoring.analysis_ids == ["a", "b", "c"]
+    assert rescoring.counts.tolist() == [3, 2, 0]
+
+    expected_scores, expected_overall = [], []
+    for detected in analyses.values():
+        result = await score_risks_node({"detected_risks": detected})
+        expected_scores.extend(risk.severity_score for risk in result["scored_risks"])
+        expected_overall.append(result["overall_risk_score"])
+        assert [rescoring.levels[risk.severity_score] for risk in result["scored_risks"]] == [
+            risk.severity_level for risk in result["scored_risks"]
+        ]
+    assert rescoring.scores.tolist() == expected_scores
+    assert rescoring.overall.tolist() == expected_overall
+
+
+def test_rescore_only_touches_stale_versions():
+    store = DetectionStore(None)
+    store.add("a", "tenant", risks(("HIGH", "HIGH")), "v1", 100)
+    store.add("b", "tenant", risks(("LOW", "LOW")), "v2", 10)
+
+    rescoring = store.rescore(TABLE_V2)
+    assert rescoring.analysis_ids == ["a"]
+    assert rescoring.scores.tolist() == [TABLE_V2.score("HIGH", "HIGH")]
+    assert store.versions() == {"v2": 2}
+    assert store.rescore(TABLE_V2).analysis_ids == []
+    assert store.rescore(TABLE_V2, everything=True).analysis_ids == ["a", "b"]
+
+
+def test_re_adding_an_analysis_replaces_it():
+    store = DetectionStore(None)
+    store.add("a", "tenant", risks(("HIGH", "HIGH")), "v1", 100)
+    store.add("a", "tenant", risks(("LOW", "LOW"), ("LOW", "HIGH")), "v1", 30)
+    assert len(store) == 1
+    assert [risk["title"] for risk in store.detected_risks("a")] == ["Risk 0", "Risk 1"]
+    assert store.rescore(ScoringTable("v3")).counts.tolist() == [2]
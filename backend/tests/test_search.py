@@ -0,0 +1,42 @@
+from app.agents.state import Clause
+from app.core.search import ContractSearchIndex, match_expression
+
+
+def test_match_expression_quotes_every_word():
+    assert match_expression("indemnify AND hold-harmless*") == '"indemnify" "AND" "hold" "harmless"'
+
+
+def test_match_expression_phrase():
+    assert match_expression('"limitation of liability"', phrase=True) == '"limitation of liability"'
+
+
+def test_match_expression_without_words():
+    assert match_expression("  !?* ") is None
+
+
+def index_contract() -> ContractSearchIndex:
+    index = ContractSearchIndex(None)
+    index.add(
+        "a1", "acme", "msa.pdf", "2026-01-15T10:00:00",
+        "Master services agreement. The Contractor shall hold harmless the Client.",
+        [
+            Clause(section="INDEMNIFICATION", title="Hold harmless", text="The Contractor shall hold harmless the Client."),
+            Clause(section="MISSING", title="No insurance", text="No insurance requirements", status="missing")
+        ],
+        []
+    )
+    return index
+
+
+def test_operators_in_user_input_are_taken_literally():
+    index = index_contract()
+    assert index.search("hold AND harmless") == []  # "AND" must appear as a word
+    assert index.search("harmless NOT*") == []
+    assert {hit.kind for hit in index.search("hold harmless")} == {"contract", "clause"}
+
+
+def test_phrase_search_requires_word_order():
+    index = index_contract()
+    assert index.search("harmless hold", phrase=True) == []
+    assert index.search("hold harmless", phrase=True, kind="clause")[0].title == "Hold harmless"
+    assert index.search("insurance requirements") == []  # Missing clauses are not indexed
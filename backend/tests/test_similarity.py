@@ -0,0 +1,79 @@
+import numpy as np
+
+from app.core.similarity import MinHasher, SimilarityIndex
+
+BASE = " ".join(
+    f"Section {i}. The Contractor shall deliver item {i} to the Client within {i + 10} days of the order date."
+    for i in range(40)
+)
+EDITED = BASE.replace("within 15 days", "within 45 days")
+OTHER = " ".join(f"Lease clause {i}: the tenant pays rent of {i * 100} dollars on the first day." for i in range(40))
+
+
+def estimate(a: np.ndarray, b: np.ndarray) -> float:
+    return float(np.mean(a == b))
+
+
+def test_signature_similarity_tracks_jaccard():
+    hasher = MinHasher()
+    base = hasher.signature(BASE)
+    assert estimate(base, hasher.signature(BASE)) == 1.0
+    assert estimate(base, hasher.signature(EDITED)) > 0.9
+    assert estimate(base, hasher.signature(OTHER)) < 0.1
+
+
+def test_shingles_ignore_case_and_punctuation():
+    hasher = MinHasher()
+    assert np.array_equal(hasher.shingles("The Fee, is DUE now!"), hasher.shingles("the fee is due now"))
+
+
+def test_signatures_depend_on_the_seed():
+    assert not np.array_equal(MinHasher(seed=1).signature(BASE), MinHasher(seed=2).signature(BASE))
+
+
+def test_nearest_finds_the_near_duplicate_under_the_same_tag():
+    index = SimilarityIndex(None)
+    index.add("base", BASE, index.signature(BASE), {"n": 1}, tag="settings-a")
+    index.add("other", OTHER, index.signature(OTHER), {}, tag="settings-a")
+
+    key, similarity = index.nearest(index.signature(EDITED), "settings-a")
+    assert key == "base"
+    assert similarity > 0.9
+    assert index.nearest(index.signature(EDITED), "settings-b") is None
+    assert index.get("base").payload == {"n": 1}
+
+
+def test_newest_copy_wins_ties():
+    index = SimilarityIndex(None)
+    index.add("old", BASE, index.signature(BASE), {})
+    index.add("new", BASE, index.signature(BASE), {})
+    assert index.nearest(index.signature(BASE)) == ("new", 1.0)
+
+
+def test_aliases_resolve_to_the_indexed_document():
+    index = SimilarityIndex(None)
+    index.add("leader", BASE, index.signature(BASE), {"clauses": []})
+    assert index.alias("follower", "leader")
+    assert not index.alias("stray", "missing")
+    assert "follower" in index and "stray" not in index
+    assert index.get("follower").text == BASE
+    assert index.similarity("follower", index.signature(BASE)) == 1.0
+    assert len(index) == 1
+
+
+def test_text_without_words_is_not_indexed():
+    index = SimilarityIndex(None)
+    index.add("empty", "...", index.signature("..."), {})
+    assert len(index) == 0
+    assert index.nearest(index.signature("")) is None
+
+
+def test_index_is_reloaded_from_disk(tmp_path):
+    path = str(tmp_path / "similarity.db")
+    index = SimilarityIndex(path)
+    index.add("base", BASE, index.signature(BASE), {"n": 1}, tag="t")
+    index.alias("follower", "base")
+
+    reloaded = SimilarityIndex(path)
+    assert reloaded.nearest(reloaded.signature(EDITED), "t")[0] == "base"
+    assert reloaded.get("follower").payload == {"n": 1}
@@ -0,0 +1,43 @@
+from app.core.text_diff import TextDiff, merge_spans
+
+OLD = "1. Payment\nNet 30 days.\n2. Scope\nServices as requested.\n"
+NEW = "1. Payment\nNet 30 days.\nLate fees apply.\n2. Scope\nServices listed in Exhibit A.\n"
+
+
+def test_unchanged_spans_map_to_their_new_offsets():
+    diff = TextDiff(OLD, NEW)
+    start = OLD.index("2. Scope")
+    assert diff.map_span(start, start + 8) == NEW.index("2. Scope")
+    assert diff.map_span(0, OLD.index("2. Scope")) == 0
+
+
+def test_spans_touching_a_change_do_not_map():
+    diff = TextDiff(OLD, NEW)
+    start = OLD.index("Services")
+    assert diff.map_span(start, start + 8) is None
+    assert diff.map_span(OLD.index("2. Scope"), len(OLD)) is None
+
+
+def test_project_covers_what_survives():
+    diff = TextDiff(OLD, NEW)
+    projected = diff.project(OLD.index("Net"), len(OLD))
+    assert projected == (NEW.index("Net"), NEW.index("Services"))
+    assert diff.project(OLD.index("Services"), len(OLD)) is None
+
+
+def test_changed_regions_are_the_new_lines():
+    regions = TextDiff(OLD, NEW).changed_regions()
+    assert [NEW[start:end] for start, end in regions] == ["Late fees apply.\n", "Services listed in Exhibit A.\n"]
+
+
+def test_identical_texts_have_no_changes():
+    diff = TextDiff(OLD, OLD)
+    assert diff.changed_regions() == []
+    assert diff.unchanged_ratio == 1.0
+
+
+def test_merge_spans():
+    spans = [(8, 10), (0, 5), (3, 6), (20, 25)]
+    assert merge_spans(spans) == [(0, 6), (8, 10), (20, 25)]
+    assert merge_spans(spans, gap=2) == [(0, 10), (20, 25)]
+    assert merge_spans([]) == []
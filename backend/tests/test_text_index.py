@@ -0,0 +1,52 @@
+from app.core.text_index import SectionIndex
+
+TEXT = (
+    "1. Insurance\n"
+    "Contractor shall maintain insurance coverage of $1M.\n"
+    "Contractor shall defend and indemnify Client.\n"
+    "\f2. Payment\n"
+    "The fee is due on receipt of an invoice.\n"
+)
+
+
+def test_counts_every_keyword_of_a_section():
+    index = SectionIndex(TEXT)
+    assert index.count("insurance") == 3  # insurance twice, coverage
+    assert index.count("payment") == 3  # payment, fee, invoice
+    assert index.count("indemnification") == 2  # defend, indemnif
+
+
+def test_keywords_only_match_at_word_starts():
+    # "end" is a termination keyword, but not inside "defend"
+    assert SectionIndex(TEXT).count("termination") == 0
+
+
+def test_hits_carry_line_and_page():
+    hits = list(SectionIndex(TEXT).hits("payment"))
+    assert [hit.keyword for hit in hits] == ["payment", "fee", "invoice"]
+    assert all(hit.page_number == 2 for hit in hits)
+    assert hits[0].line_number == 4
+    assert TEXT[hits[1].offset:hits[1].offset + 3] == "fee"
+
+
+def test_count_between_counts_hits_in_a_span():
+    index = SectionIndex(TEXT)
+    payment_start = TEXT.index("2. Payment")
+    assert index.count_between("payment", payment_start, len(TEXT)) == 3
+    assert index.count_between("payment", 0, payment_start) == 0
+    assert index.count_between("insurance", 0, TEXT.index("coverage")) == 2
+
+
+def test_matching_ignores_case_when_lowering_changes_the_length():
+    text = "İstanbul office. INSURANCE Coverage applies."
+    index = SectionIndex(text)
+    assert index.count("insurance") == 2
+    assert [text[hit.offset] for hit in index.hits("insurance")] == ["I", "C"]
+
+
+def test_unknown_section_raises_key_error():
+    try:
+        SectionIndex(TEXT).count("warranty")
+    except KeyError:
+        return
+    raise AssertionError("expected KeyError")
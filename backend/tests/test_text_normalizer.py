@@ -0,0 +1,35 @@
+from app.core.text_normalizer import TextNormalizer
+
+
+def test_normalize_cleans_lines():
+    raw = "  Indemni-\nfication  of   the\n\n\tparty\x00 \n"
+    assert TextNormalizer.normalize(raw) == "Indemnification of the\nparty"
+
+
+def test_normalize_applies_nfkc():
+    assert TextNormalizer.normalize("ﬁnal payment") == "final payment"
+
+
+def test_hyphen_not_followed_by_a_word_is_kept():
+    assert TextNormalizer.normalize("Clause 3 -\nsee below\nterm-\n(a)") == "Clause 3 -\nsee below\nterm-\n(a)"
+
+
+def test_clean_text_is_unchanged():
+    text = "1. Payment\nClient shall pay within 30 days."
+    assert TextNormalizer.normalize(text) == text
+
+
+def test_pages_join_words_hyphenated_across_a_page_break():
+    chunks = list(TextNormalizer.normalize_pages(["the indemni-", "fication clause", " "]))
+    assert [(c.text, c.offset, c.page) for c in chunks] == [
+        ("the indemnification", 0, 1),
+        ("clause", 20, 2),
+        ("", 27, 3)
+    ]
+
+
+def test_normalize_document_offsets_match_the_text():
+    text, index = TextNormalizer.normalize_document(["Page  one\n", "Page two", "Page three"])
+    assert text == "Page one\nPage two\nPage three"
+    assert [text[start:start + 4] for start in index.starts] == ["Page"] * 3
+    assert index.page_of(text.index("three")) == 3
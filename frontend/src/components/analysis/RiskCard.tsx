@@ -56,6 +56,14 @@ export function RiskCard({ risk }: RiskCardProps) {
                     <blockquote className="italic text-gray-700">
                       "{evidence}"
                     </blockquote>
+                    {risk.evidence_locations
+                      ?.filter((location) => location.quote === evidence)
+                      .slice(0, 1)
+                      .map((location) => (
+                        <span key={location.start} className="text-xs text-gray-500">
+                          Page {location.page}
+                        </span>
+                      ))}
                   </li>
                 ))}
               </ul>
@@ -11,7 +11,11 @@ export function FileUploader({ onFileSelect, isLoading }: FileUploaderProps) {
     onDrop: (acceptedFiles) => {
       if (acceptedFiles.length > 0) {
         const file = acceptedFiles[0]
-        if (file.type === 'application/pdf' || file.type === 'text/plain') {
+        if (
+          file.type === 'application/pdf' ||
+          file.type === 'text/plain' ||
+          file.name.toLowerCase().endsWith('.zip')
+        ) {
           onFileSelect(file)
         }
       }
@@ -19,6 +23,7 @@ export function FileUploader({ onFileSelect, isLoading }: FileUploaderProps) {
     accept: {
       'application/pdf': ['.pdf'],
       'text/plain': ['.txt'],
+      'application/zip': ['.zip'],
     },
     disabled: isLoading,
     multiple: false,
@@ -44,7 +49,7 @@ export function FileUploader({ onFileSelect, isLoading }: FileUploaderProps) {
             or click to select a file
           </p>
           <p className="text-xs text-gray-400">
-            Accepted formats: PDF, TXT (Max 10MB)
+            Accepted formats: PDF, TXT (Max 10MB), or a ZIP of a master agreement with its exhibits
           </p>
         </div>
       </div>
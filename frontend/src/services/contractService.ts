@@ -6,7 +6,7 @@ import { AnalysisResult } from '../types/analysis'
 const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000'
 
 export const contractService = {
-  async uploadContract(file: File): Promise<UploadResponse> {
+  async uploadContract(file: File, revisionOf?: string): Promise<UploadResponse> {
     const formData = new FormData()
     formData.append('file', file)
 
@@ -17,6 +17,7 @@ export const contractService = {
         headers: {
           'Content-Type': 'multipart/form-data',
         },
+        params: revisionOf ? { revision_of: revisionOf } : undefined,
       }
     )
     return response.data
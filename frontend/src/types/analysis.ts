@@ -1,11 +1,57 @@
 import { Risk, ContractMetadata } from './risk'
 
+export interface RiskChange {
+  category: string
+  title: string
+  severity_level: string
+  previous_severity_level?: string | null
+}
+
+export interface RevisionChanges {
+  appeared: RiskChange[]
+  disappeared: RiskChange[]
+  changed: RiskChange[]
+}
+
+export interface PackageMember {
+  name: string
+  role: 'master' | 'exhibit' | 'skipped'
+  size_bytes: number
+  compressed_bytes: number
+  label?: string | null
+  characters: number
+  pages: number
+  first_page?: number | null
+  parse_ms: number
+  error?: string | null
+}
+
+export interface CrossReference {
+  label?: string | null
+  member: string
+  sections: { heading?: string | null; page: number }[]
+}
+
+export interface ContractPackage {
+  master: string
+  members: PackageMember[]
+  cross_references: CrossReference[]
+  unresolved_references: string[]
+}
+
 export interface AnalysisResult {
   analysis_id: string
   status: string
   contract_metadata: ContractMetadata
   risks: Risk[]
   overall_risk_score: number
+  scoring_version?: string | null
   summary: string
+  degradations?: string[]
+  reused_from?: string | null
+  similarity?: number | null
+  revision_of?: string | null
+  revision_changes?: RevisionChanges | null
+  package?: ContractPackage | null
   analyzed_at: string
 }
@@ -9,6 +9,9 @@ export interface AnalysisStatus {
   analysis_id: string
   status: 'pending' | 'processing' | 'completed' | 'failed'
   progress_percentage: number
+  current_step?: string
+  clauses_extracted?: number
+  risks_detected?: number
   created_at?: string
   completed_at?: string
   error_message?: string
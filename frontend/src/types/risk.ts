@@ -14,6 +14,13 @@ export interface Remediation {
   effort: string
 }
 
+export interface EvidenceLocation {
+  quote: string
+  page: number
+  start: number
+  end: number
+}
+
 export interface Risk {
   risk_id: string
   category: RiskCategory
@@ -24,6 +31,7 @@ export interface Risk {
   affected_clause: string
   explanation: string
   evidence: string[]
+  evidence_locations?: EvidenceLocation[]
   remediation: Remediation
 }
 